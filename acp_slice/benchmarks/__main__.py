@@ -0,0 +1,6 @@
+import sys
+
+from acp_slice.benchmarks.bench_suite import main
+
+
+sys.exit(main())
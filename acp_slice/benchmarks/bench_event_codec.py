@@ -0,0 +1,80 @@
+"""Microbenchmark: EventCodec.encode against json.dumps(sort_keys=True).
+
+Usage: python -m acp_slice.benchmarks.bench_event_codec [--iterations N]
+"""
+
+import argparse
+import datetime
+import json
+import sys
+import timeit
+import uuid
+
+from acp_slice.telemetry.acp_event_codec import EventCodec, encode_event_generic
+
+
+EVENT_VERSION = "v0"
+
+SAMPLE_PAYLOADS = {
+    "empty": {},
+    "status_change": {"old_status": "QUEUED", "new_status": "EVALUATING"},
+    "harness_result": {
+        "returncode": 0,
+        "stdout_bytes": 1834,
+        "stderr_bytes": 0,
+        "duration_seconds": 1.284,
+        "repo_path": "/srv/repos/example",
+        "command": ["aah", "--task", "tasks/t1.md"],
+    },
+}
+
+
+def sample_record(run_id: str, payload: dict) -> dict:
+    return {
+        "event_version": EVENT_VERSION,
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "run_id": run_id,
+        "event_type": "EVENT_STATUS_CHANGED",
+        "task_id": "t1",
+        "payload": payload,
+    }
+
+
+def _best_ns_per_call(func, record: dict, iterations: int, repeat: int) -> float:
+    timer = timeit.Timer(lambda: func(record))
+    return min(timer.repeat(repeat=repeat, number=iterations)) / iterations * 1e9
+
+
+def run(iterations: int = 100000, repeat: int = 5) -> list[dict]:
+    run_id = str(uuid.uuid4())
+    codec = EventCodec(EVENT_VERSION, run_id)
+    results = []
+    for name, payload in SAMPLE_PAYLOADS.items():
+        record = sample_record(run_id, payload)
+        if codec.encode(record) != encode_event_generic(record):
+            raise AssertionError(f"codec output differs from json.dumps for {name}")
+        generic_ns = _best_ns_per_call(encode_event_generic, record, iterations, repeat)
+        codec_ns = _best_ns_per_call(codec.encode, record, iterations, repeat)
+        results.append(
+            {
+                "payload": name,
+                "json_dumps_ns": round(generic_ns, 1),
+                "codec_ns": round(codec_ns, 1),
+                "speedup": round(generic_ns / codec_ns, 2),
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    for result in run(args.iterations, args.repeat):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
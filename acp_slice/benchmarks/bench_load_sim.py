@@ -0,0 +1,326 @@
+"""End-to-end load simulator for the queue runner.
+
+Usage: python -m acp_slice.benchmarks.bench_load_sim [--tasks N] [--runners K]
+    [--runner sync|async] [--latency SPEC] [--exit-codes SPEC] [--log-lines N]
+    [--max-concurrency N] [--max-retries N] [--output PATH] ...
+
+Builds a scratch runtime root holding N queued tasks, their task files and
+git-initialized repo directories, and a stub ``aah`` (``stub_aah``) first on
+PATH. It then starts K runner processes in ``--loop`` mode and waits until
+every task is terminal. The stub's latency distribution, exit code mix and
+log volume are configurable. The report (JSON) holds throughput, end-to-end
+and queue-wait latency percentiles measured from the event log (summarized as
+``acp_latency_report`` does), final status counts and the
+``validate_task_consistency`` pass rate. Queue backend
+settings (``ACP_QUEUE_BACKEND`` etc.) are passed through to the runners.
+"""
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from acp_slice.benchmarks.bench_suite import scratch_runtime
+from acp_slice.benchmarks.stub_aah import parse_exit_codes, parse_latency
+from acp_slice.contracts.acp_contracts import (
+    COMPLETED,
+    DEAD_LETTER,
+    EVENT_RUN_STARTED,
+    EVENT_STATUS_CHANGED,
+    FIELD_MAX_RETRIES,
+    FIELD_RETRY_DELAY_SECONDS,
+    FIELD_STATUS,
+    FIELD_TASK_FILE,
+    FIELD_TASK_ID,
+    QUEUED,
+    REFUSED,
+)
+from acp_slice.queue.acp_queue_backends import get_queue_backend
+from acp_slice.queue.acp_queue_journal import write_snapshot
+from acp_slice.telemetry.acp_consistency_validator import validate_task_consistency
+from acp_slice.telemetry.acp_event_segments import iter_log_lines
+from acp_slice.telemetry.acp_latency_report import summarize
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+TERMINAL_STATUSES = {COMPLETED, REFUSED, DEAD_LETTER}
+RUNNER_MODULES = {
+    "sync": "acp_slice.runners.acp_run_loop",
+    "async": "acp_slice.runners.acp_async_run_loop",
+}
+
+_STUB_LAUNCHER = """#!{python}
+import sys
+from acp_slice.benchmarks.stub_aah import main
+sys.exit(main(sys.argv[1:]))
+"""
+
+
+def _sim_task_id(index: int) -> str:
+    return f"sim-{index}"
+
+
+def write_stub_harness(bin_dir: str) -> str:
+    os.makedirs(bin_dir, exist_ok=True)
+    path = os.path.join(bin_dir, "aah")
+    with open(path, "w", encoding="utf-8") as stub_file:
+        stub_file.write(_STUB_LAUNCHER.format(python=sys.executable))
+    os.chmod(path, 0o755)
+    return path
+
+
+def create_repos(repos_dir: str, count: int) -> list[str]:
+    paths = []
+    for index in range(count):
+        path = os.path.join(repos_dir, f"repo-{index}")
+        os.makedirs(path, exist_ok=True)
+        subprocess.run(["git", "init", "-q", path], check=True)
+        paths.append(path)
+    return paths
+
+
+def create_tasks(root: str, tasks_path: str, options: argparse.Namespace) -> list[str]:
+    """Write task files and queue rows for options.tasks tasks; return their ids."""
+    repos = create_repos(os.path.join(root, "repos"), max(1, min(options.repos, options.tasks)))
+    task_dir = os.path.join(root, "tasks")
+    os.makedirs(task_dir, exist_ok=True)
+    task_ids, rows = [], []
+    for index in range(options.tasks):
+        task_id = _sim_task_id(index)
+        task_file = os.path.join(task_dir, f"{task_id}.json")
+        with open(task_file, "w", encoding="utf-8") as f:
+            json.dump({"repo_path": repos[index % len(repos)], "argv": ["make", "check"], "label": task_id}, f)
+        rows.append(
+            {
+                FIELD_TASK_ID: task_id,
+                FIELD_STATUS: QUEUED,
+                FIELD_TASK_FILE: task_file,
+                FIELD_MAX_RETRIES: options.max_retries,
+                FIELD_RETRY_DELAY_SECONDS: options.retry_delay,
+            }
+        )
+        task_ids.append(task_id)
+    write_snapshot(tasks_path, rows)
+    return task_ids
+
+
+def write_runner_config(root: str, options: argparse.Namespace) -> dict:
+    config = {"max_tasks_per_run": options.max_tasks_per_run, "max_concurrency": options.max_concurrency}
+    if options.harness_timeout is not None:
+        config["harness_timeout_seconds"] = options.harness_timeout
+    lease_ttl = options.lease_ttl if options.lease_ttl is not None else (30.0 if options.runners > 1 else None)
+    if lease_ttl is not None:
+        config["lease_ttl_seconds"] = lease_ttl
+    with open(os.path.join(root, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    return config
+
+
+def _runner_env(root: str, bin_dir: str, options: argparse.Namespace) -> dict:
+    env = dict(os.environ)
+    env["ACP_SLICE_RUNTIME_ROOT"] = root
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env["ACP_SIM_LATENCY"] = options.latency
+    env["ACP_SIM_EXIT_CODES"] = options.exit_codes
+    env["ACP_SIM_LOG_LINES"] = str(options.log_lines)
+    env["ACP_SIM_LOG_LINE_BYTES"] = str(options.log_line_bytes)
+    env["ACP_SIM_SEED"] = str(options.seed)
+    return env
+
+
+def _is_quiescent(tasks_path: str) -> bool:
+    try:
+        tasks = get_queue_backend(tasks_path).all_tasks()
+    except Exception:
+        return False
+    return bool(tasks) and all(isinstance(task, dict) and task.get(FIELD_STATUS) in TERMINAL_STATUSES for task in tasks)
+
+
+def _stop_runners(runners: list[subprocess.Popen]) -> list[int]:
+    # Both runners finish their pass and flush events on SIGINT.
+    for runner in runners:
+        if runner.poll() is None:
+            runner.send_signal(signal.SIGINT)
+    exit_codes = []
+    for runner in runners:
+        try:
+            exit_codes.append(runner.wait(timeout=30))
+        except subprocess.TimeoutExpired:
+            runner.kill()
+            exit_codes.append(runner.wait())
+    return exit_codes
+
+
+def _parse_timestamp(value: object) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def task_timings(events_path: str) -> dict:
+    """Return {task_id: {"started": ts, "finished": ts}} from the event log.
+
+    ``started`` is the first EVENT_RUN_STARTED and ``finished`` the last
+    status change into a terminal status.
+    """
+    timings = collections.defaultdict(dict)
+    for line in iter_log_lines(events_path):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        task_id = event.get("task_id")
+        timestamp = _parse_timestamp(event.get("timestamp"))
+        if not isinstance(task_id, str) or timestamp is None:
+            continue
+        payload = event.get("payload") or {}
+        if event.get("event_type") == EVENT_RUN_STARTED:
+            timings[task_id].setdefault("started", timestamp)
+        elif event.get("event_type") == EVENT_STATUS_CHANGED and payload.get("new_status") in TERMINAL_STATUSES:
+            timings[task_id]["finished"] = timestamp
+    return dict(timings)
+
+
+def build_report(task_ids: list[str], tasks_path: str, events_path: str, started_at: datetime.datetime) -> dict:
+    timings = task_timings(events_path)
+    latencies, waits, finished = [], [], []
+    for task_id in task_ids:
+        timing = timings.get(task_id, {})
+        if "finished" in timing:
+            finished.append(timing["finished"])
+            latencies.append((timing["finished"] - started_at).total_seconds())
+        if "started" in timing:
+            waits.append((timing["started"] - started_at).total_seconds())
+
+    statuses = collections.Counter(task.get(FIELD_STATUS) for task in get_queue_backend(tasks_path).all_tasks())
+    failures = collections.Counter()
+    for task_id in task_ids:
+        result = validate_task_consistency(task_id)
+        if not result.get("valid"):
+            failures[result.get("reason")] += 1
+
+    elapsed = (max(finished) - started_at).total_seconds() if finished else None
+    return {
+        "terminal_tasks": len(finished),
+        "elapsed_seconds": round(elapsed, 6) if elapsed is not None else None,
+        "tasks_per_second": round(len(finished) / elapsed, 3) if elapsed else None,
+        "latency_seconds": summarize(latencies),
+        "queue_wait_seconds": summarize(waits),
+        "statuses": dict(sorted(statuses.items())),
+        "consistency_pass_rate": round((len(task_ids) - sum(failures.values())) / len(task_ids), 6),
+        "consistency_failures": dict(sorted(failures.items())),
+    }
+
+
+def simulate(options: argparse.Namespace) -> dict:
+    # Reject bad distributions here rather than in every stub run.
+    parse_latency(options.latency)
+    parse_exit_codes(options.exit_codes)
+    root = tempfile.mkdtemp(prefix="acp-load-sim-", dir=options.workdir)
+    try:
+        with scratch_runtime(root) as (events_path, tasks_path):
+            bin_dir = os.path.join(root, "bin")
+            write_stub_harness(bin_dir)
+            task_ids = create_tasks(root, tasks_path, options)
+            config = write_runner_config(root, options)
+            env = _runner_env(root, bin_dir, options)
+            command = [sys.executable, "-m", RUNNER_MODULES[options.runner], "--loop", str(options.poll_interval)]
+
+            started_at = datetime.datetime.utcnow()
+            deadline = time.monotonic() + options.timeout
+            runners = []
+            for index in range(options.runners):
+                with open(os.path.join(root, f"runner-{index}.log"), "wb") as runner_log:
+                    runners.append(
+                        subprocess.Popen(
+                            command, cwd=str(REPO_ROOT), env=env, stdout=subprocess.DEVNULL, stderr=runner_log
+                        )
+                    )
+            quiescent = False
+            try:
+                while time.monotonic() < deadline:
+                    if _is_quiescent(tasks_path):
+                        quiescent = True
+                        break
+                    if all(runner.poll() is not None for runner in runners):
+                        break
+                    time.sleep(0.05)
+            finally:
+                runner_exit_codes = _stop_runners(runners)
+
+            report = {
+                "tasks": options.tasks,
+                "runners": options.runners,
+                "runner": options.runner,
+                "config": config,
+                "harness": {
+                    "latency": options.latency,
+                    "exit_codes": options.exit_codes,
+                    "log_lines": options.log_lines,
+                    "log_line_bytes": options.log_line_bytes,
+                },
+                "quiescent": quiescent,
+                "runner_exit_codes": runner_exit_codes,
+                "runtime_root": root if options.keep else None,
+            }
+            report.update(build_report(task_ids, tasks_path, events_path, started_at))
+            return report
+    finally:
+        if not options.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.benchmarks.bench_load_sim", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--runners", type=int, default=1, help="runner processes sharing the queue")
+    parser.add_argument("--runner", choices=sorted(RUNNER_MODULES), default="sync")
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--max-tasks-per-run", type=int, default=50)
+    parser.add_argument("--harness-timeout", type=float)
+    parser.add_argument("--lease-ttl", type=float, help="default 30 when --runners > 1, else no leases")
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument("--retry-delay", type=float, default=0.0)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5", help="stub latency distribution (see stub_aah)")
+    parser.add_argument("--exit-codes", default="0:0.95,1:0.05", help="weighted stub exit codes")
+    parser.add_argument("--log-lines", type=int, default=10)
+    parser.add_argument("--log-line-bytes", type=int, default=128)
+    parser.add_argument("--repos", type=int, default=8, help="git repos shared by the tasks")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=600.0, help="give up waiting for quiescence after this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="directory for the scratch runtime root (default: system temp)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch runtime root for inspection")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    options = build_parser().parse_args(argv)
+    if options.tasks < 1 or options.runners < 1:
+        print("--tasks and --runners must be positive", file=sys.stderr)
+        return 2
+    report = simulate(options)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    else:
+        print(text)
+    return 0 if report["quiescent"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""Benchmark suite for the admission, queue and telemetry hot paths.
+
+Usage: python -m acp_slice.benchmarks [--profile quick|full] [--events N,...]
+    [--tasks N,...] [--output PATH] [--baseline PATH] [--update-baseline]
+    [--tolerance FRACTION] [--workdir DIR]
+
+Every benchmark runs against synthetic data in a scratch runtime root, so the
+configured runtime root is never touched. Results are written as JSON::
+
+    {"meta": {...}, "results": {"<name>": {"value": 1.5, "unit": "ms", "better": "lower"}}}
+
+Result names carry their size (``get_events_for_task.1000000.warm``), so runs
+with different sizes only compare the results they share. When a baseline
+file exists, the document also holds a ``comparison`` list, and the exit
+status is 1 if any result is worse than the baseline by more than the
+tolerance.
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from acp_slice.benchmarks import bench_event_codec
+from acp_slice.contracts.acp_contracts import (
+    COMPLETED,
+    EVALUATING,
+    EVENT_RUN_FINISHED,
+    EVENT_RUN_STARTED,
+    EVENT_STATUS_CHANGED,
+    FIELD_STATUS,
+    FIELD_TASK_ID,
+    QUEUED,
+)
+from acp_slice.queue import acp_queue_backends
+from acp_slice.queue.acp_queue_journal import write_snapshot
+from acp_slice.telemetry import acp_consistency_validator, acp_event_index, acp_event_reader, acp_events
+from acp_slice.telemetry.acp_replay_validator import LIFECYCLE_MODE_REPLAY, validate_task_lifecycle
+
+
+SLICE_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = SLICE_ROOT.parent
+RUNTIME_ROOT = Path(os.environ.get("ACP_SLICE_RUNTIME_ROOT", str(SLICE_ROOT / ".tmp")))
+DEFAULT_BASELINE_PATH = str(RUNTIME_ROOT / "benchmarks" / "baseline.json")
+WRAPPER_RUNTIME_PATH = REPO_ROOT / "runtime" / "regime_wrapper_runtime.py"
+
+DEFAULT_TOLERANCE = 0.25
+
+# Sizes per profile: event log lengths for the reader and lifecycle
+# benchmarks, and queue lengths for the write and consistency benchmarks.
+PROFILES = {
+    "quick": {"events": (10_000,), "tasks": (1_000,), "appends": 10_000, "decisions": 100_000, "repeat": 5},
+    "full": {
+        "events": (10_000, 1_000_000, 10_000_000),
+        "tasks": (1_000, 100_000),
+        "appends": 100_000,
+        "decisions": 1_000_000,
+        "repeat": 7,
+    },
+}
+
+# Each synthetic task gets this lifecycle, one event per phase.
+LIFECYCLE_EVENTS = (
+    (EVENT_STATUS_CHANGED, {"old_status": QUEUED, "new_status": EVALUATING}),
+    (EVENT_RUN_STARTED, {}),
+    (EVENT_RUN_FINISHED, {"returncode": 0}),
+    (EVENT_STATUS_CHANGED, {"old_status": EVALUATING, "new_status": COMPLETED}),
+)
+
+ADMISSION_CASES = (
+    ({"regime_status": "REGIME_DECLARED", "entry_mode": "OPERATOR_ASSERTED", "regime_id": "BANK_LIQUIDITY_EVENT"}, {}),
+    ({"regime_status": "REGIME_DECLARED", "entry_mode": "OPERATOR_ASSERTED", "regime_id": "NOT_A_REGIME"}, {}),
+    ({"regime_status": "REGIME_NOT_DECLARED"}, {}),
+    ({"regime_status": "REGIME_DECLARED", "entry_mode": "INFERRED", "regime_id": "STABLECOIN_PEG_EVENT"}, {}),
+)
+
+
+def _result(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def _latency_ms(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _result(statistics.median(samples) * 1e3, "ms", "lower")
+
+
+def _throughput(func, count: int, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return _result(count / best, "ops/s", "higher")
+
+
+def _task_id(index: int) -> str:
+    return f"bench-{index}"
+
+
+@contextlib.contextmanager
+def scratch_runtime(root: str):
+    """Point the event log and queue path globals at root for the duration."""
+    events_path = os.path.join(root, "logs", "events.jsonl")
+    tasks_path = os.path.join(root, "queue", "tasks.jsonl")
+    os.makedirs(os.path.dirname(events_path), exist_ok=True)
+    os.makedirs(os.path.dirname(tasks_path), exist_ok=True)
+    patches = [
+        (acp_events, "EVENTS_LOG_PATH", events_path),
+        (acp_event_reader, "EVENTS_LOG_PATH", events_path),
+        (acp_consistency_validator, "TASKS_PATH", tasks_path),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    acp_events.flush_events()
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield events_path, tasks_path
+    finally:
+        acp_events.flush_events()
+        for module, name, value in saved:
+            setattr(module, name, value)
+        acp_event_index._INDEX_CACHE.pop(events_path, None)
+        with acp_queue_backends._BACKENDS_LOCK:
+            backend = acp_queue_backends._BACKENDS.pop(tasks_path, None)
+        if backend is not None and hasattr(backend, "close"):
+            backend.close()
+
+
+def write_synthetic_events(events_path: str, event_count: int) -> int:
+    """Write event_count events for event_count // 4 tasks; return the task count.
+
+    Tasks are interleaved round-robin, so each task's events are spread over
+    the whole log as they are when many tasks run concurrently.
+    """
+    task_count = max(1, event_count // len(LIFECYCLE_EVENTS))
+    timestamp = datetime.datetime.utcnow().isoformat()
+    chunk = []
+    with open(events_path, "wb") as events_file:
+        for index in range(event_count):
+            event_type, payload = LIFECYCLE_EVENTS[(index // task_count) % len(LIFECYCLE_EVENTS)]
+            record = {
+                "event_version": acp_events.EVENT_VERSION,
+                "timestamp": timestamp,
+                "run_id": acp_events.RUN_ID,
+                "event_type": event_type,
+                "task_id": _task_id(index % task_count),
+                "payload": payload,
+            }
+            chunk.append(acp_events.EVENT_CODEC.encode(record))
+            if len(chunk) >= 10_000:
+                events_file.write(b"".join(chunk))
+                chunk = []
+        events_file.write(b"".join(chunk))
+    return task_count
+
+
+def synthetic_tasks(task_count: int, status: str = QUEUED) -> list[dict]:
+    return [
+        {FIELD_TASK_ID: _task_id(index), FIELD_STATUS: status, "task_file": f"tasks/{_task_id(index)}.md", "attempts": 0}
+        for index in range(task_count)
+    ]
+
+
+def _load_wrapper_runtime():
+    spec = importlib.util.spec_from_file_location("regime_wrapper_runtime", WRAPPER_RUNTIME_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_admission(decisions: int, repeat: int) -> dict:
+    wrapper = _load_wrapper_runtime()
+    cases = [ADMISSION_CASES[index % len(ADMISSION_CASES)] for index in range(decisions)]
+    arg_cases = [[json.dumps(regime), json.dumps(payload)] for regime, payload in ADMISSION_CASES]
+    arg_cases = [arg_cases[index % len(arg_cases)] for index in range(max(1, decisions // 10))]
+
+    def admit_all():
+        admit = wrapper.admit
+        for regime, payload in cases:
+            admit(regime, payload)
+
+    def evaluate_all():
+        evaluate = wrapper.evaluate
+        for args in arg_cases:
+            evaluate(args)
+
+    return {
+        "admission.admit": _throughput(admit_all, len(cases), repeat),
+        "admission.evaluate_cli_args": _throughput(evaluate_all, len(arg_cases), repeat),
+    }
+
+
+def bench_event_encoding(iterations: int, repeat: int) -> dict:
+    results = {}
+    for row in bench_event_codec.run(iterations=iterations, repeat=repeat):
+        results[f"event_encode.{row['payload']}"] = _result(row["codec_ns"], "ns", "lower")
+    return results
+
+
+def bench_append_event(workdir: str, appends: int, repeat: int) -> dict:
+    def append_all():
+        for index in range(appends):
+            acp_events.append_event(
+                {
+                    "event_type": EVENT_STATUS_CHANGED,
+                    "task_id": _task_id(index % 1000),
+                    "payload": {"old_status": QUEUED, "new_status": EVALUATING},
+                }
+            )
+        acp_events.flush_events()
+
+    with tempfile.TemporaryDirectory(dir=workdir) as root, scratch_runtime(root):
+        return {"append_event": _throughput(append_all, appends, repeat)}
+
+
+def bench_event_reads(workdir: str, event_count: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(dir=workdir) as root, scratch_runtime(root) as (events_path, _):
+        task_count = write_synthetic_events(events_path, event_count)
+        target = _task_id(task_count // 2)
+        results = {}
+
+        started = time.perf_counter()
+        acp_event_index.rebuild_index(events_path)
+        results[f"event_index_rebuild.{event_count}"] = _result(time.perf_counter() - started, "s", "lower")
+
+        acp_event_index._INDEX_CACHE.pop(events_path, None)
+        started = time.perf_counter()
+        events = acp_event_reader.get_events_for_task(target)
+        results[f"get_events_for_task.{event_count}.cold"] = _result(
+            (time.perf_counter() - started) * 1e3, "ms", "lower"
+        )
+        if len(events) != len(LIFECYCLE_EVENTS):
+            raise AssertionError(f"expected {len(LIFECYCLE_EVENTS)} events for {target}, got {len(events)}")
+
+        results[f"get_events_for_task.{event_count}.warm"] = _latency_ms(
+            lambda: acp_event_reader.get_events_for_task(target), repeat
+        )
+        lifecycle = validate_task_lifecycle(target, mode=LIFECYCLE_MODE_REPLAY)
+        if not lifecycle.get("valid"):
+            raise AssertionError(f"synthetic lifecycle invalid: {lifecycle}")
+        results[f"validate_task_lifecycle.{event_count}"] = _latency_ms(
+            lambda: validate_task_lifecycle(target, mode=LIFECYCLE_MODE_REPLAY), repeat
+        )
+        return results
+
+
+def _bench_saves(backend, saves: int) -> dict:
+    backend.load()
+    rows = []
+    for task in backend.due_tasks():
+        rows.append(task)
+        if len(rows) >= saves:
+            break
+
+    def save_all():
+        for task in rows:
+            task["attempts"] += 1
+            backend.save_task(task)
+
+    started = time.perf_counter()
+    save_all()
+    return _result((time.perf_counter() - started) * 1e3 / len(rows), "ms", "lower")
+
+
+def bench_queue_writes(workdir: str, task_count: int, repeat: int) -> dict:
+    results = {}
+    variants = (
+        ("jsonl_snapshot", lambda path: acp_queue_backends.JsonlQueueBackend(path)),
+        (
+            "jsonl_journal",
+            lambda path: acp_queue_backends.JsonlQueueBackend(
+                path, acp_queue_backends.QUEUE_STORAGE_JOURNAL, compact_threshold=1 << 62
+            ),
+        ),
+        (
+            "sqlite",
+            lambda path: acp_queue_backends.SqliteQueueBackend(
+                acp_queue_backends.sqlite_path_for(path), seed_path=path
+            ),
+        ),
+    )
+    for name, make_backend in variants:
+        with tempfile.TemporaryDirectory(dir=workdir) as root:
+            tasks_path = os.path.join(root, "tasks.jsonl")
+            write_snapshot(tasks_path, synthetic_tasks(task_count))
+            backend = make_backend(tasks_path)
+            try:
+                results[f"queue_save_task.{name}.{task_count}"] = _bench_saves(backend, repeat)
+            finally:
+                if hasattr(backend, "close"):
+                    backend.close()
+
+    with tempfile.TemporaryDirectory(dir=workdir) as root:
+        tasks_path = os.path.join(root, "tasks.jsonl")
+        tasks = synthetic_tasks(task_count)
+        results[f"queue_write_snapshot.{task_count}"] = _latency_ms(lambda: write_snapshot(tasks_path, tasks), repeat)
+    return results
+
+
+def bench_consistency(workdir: str, task_count: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(dir=workdir) as root, scratch_runtime(root) as (events_path, tasks_path):
+        write_synthetic_events(events_path, task_count * len(LIFECYCLE_EVENTS))
+        write_snapshot(tasks_path, synthetic_tasks(task_count, status=COMPLETED))
+        target = _task_id(task_count // 2)
+        result = acp_consistency_validator.validate_task_consistency(target)
+        if not result.get("valid"):
+            raise AssertionError(f"synthetic queue inconsistent: {result}")
+        return {
+            f"validate_task_consistency.{task_count}": _latency_ms(
+                lambda: acp_consistency_validator.validate_task_consistency(target), repeat
+            )
+        }
+
+
+def run_suite(profile: dict, workdir: str | None = None) -> dict:
+    repeat = profile["repeat"]
+    results = {}
+    results.update(bench_admission(profile["decisions"], repeat))
+    results.update(bench_event_encoding(max(1, profile["decisions"] // 5), repeat))
+    results.update(bench_append_event(workdir, profile["appends"], repeat))
+    for event_count in profile["events"]:
+        results.update(bench_event_reads(workdir, event_count, repeat))
+    for task_count in profile["tasks"]:
+        results.update(bench_queue_writes(workdir, task_count, repeat))
+        results.update(bench_consistency(workdir, task_count, repeat))
+    return results
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Compare results with a baseline's results, flagging regressions.
+
+    ``ratio`` is current / baseline; a result regresses when it moved in its
+    worse direction by more than tolerance (as a fraction of the baseline).
+    """
+    comparison = []
+    for name in sorted(results):
+        current = results[name]
+        previous = baseline.get(name)
+        if not isinstance(previous, dict) or not previous.get("value"):
+            continue
+        ratio = current["value"] / previous["value"]
+        if current.get("better") == "higher":
+            regressed = ratio < 1.0 - tolerance
+        else:
+            regressed = ratio > 1.0 + tolerance
+        comparison.append(
+            {
+                "name": name,
+                "baseline": previous["value"],
+                "current": current["value"],
+                "unit": current["unit"],
+                "ratio": round(ratio, 4),
+                "regressed": regressed,
+            }
+        )
+    return comparison
+
+
+def _load_baseline(path: str) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as baseline_file:
+            document = json.load(baseline_file)
+    except FileNotFoundError:
+        return None
+    results = document.get("results") if isinstance(document, dict) else None
+    return results if isinstance(results, dict) else None
+
+
+def _write_json(path: str, document: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path) or ".", delete=False) as tmp:
+        json.dump(document, tmp, indent=2, sort_keys=True)
+        tmp.write("\n")
+    os.replace(tmp.name, path)
+
+
+def _sizes(text: str) -> tuple:
+    return tuple(int(size) for size in text.split(",") if size)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m acp_slice.benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--events", type=_sizes, help="comma-separated event log sizes (overrides the profile)")
+    parser.add_argument("--tasks", type=_sizes, help="comma-separated queue sizes (overrides the profile)")
+    parser.add_argument("--repeat", type=int, help="samples per latency benchmark (overrides the profile)")
+    parser.add_argument("--output", help="write the results document here instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--workdir", help="directory for scratch runtime roots (default: system temp)")
+    args = parser.parse_args(argv)
+
+    profile = dict(PROFILES[args.profile])
+    for key in ("events", "tasks", "repeat"):
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+
+    results = run_suite(profile, args.workdir)
+    document = {
+        "meta": {
+            "created_at": datetime.datetime.utcnow().isoformat(),
+            "profile": args.profile,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    baseline = _load_baseline(args.baseline)
+    regressed = []
+    if baseline is not None:
+        document["comparison"] = compare_results(results, baseline, args.tolerance)
+        regressed = [row["name"] for row in document["comparison"] if row["regressed"]]
+
+    if args.output:
+        _write_json(args.output, document)
+    else:
+        print(json.dumps(document, indent=2, sort_keys=True))
+    if args.update_baseline:
+        _write_json(args.baseline, {"meta": document["meta"], "results": results})
+    if regressed:
+        print(f"regressions beyond {args.tolerance:.0%}: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
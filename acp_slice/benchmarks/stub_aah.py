@@ -0,0 +1,85 @@
+"""Stand-in for the ``aah`` harness used by the load simulator.
+
+Accepts the runner's command line (``aah run --repo R --log L --label X -- argv``),
+sleeps for a sampled latency, appends log lines to ``--log`` and exits with a
+sampled exit code. Behaviour comes from the environment:
+
+- ``ACP_SIM_LATENCY``: ``fixed:S``, ``uniform:LO:HI``, ``exponential:MEAN`` or
+  ``lognormal:MEDIAN:SIGMA`` seconds (default ``fixed:0``).
+- ``ACP_SIM_EXIT_CODES``: weighted exit codes, ``CODE:WEIGHT,...`` (default ``0:1``).
+- ``ACP_SIM_LOG_LINES`` / ``ACP_SIM_LOG_LINE_BYTES``: log volume per run
+  (default 10 lines of 128 bytes).
+- ``ACP_SIM_SEED``: seed mixed with the label and pid.
+
+Only the standard library is imported, so a run costs one interpreter start.
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+
+
+def parse_latency(spec: str):
+    """Return a function drawing one latency in seconds from rng."""
+    name, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+    if name == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    if name == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"invalid latency distribution: {spec!r}")
+
+
+def parse_exit_codes(spec: str) -> tuple[list[int], list[float]]:
+    codes, weights = [], []
+    for item in spec.split(","):
+        code, _, weight = item.partition(":")
+        codes.append(int(code))
+        weights.append(float(weight) if weight else 1.0)
+    if not codes or sum(weights) <= 0:
+        raise ValueError(f"invalid exit code mix: {spec!r}")
+    return codes, weights
+
+
+def _option(argv: list[str], name: str) -> str | None:
+    if name in argv:
+        index = argv.index(name)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return None
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "run" or "--" not in argv:
+        print("usage: aah run --repo PATH --log PATH --label LABEL -- ARGV...", file=sys.stderr)
+        return 2
+    label = _option(argv, "--label") or ""
+    log_path = _option(argv, "--log")
+    rng = random.Random(f"{os.environ.get('ACP_SIM_SEED', '0')}:{label}:{os.getpid()}")
+
+    draw_latency = parse_latency(os.environ.get("ACP_SIM_LATENCY", "fixed:0"))
+    codes, weights = parse_exit_codes(os.environ.get("ACP_SIM_EXIT_CODES", "0:1"))
+    log_lines = int(os.environ.get("ACP_SIM_LOG_LINES", "10"))
+    line_bytes = int(os.environ.get("ACP_SIM_LOG_LINE_BYTES", "128"))
+
+    latency = max(0.0, draw_latency(rng))
+    exit_code = rng.choices(codes, weights)[0]
+    time.sleep(latency)
+    if log_path and log_lines > 0:
+        filler = "x" * max(0, line_bytes - 64)
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            for index in range(log_lines):
+                log_file.write(json.dumps({"label": label, "line": index, "data": filler}) + "\n")
+    print(json.dumps({"label": label, "latency": round(latency, 6), "exit_code": exit_code}))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
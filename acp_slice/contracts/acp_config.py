@@ -0,0 +1,23 @@
+"""Environment settings shared by the ACP modules.
+
+Every numeric ``ACP_*`` setting is a size, count, port or interval, so a
+value that does not parse, or is negative, falls back to the default.
+"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
@@ -26,8 +26,14 @@ RUNNER_EXCEPTION = "RUNNER_EXCEPTION"
 GATE_REFUSED = "GATE_REFUSED"
 VERIFICATION_FAILED = "VERIFICATION_FAILED"
 UNKNOWN_FAILURE = "UNKNOWN_FAILURE"
+HARNESS_TIMEOUT = "HARNESS_TIMEOUT"
+RUNNER_CANCELLED = "RUNNER_CANCELLED"
+ORPHANED_EVALUATING = "ORPHANED_EVALUATING"
 LOCK_HELD = "LOCK_HELD"
 
+# Admission rejection reasons
+DUPLICATE_TASK_ID = "DUPLICATE_TASK_ID"
+
 # Dead letter reasons
 INVARIANT_VIOLATION = "INVARIANT_VIOLATION"
 RETRIES_EXHAUSTED = "RETRIES_EXHAUSTED"
@@ -38,8 +44,10 @@ EVENT_STATUS_CHANGED = "EVENT_STATUS_CHANGED"
 EVENT_LOCK_ACQUIRED = "EVENT_LOCK_ACQUIRED"
 EVENT_LOCK_HELD = "EVENT_LOCK_HELD"
 EVENT_LOCK_RELEASED = "EVENT_LOCK_RELEASED"
+EVENT_LOCK_LOST = "EVENT_LOCK_LOST"
 EVENT_RUN_STARTED = "EVENT_RUN_STARTED"
 EVENT_RUN_FINISHED = "EVENT_RUN_FINISHED"
+EVENT_ORPHAN_RECOVERED = "EVENT_ORPHAN_RECOVERED"
 EVENT_GATES_EVALUATED = "EVENT_GATES_EVALUATED"
 EVENT_RETRY_SCHEDULED = "EVENT_RETRY_SCHEDULED"
 EVENT_DEAD_LETTERED = "EVENT_DEAD_LETTERED"
@@ -58,6 +66,25 @@ FIELD_INVARIANT_VIOLATION = "invariant_violation"
 FIELD_LAST_EXIT_CODE = "last_exit_code"
 FIELD_HARNESS_LOG_PATH = "harness_log_path"
 
+# Phase spans: monotonic durations in seconds, reported under PAYLOAD_SPANS in
+# EVENT_RUN_STARTED (phases so far), EVENT_GATES_EVALUATED (its own phase) and
+# EVENT_RUN_FINISHED (every phase of the attempt plus the total).
+PAYLOAD_SPANS = "spans"
+SPAN_CLAIM = "claim"
+SPAN_QUEUE_WRITE = "queue_write"
+SPAN_TASK_FILE_VALIDATION = "task_file_validation"
+SPAN_HARNESS = "harness"
+SPAN_TERMINAL_VALIDATION = "terminal_validation"
+SPAN_TOTAL = "total"
+SPANS = (
+    SPAN_CLAIM,
+    SPAN_QUEUE_WRITE,
+    SPAN_TASK_FILE_VALIDATION,
+    SPAN_HARNESS,
+    SPAN_TERMINAL_VALIDATION,
+    SPAN_TOTAL,
+)
+
 
 # Deterministic task lifecycle:
 # QUEUED can fail preflight checks before entering EVALUATING, so QUEUED->FAILED
@@ -0,0 +1,127 @@
+"""Date-partitioned archive of terminal queue rows.
+
+Rows moved out of the hot queue are appended to
+``archive/tasks-<YYYY-MM-DD>.jsonl`` next to ``tasks.jsonl``, partitioned by
+the UTC day they were archived. Partitions are append-only. Rows are written
+and fsynced before they are removed from the queue, so a crash in between
+leaves a row in both places (the queue copy wins) and never in neither.
+
+``find_archived_task`` looks rows up newest partition first through a
+per-process index of task_id -> line offset, extended as partitions grow.
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+from typing import Iterator
+
+from acp_slice.contracts.acp_contracts import COMPLETED, DEAD_LETTER, FIELD_TASK_ID, REFUSED
+
+
+ARCHIVE_DIR_NAME = "archive"
+ARCHIVE_PREFIX = "tasks-"
+ARCHIVE_SUFFIX = ".jsonl"
+ARCHIVABLE_STATUSES = {COMPLETED, REFUSED, DEAD_LETTER}
+
+# partition path -> (bytes indexed, {task_id: offset of its last row}).
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def archive_dir_for(path: str) -> str:
+    """Return the archive directory for a queue file (tasks.jsonl or its sqlite database)."""
+    return os.path.join(os.path.dirname(path) or ".", ARCHIVE_DIR_NAME)
+
+
+def archive_partitions(path: str) -> list[str]:
+    """Return the archive partition paths for a queue file, oldest first."""
+    directory = archive_dir_for(path)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    names = [name for name in names if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def append_archived_rows(path: str, tasks: list[dict], now: float | None = None) -> str | None:
+    """Durably append rows to today's partition; return its path.
+
+    Callers hold the queue's write lock, so appends never interleave.
+    """
+    if not tasks:
+        return None
+    now = time.time() if now is None else now
+    day = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc).strftime("%Y-%m-%d")
+    directory = archive_dir_for(path)
+    os.makedirs(directory, exist_ok=True)
+    partition = os.path.join(directory, f"{ARCHIVE_PREFIX}{day}{ARCHIVE_SUFFIX}")
+    data = "".join(json.dumps(task, sort_keys=True) + "\n" for task in tasks).encode("utf-8")
+    with open(partition, "a+b", buffering=0) as archive_file:
+        size = os.fstat(archive_file.fileno()).st_size
+        if size and os.pread(archive_file.fileno(), 1, size - 1) != b"\n":
+            # Terminate a torn line from a crashed archiver so it is skipped.
+            archive_file.write(b"\n")
+        archive_file.write(data)
+        os.fsync(archive_file.fileno())
+    return partition
+
+
+def _parse_row(raw_line: bytes) -> dict | None:
+    try:
+        task = json.loads(raw_line)
+    except ValueError:
+        return None
+    return task if isinstance(task, dict) else None
+
+
+def _partition_index(partition: str) -> dict:
+    """Return the partition's task_id -> offset map, indexing any new complete lines."""
+    with _INDEXES_LOCK:
+        indexed, offsets = _INDEXES.get(partition, (0, {}))
+        with open(partition, "rb") as archive_file:
+            archive_file.seek(indexed)
+            for raw_line in archive_file:
+                if not raw_line.endswith(b"\n"):
+                    break
+                task = _parse_row(raw_line)
+                if task is not None and isinstance(task.get(FIELD_TASK_ID), str):
+                    offsets[task[FIELD_TASK_ID]] = indexed
+                indexed += len(raw_line)
+        _INDEXES[partition] = (indexed, offsets)
+        return offsets
+
+
+def find_archived_task(path: str, task_id: str) -> dict | None:
+    """Return the most recently archived row for task_id, if any."""
+    for partition in reversed(archive_partitions(path)):
+        try:
+            offset = _partition_index(partition).get(task_id)
+            if offset is None:
+                continue
+            with open(partition, "rb") as archive_file:
+                archive_file.seek(offset)
+                return _parse_row(archive_file.readline())
+        except FileNotFoundError:
+            # Partition deleted by hand since it was listed.
+            with _INDEXES_LOCK:
+                _INDEXES.pop(partition, None)
+    return None
+
+
+def iter_archived_tasks(path: str) -> Iterator[dict]:
+    """Yield every archived row, oldest first."""
+    for partition in archive_partitions(path):
+        try:
+            archive_file = open(partition, "rb")
+        except FileNotFoundError:
+            continue
+        with archive_file:
+            for raw_line in archive_file:
+                if not raw_line.endswith(b"\n"):
+                    break
+                task = _parse_row(raw_line)
+                if task is not None:
+                    yield task
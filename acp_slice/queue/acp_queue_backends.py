@@ -0,0 +1,460 @@
+"""Pluggable queue storage backends shared by the runner and validators.
+
+A backend owns the persisted queue rows. The runner calls ``load()`` once per
+pass, walks ``due_tasks()`` and hands every changed row back to
+``save_task()``; validators look single tasks up with ``get_task()``. Rows are
+the same task dicts in every backend, so callers never see storage details.
+
+- ``jsonl``: each change appends one delta to the ``tasks.jsonl`` journal,
+  compacted into the file in the background (``journal`` storage, the
+  default), or ``tasks.jsonl`` is rewritten per change, re-reading the other
+  rows under the queue lock so concurrent writers are kept (``snapshot``
+  storage, O(rows) per change). QUEUED rows sit in a min-heap keyed by
+  ``next_attempt_at`` so a pass only visits due rows and the next deadline is
+  a heap peek.
+- ``sqlite``: ``tasks.sqlite3`` next to ``tasks.jsonl`` in WAL mode, one row
+  per task with ``status`` and ``next_attempt_at`` indexed, so finding the
+  next due task is an index lookup and each save updates a single row. It is
+  seeded from ``tasks.jsonl`` the first time it is created.
+
+Both backends move terminal rows to the same date-partitioned archive with
+``archive_tasks()`` (see ``acp_queue_archive``).
+"""
+
+import collections
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator
+
+from acp_slice.contracts.acp_config import env_int
+from acp_slice.contracts.acp_contracts import (
+    FIELD_NEXT_ATTEMPT_AT,
+    FIELD_STATUS,
+    FIELD_TASK_ID,
+    QUEUED,
+)
+from acp_slice.queue.acp_queue_archive import ARCHIVABLE_STATUSES, append_archived_rows, find_archived_task
+from acp_slice.queue.acp_queue_journal import (
+    DEFAULT_COMPACT_THRESHOLD_BYTES,
+    append_new_rows,
+    append_task_delta,
+    journal_keys,
+    load_tasks,
+    load_tasks_with_position,
+    maybe_compact_in_background,
+    read_deltas_since,
+    remove_rows,
+    write_snapshot_row,
+)
+
+
+QUEUE_BACKEND_JSONL = "jsonl"
+QUEUE_BACKEND_SQLITE = "sqlite"
+QUEUE_STORAGE_SNAPSHOT = "snapshot"
+QUEUE_STORAGE_JOURNAL = "journal"
+
+
+QUEUE_BACKEND = os.environ.get("ACP_QUEUE_BACKEND", QUEUE_BACKEND_JSONL)
+QUEUE_STORAGE = os.environ.get("ACP_QUEUE_STORAGE", QUEUE_STORAGE_JOURNAL)
+QUEUE_COMPACT_THRESHOLD_BYTES = env_int("ACP_QUEUE_COMPACT_BYTES", DEFAULT_COMPACT_THRESHOLD_BYTES)
+
+
+class QueueBackend:
+    """Interface every queue backend implements."""
+
+    def load(self) -> None:
+        """Refresh the rows the next pass works on."""
+        raise NotImplementedError
+
+    def due_tasks(self) -> Iterator[dict]:
+        """Yield QUEUED rows already due, in queue order."""
+        raise NotImplementedError
+
+    def tasks_with_status(self, status: str) -> list[dict]:
+        """Return the loaded rows in status, in queue order, ready for save_task()."""
+        raise NotImplementedError
+
+    def save_task(self, task: dict) -> None:
+        """Persist the current state of one row obtained from this backend."""
+        raise NotImplementedError
+
+    def lease_key(self, task: dict) -> str:
+        """Return a stable identity for a row, shared by every process."""
+        raise NotImplementedError
+
+    def reload_task(self, task: dict) -> bool:
+        """Refresh a row in place from storage; False if it no longer exists."""
+        raise NotImplementedError
+
+    def next_due_at(self) -> float | None:
+        """Return when the earliest QUEUED row becomes due (0.0 if one already
+        is), or None when nothing is queued."""
+        raise NotImplementedError
+
+    def get_task(self, task_id: str) -> dict | None:
+        """Return the first persisted row whose task_id matches, if any."""
+        raise NotImplementedError
+
+    def status_counts(self) -> dict[str, int]:
+        """Return {str(status): rows} without reading every row back from
+        storage; the jsonl backend counts the rows of its last load()."""
+        raise NotImplementedError
+
+    def all_tasks(self) -> list[dict]:
+        """Return every persisted row in queue order."""
+        raise NotImplementedError
+
+    def add_tasks(self, tasks: list[dict]) -> list[dict]:
+        """Append, in one write, the rows whose task_id is neither queued nor
+        archived yet; return the rows added, in order."""
+        raise NotImplementedError
+
+    def archive_tasks(self, task_ids: list[str]) -> list[dict]:
+        """Move the terminal rows of these tasks from the queue to the
+        archive and return the moved rows. Rows no longer terminal, or whose
+        task_id is not unique, stay in the queue; so do jsonl rows ahead of a
+        row addressed by position (see ``remove_rows``)."""
+        raise NotImplementedError
+
+
+def _due_at(task: dict) -> float:
+    next_attempt_at = task.get(FIELD_NEXT_ATTEMPT_AT)
+    return float(next_attempt_at) if isinstance(next_attempt_at, (int, float)) else 0.0
+
+
+class JsonlQueueBackend(QueueBackend):
+    def __init__(
+        self,
+        path: str,
+        storage: str = QUEUE_STORAGE_JOURNAL,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD_BYTES,
+    ) -> None:
+        self.path = path
+        self.storage = storage
+        self.compact_threshold = compact_threshold
+        self._tasks = []
+        self._keys = {}
+        self._indexes = {}
+        # (due_at, row index) for QUEUED rows. Entries go stale when a row
+        # leaves QUEUED or is rescheduled and are dropped when they surface.
+        self._deadlines = []
+        # Journal position of the loaded rows, and the rows changed since
+        # (by journal key) as seen by reload_task().
+        self._position = None
+        self._changed = {}
+        self._rebased = False
+
+    def load(self) -> None:
+        self._tasks, self._position = load_tasks_with_position(self.path)
+        self._changed = {}
+        self._rebased = False
+        self._keys = journal_keys(self._tasks)
+        self._indexes = {id(task): index for index, task in enumerate(self._tasks)}
+        self._deadlines = [
+            (_due_at(task), index) for index, task in enumerate(self._tasks) if task.get(FIELD_STATUS) == QUEUED
+        ]
+        heapq.heapify(self._deadlines)
+
+    def _is_current(self, entry: tuple) -> bool:
+        task = self._tasks[entry[1]]
+        return task.get(FIELD_STATUS) == QUEUED and _due_at(task) == entry[0]
+
+    def due_tasks(self) -> Iterator[dict]:
+        now = time.time()
+        due_indexes = set()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            entry = heapq.heappop(self._deadlines)
+            if self._is_current(entry):
+                due_indexes.add(entry[1])
+        pending = sorted(due_indexes)
+        try:
+            for index in pending:
+                task = self._tasks[index]
+                if task.get(FIELD_STATUS) == QUEUED:
+                    yield task
+        finally:
+            # Rows the caller skipped or stopped before stay scheduled.
+            for index in pending:
+                task = self._tasks[index]
+                if task.get(FIELD_STATUS) == QUEUED:
+                    heapq.heappush(self._deadlines, (_due_at(task), index))
+
+    def tasks_with_status(self, status: str) -> list[dict]:
+        return [task for task in self._tasks if isinstance(task, dict) and task.get(FIELD_STATUS) == status]
+
+    def next_due_at(self) -> float | None:
+        while self._deadlines and not self._is_current(self._deadlines[0]):
+            heapq.heappop(self._deadlines)
+        return self._deadlines[0][0] if self._deadlines else None
+
+    def lease_key(self, task: dict) -> str:
+        field, value = self._keys[id(task)]
+        return f"{field}:{value}"
+
+    def reload_task(self, task: dict) -> bool:
+        # Only the journal appended since the last look is read. A rewritten
+        # base (compaction, archiving, enqueues, snapshot storage) forces one
+        # full reload, whose rows then serve later reloads of this pass.
+        changed, self._position = read_deltas_since(self.path, self._position)
+        if changed is None:
+            tasks, self._position = load_tasks_with_position(self.path)
+            keys = journal_keys(tasks)
+            self._changed = {keys[id(row)]: row for row in tasks}
+            self._rebased = True
+        else:
+            self._changed.update(changed)
+        key = self._keys[id(task)]
+        row = self._changed.get(key)
+        if row is None:
+            if self._rebased:
+                return False
+            # Unchanged since load(); the loaded row is current.
+            row = task
+        if not isinstance(row, dict):
+            return False
+        if row is not task:
+            task.clear()
+            task.update(row)
+        if task.get(FIELD_STATUS) == QUEUED:
+            heapq.heappush(self._deadlines, (_due_at(task), self._indexes[id(task)]))
+        return True
+
+    def save_task(self, task: dict) -> None:
+        if task.get(FIELD_STATUS) == QUEUED:
+            heapq.heappush(self._deadlines, (_due_at(task), self._indexes[id(task)]))
+        if self.storage == QUEUE_STORAGE_SNAPSHOT:
+            write_snapshot_row(self.path, self._keys[id(task)], task)
+            return
+        journal_size = append_task_delta(self.path, self._keys[id(task)], task)
+        maybe_compact_in_background(self.path, journal_size, self.compact_threshold)
+
+    def status_counts(self) -> dict[str, int]:
+        return collections.Counter(str(task.get(FIELD_STATUS)) for task in self._tasks if isinstance(task, dict))
+
+    def get_task(self, task_id: str) -> dict | None:
+        for task in self.all_tasks():
+            if task.get(FIELD_TASK_ID) == task_id:
+                return task
+        return None
+
+    def all_tasks(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        return load_tasks(self.path, strict=False)
+
+    def add_tasks(self, tasks: list[dict]) -> list[dict]:
+        return append_new_rows(self.path, tasks, lambda task_id: find_archived_task(self.path, task_id) is not None)
+
+    def archive_tasks(self, task_ids: list[str]) -> list[dict]:
+        wanted = set(task_ids)
+        return remove_rows(
+            self.path,
+            lambda task: task.get(FIELD_TASK_ID) in wanted and task.get(FIELD_STATUS) in ARCHIVABLE_STATUSES,
+            lambda removed: append_archived_rows(self.path, removed),
+        )
+
+
+_SQLITE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        seq INTEGER PRIMARY KEY,
+        task_id TEXT,
+        status TEXT,
+        next_attempt_at REAL,
+        body TEXT NOT NULL
+    )
+    """,
+    # (status, seq) order for "next QUEUED row after seq".
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)",
+    # Earliest deadline among rows of a status.
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_next_attempt ON tasks (status, next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_task_id ON tasks (task_id)",
+)
+
+
+def _row_columns(task: dict) -> tuple:
+    task_id = task.get(FIELD_TASK_ID)
+    status = task.get(FIELD_STATUS)
+    next_attempt_at = task.get(FIELD_NEXT_ATTEMPT_AT)
+    return (
+        task_id if isinstance(task_id, str) else None,
+        status if isinstance(status, str) else None,
+        float(next_attempt_at) if isinstance(next_attempt_at, (int, float)) else None,
+        json.dumps(task, sort_keys=True),
+    )
+
+
+class SqliteQueueBackend(QueueBackend):
+    def __init__(self, db_path: str, seed_path: str | None = None) -> None:
+        self.db_path = db_path
+        self._seqs = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            # The write lock makes concurrent first opens seed exactly once;
+            # user_version marks a database that has been initialised.
+            self._conn.execute("BEGIN IMMEDIATE")
+            for statement in _SQLITE_SCHEMA:
+                self._conn.execute(statement)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                is_empty = self._conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+                if is_empty and seed_path is not None and os.path.exists(seed_path):
+                    self._insert_rows(load_tasks(seed_path, strict=False))
+                self._conn.execute("PRAGMA user_version = 1")
+
+    def _track(self, seq: int, body: str) -> dict:
+        task = json.loads(body)
+        self._seqs[id(task)] = seq
+        return task
+
+    def load(self) -> None:
+        # Rows are read on demand; drop handles from the previous pass.
+        with self._lock:
+            self._seqs = {}
+
+    def due_tasks(self) -> Iterator[dict]:
+        last_seq = -1
+        while True:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT seq, body FROM tasks"
+                    " WHERE status = ? AND seq > ?"
+                    " AND (next_attempt_at IS NULL OR next_attempt_at <= ?)"
+                    " ORDER BY seq LIMIT 1",
+                    (QUEUED, last_seq, time.time()),
+                ).fetchone()
+                if row is None:
+                    return
+                last_seq = row[0]
+                task = self._track(row[0], row[1])
+            yield task
+
+    def tasks_with_status(self, status: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT seq, body FROM tasks WHERE status = ? ORDER BY seq", (status,)).fetchall()
+            return [self._track(seq, body) for seq, body in rows]
+
+    def next_due_at(self) -> float | None:
+        with self._lock:
+            if self._conn.execute(
+                "SELECT 1 FROM tasks WHERE status = ? AND next_attempt_at IS NULL LIMIT 1", (QUEUED,)
+            ).fetchone():
+                return 0.0
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM tasks WHERE status = ?", (QUEUED,)
+            ).fetchone()
+            return row[0]
+
+    def lease_key(self, task: dict) -> str:
+        return f"seq:{self._seqs[id(task)]}"
+
+    def reload_task(self, task: dict) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM tasks WHERE seq = ?", (self._seqs[id(task)],)).fetchone()
+        if row is None:
+            return False
+        task.clear()
+        task.update(json.loads(row[0]))
+        return True
+
+    def save_task(self, task: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET task_id = ?, status = ?, next_attempt_at = ?, body = ? WHERE seq = ?",
+                _row_columns(task) + (self._seqs[id(task)],),
+            )
+
+    def insert_tasks(self, tasks: list[dict]) -> None:
+        """Append rows in one transaction."""
+        with self._lock, self._conn:
+            self._insert_rows(tasks)
+
+    def _insert_rows(self, tasks: list[dict]) -> None:
+        self._conn.executemany(
+            "INSERT INTO tasks (task_id, status, next_attempt_at, body) VALUES (?, ?, ?, ?)",
+            [_row_columns(task) for task in tasks if isinstance(task, dict)],
+        )
+
+    def get_task(self, task_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, body FROM tasks WHERE task_id = ? ORDER BY seq LIMIT 1", (task_id,)
+            ).fetchone()
+            return None if row is None else self._track(row[0], row[1])
+
+    def status_counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {str(status): count for status, count in rows}
+
+    def all_tasks(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT seq, body FROM tasks ORDER BY seq").fetchall()
+            return [self._track(seq, body) for seq, body in rows]
+
+    def add_tasks(self, tasks: list[dict]) -> list[dict]:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            taken = set()
+            added = []
+            for task in tasks:
+                task_id = task.get(FIELD_TASK_ID)
+                if task_id in taken:
+                    continue
+                taken.add(task_id)
+                if self._conn.execute("SELECT 1 FROM tasks WHERE task_id = ? LIMIT 1", (task_id,)).fetchone():
+                    continue
+                if find_archived_task(self.db_path, task_id) is not None:
+                    continue
+                added.append(task)
+            self._insert_rows(added)
+            return added
+
+    def archive_tasks(self, task_ids: list[str]) -> list[dict]:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            seqs = []
+            archived = []
+            for task_id in dict.fromkeys(task_ids):
+                rows = self._conn.execute(
+                    "SELECT seq, status, body FROM tasks WHERE task_id = ? ORDER BY seq LIMIT 2", (task_id,)
+                ).fetchall()
+                if len(rows) == 1 and rows[0][1] in ARCHIVABLE_STATUSES:
+                    seqs.append((rows[0][0],))
+                    archived.append(json.loads(rows[0][2]))
+            # Archived first: if the delete fails the rows stay in the queue too.
+            append_archived_rows(self.db_path, archived)
+            self._conn.executemany("DELETE FROM tasks WHERE seq = ?", seqs)
+            return archived
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def sqlite_path_for(tasks_path: str) -> str:
+    return os.path.splitext(tasks_path)[0] + ".sqlite3"
+
+
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_queue_backend(tasks_path: str) -> QueueBackend:
+    """Return the configured backend for tasks_path, reusing it per process."""
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(tasks_path)
+        if backend is None:
+            if QUEUE_BACKEND == QUEUE_BACKEND_SQLITE:
+                backend = SqliteQueueBackend(sqlite_path_for(tasks_path), seed_path=tasks_path)
+            else:
+                backend = JsonlQueueBackend(tasks_path, QUEUE_STORAGE, QUEUE_COMPACT_THRESHOLD_BYTES)
+            _BACKENDS[tasks_path] = backend
+        return backend
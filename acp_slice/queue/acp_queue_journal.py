@@ -0,0 +1,319 @@
+"""Append-only journal of per-task queue deltas over a tasks.jsonl snapshot.
+
+``tasks.jsonl`` stays the compacted base. Each persisted task change appends
+one full-row delta to ``tasks.jsonl.journal``::
+
+    {"task": {...}, "task_id": "<id>"}   # first row carrying that task_id
+    {"row": <n>, "task": {...}}          # any other row, by position
+
+Loading folds the journal over the base in order. Deltas replace whole rows,
+so replaying a journal twice is harmless; a torn final line is skipped. That
+keeps crash behaviour equivalent to the temp-file-plus-replace snapshot:
+every task change is either fully visible or not at all. Compaction folds
+the journal into a new base with the same atomic replace and then drops it.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+JOURNAL_SUFFIX = ".journal"
+LOCK_SUFFIX = ".lock"
+DEFAULT_COMPACT_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+_COMPACTIONS = {}
+_COMPACTIONS_LOCK = threading.Lock()
+
+
+def journal_path_for(path: str) -> str:
+    return path + JOURNAL_SUFFIX
+
+
+@contextmanager
+def _queue_lock(path: str, exclusive: bool):
+    # Appends and loads share the lock; rewrites of the base take it
+    # exclusively. flock is per open file, so threads exclude each other too.
+    with open(path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_base(path: str, strict: bool) -> list:
+    tasks = []
+    with open(path, "r", encoding="utf-8") as tasks_file:
+        for line in tasks_file:
+            line = line.strip()
+            if not line:
+                continue
+            if strict:
+                tasks.append(json.loads(line))
+                continue
+            try:
+                item = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(item, dict):
+                tasks.append(item)
+    return tasks
+
+
+def _read_journal(path: str, start: int = 0) -> tuple[list[dict], int]:
+    """Return the deltas of the complete journal lines from byte offset start,
+    and the offset just past them."""
+    deltas = []
+    try:
+        journal_file = open(journal_path_for(path), "rb")
+    except FileNotFoundError:
+        return deltas, start
+    with journal_file:
+        journal_file.seek(start)
+        end = start
+        for line in journal_file:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            try:
+                delta = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(delta, dict) and isinstance(delta.get("task"), dict):
+                deltas.append(delta)
+    return deltas, end
+
+
+def _base_signature(path: str) -> tuple | None:
+    # Every rewrite of the base replaces the file, so a new signature means
+    # the journal offsets taken against the old base no longer apply.
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _fold(tasks: list, deltas: list[dict]) -> list:
+    first_rows = {}
+    for index, task in enumerate(tasks):
+        if isinstance(task, dict) and isinstance(task.get("task_id"), str):
+            first_rows.setdefault(task["task_id"], index)
+    for delta in deltas:
+        if "task_id" in delta:
+            index = first_rows.get(delta["task_id"])
+        else:
+            index = delta.get("row")
+        if isinstance(index, int) and 0 <= index < len(tasks):
+            tasks[index] = delta["task"]
+    return tasks
+
+
+def load_tasks(path: str, strict: bool = True) -> list:
+    """Load the base snapshot with any journaled deltas folded in.
+
+    With ``strict`` a malformed base line raises, as the runner expects;
+    otherwise malformed lines and non-object rows are skipped.
+    """
+    with _queue_lock(path, exclusive=False):
+        return _fold(_read_base(path, strict), _read_journal(path)[0])
+
+
+def load_tasks_with_position(path: str, strict: bool = True) -> tuple[list, tuple]:
+    """Like load_tasks, also returning the position the rows are current as
+    of, to pass to read_deltas_since()."""
+    with _queue_lock(path, exclusive=False):
+        signature = _base_signature(path)
+        tasks = _read_base(path, strict)
+        deltas, end = _read_journal(path)
+        return _fold(tasks, deltas), (signature, end)
+
+
+def read_deltas_since(path: str, position: tuple) -> tuple[dict | None, tuple]:
+    """Return ({journal key: row} for the deltas appended since position, the
+    new position), reading only the journal tail. Returns (None, position)
+    when the base has been rewritten since, so the rows must be reloaded."""
+    with _queue_lock(path, exclusive=False):
+        if _base_signature(path) != position[0]:
+            return None, position
+        deltas, end = _read_journal(path, position[1])
+    rows = {}
+    for delta in deltas:
+        key = ("task_id", delta["task_id"]) if "task_id" in delta else ("row", delta.get("row"))
+        rows[key] = delta["task"]
+    return rows, (position[0], end)
+
+
+def journal_keys(tasks: list) -> dict:
+    """Map id(task) to the journal key that addresses that row."""
+    keys = {}
+    seen_task_ids = set()
+    for index, task in enumerate(tasks):
+        task_id = task.get("task_id") if isinstance(task, dict) else None
+        if isinstance(task_id, str) and task_id not in seen_task_ids:
+            seen_task_ids.add(task_id)
+            keys[id(task)] = ("task_id", task_id)
+        else:
+            keys[id(task)] = ("row", index)
+    return keys
+
+
+def row_index_for_key(tasks: list, key: tuple) -> int | None:
+    """Return the index of the row a journal key addresses, if present."""
+    field, value = key
+    if field == "row":
+        return value if isinstance(value, int) and 0 <= value < len(tasks) else None
+    for index, task in enumerate(tasks):
+        if isinstance(task, dict) and task.get("task_id") == value:
+            return index
+    return None
+
+
+def append_task_delta(path: str, key: tuple, task: dict) -> int:
+    """Append one full-row delta and return the journal size afterwards."""
+    field, value = key
+    line = (json.dumps({field: value, "task": task}, sort_keys=True) + "\n").encode("utf-8")
+    with _queue_lock(path, exclusive=False):
+        with open(journal_path_for(path), "a+b", buffering=0) as journal_file:
+            size = os.fstat(journal_file.fileno()).st_size
+            if size and os.pread(journal_file.fileno(), 1, size - 1) != b"\n":
+                # Terminate a torn line from a crashed writer so it is skipped
+                # instead of swallowing this delta.
+                journal_file.write(b"\n")
+            journal_file.write(line)
+            return journal_file.tell()
+
+
+def _write_base_atomic(path: str, tasks: list) -> None:
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=directory, delete=False
+    ) as tmp_file:
+        for task in tasks:
+            tmp_file.write(json.dumps(task, sort_keys=True) + "\n")
+        temp_path = tmp_file.name
+    os.replace(temp_path, path)
+
+
+def write_snapshot(path: str, tasks: list) -> None:
+    """Atomically replace the base with tasks and drop any stale journal."""
+    with _queue_lock(path, exclusive=True):
+        _write_base_atomic(path, tasks)
+        if os.path.exists(journal_path_for(path)):
+            os.remove(journal_path_for(path))
+
+
+def write_snapshot_row(path: str, key: tuple, task: dict) -> None:
+    """Replace one row in the current base under the exclusive lock.
+
+    Rows are re-read first, so changes other processes made to other rows
+    (or rows appended since this process loaded) are kept.
+    """
+    with _queue_lock(path, exclusive=True):
+        tasks = _fold(_read_base(path, strict=True), _read_journal(path)[0])
+        index = row_index_for_key(tasks, key)
+        if index is None:
+            return
+        tasks[index] = task
+        _write_base_atomic(path, tasks)
+        if os.path.exists(journal_path_for(path)):
+            os.remove(journal_path_for(path))
+
+
+def append_new_rows(path: str, tasks: list[dict], is_taken) -> list[dict]:
+    """Append the rows whose task_id is neither in the queue nor
+    is_taken(task_id) in one atomic rewrite of the base, and return them.
+
+    The check and the write share the exclusive lock, so concurrent callers
+    never both add the same task_id. Appended rows never shift row keys.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _queue_lock(path, exclusive=True):
+        existing = []
+        if os.path.exists(path):
+            existing = _fold(_read_base(path, strict=True), _read_journal(path)[0])
+        taken = {task.get("task_id") for task in existing if isinstance(task, dict)}
+        added = []
+        for task in tasks:
+            task_id = task.get("task_id")
+            if task_id in taken or is_taken(task_id):
+                continue
+            taken.add(task_id)
+            added.append(task)
+        if not added:
+            return []
+        _write_base_atomic(path, existing + added)
+        if os.path.exists(journal_path_for(path)):
+            os.remove(journal_path_for(path))
+    return added
+
+
+def remove_rows(path: str, should_remove, before_replace) -> list[dict]:
+    """Drop the rows should_remove(task) selects from the base, under the
+    exclusive lock, and return them.
+
+    before_replace(removed) runs before the new base is written. Only rows
+    addressed by task_id and placed after every row addressed by position
+    are removed, so no row key held by another process ever shifts.
+    """
+    with _queue_lock(path, exclusive=True):
+        tasks = _fold(_read_base(path, strict=True), _read_journal(path)[0])
+        keys = journal_keys(tasks)
+        first_movable = 0
+        for index, task in enumerate(tasks):
+            if keys[id(task)][0] == "row":
+                first_movable = index + 1
+        removed = [
+            task for index, task in enumerate(tasks) if index >= first_movable and should_remove(task)
+        ]
+        if not removed:
+            return []
+        before_replace(removed)
+        removed_ids = {id(task) for task in removed}
+        _write_base_atomic(path, [task for task in tasks if id(task) not in removed_ids])
+        if os.path.exists(journal_path_for(path)):
+            os.remove(journal_path_for(path))
+    return removed
+
+
+def compact_journal(path: str) -> None:
+    with _queue_lock(path, exclusive=True):
+        deltas = _read_journal(path)[0]
+        if not deltas:
+            return
+        _write_base_atomic(path, _fold(_read_base(path, strict=True), deltas))
+        # A crash here only replays already-folded deltas on the next load.
+        os.remove(journal_path_for(path))
+
+
+def _run_compaction(path: str) -> None:
+    try:
+        compact_journal(path)
+    except Exception:
+        # Compaction is an optimization; the journal stays authoritative.
+        pass
+    finally:
+        with _COMPACTIONS_LOCK:
+            _COMPACTIONS.pop(path, None)
+
+
+def maybe_compact_in_background(path: str, journal_size: int, threshold: int) -> None:
+    if threshold <= 0 or journal_size < threshold:
+        return
+    with _COMPACTIONS_LOCK:
+        if path in _COMPACTIONS:
+            return
+        thread = threading.Thread(target=_run_compaction, args=(path,), name="acp-queue-compaction", daemon=True)
+        _COMPACTIONS[path] = thread
+    thread.start()
+
+
+def wait_for_compaction(path: str) -> None:
+    with _COMPACTIONS_LOCK:
+        thread = _COMPACTIONS.get(path)
+    if thread is not None:
+        thread.join()
@@ -0,0 +1,138 @@
+"""Wake the runner when queue storage changes.
+
+``QueueWatcher`` watches the directory holding ``tasks.jsonl`` (atomic
+snapshot writes replace the file, so watching the file itself would lose the
+watch) and reports changes to the queue files only, so lock-file churn from
+loads does not wake an idle runner. On Linux it uses inotify through ctypes;
+elsewhere, or if inotify is unavailable, it polls the files' (inode, mtime,
+size) signatures.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from acp_slice.queue.acp_queue_journal import journal_path_for
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL_SECONDS = 2.0
+
+
+def watched_paths_for(tasks_path: str) -> list[str]:
+    """Files whose changes can make queued work appear, for every backend."""
+    sqlite_path = os.path.splitext(tasks_path)[0] + ".sqlite3"
+    return [tasks_path, journal_path_for(tasks_path), sqlite_path, sqlite_path + "-wal"]
+
+
+def _signature(path: str) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _open_inotify(directory: str) -> int | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class QueueWatcher:
+    def __init__(self, tasks_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS) -> None:
+        self.paths = watched_paths_for(tasks_path)
+        self.poll_interval = poll_interval
+        self._names = {os.fsencode(os.path.basename(path)) for path in self.paths}
+        self._fd = _open_inotify(os.path.dirname(tasks_path) or ".")
+        self._signatures = self._snapshot()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _snapshot(self) -> list:
+        return [_signature(path) for path in self.paths]
+
+    def _drain_inotify(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except OSError as exc:
+                if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return changed
+                raise
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, _, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = data[start : start + name_length].rstrip(b"\0")
+                if name in self._names:
+                    changed = True
+                offset = start + name_length
+
+    def drain(self) -> None:
+        """Forget changes seen so far, typically the runner's own writes."""
+        if self._fd is not None:
+            self._drain_inotify()
+        self._signatures = self._snapshot()
+
+    def fileno(self) -> int | None:
+        """The inotify descriptor, readable when poll() may report a change."""
+        return self._fd
+
+    def poll(self) -> bool:
+        """Return True if a queue file changed since the last check, without blocking."""
+        if self._fd is not None:
+            return self._drain_inotify()
+        signatures = self._snapshot()
+        if signatures != self._signatures:
+            self._signatures = signatures
+            return True
+        return False
+
+    def wait(self, timeout: float | None) -> bool:
+        """Block until a queue file changes or timeout elapses; True on change."""
+        deadline = None if timeout is None else time.monotonic() + max(timeout, 0.0)
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self._fd is not None:
+                readable, _, _ = select.select([self._fd], [], [], remaining)
+                if readable and self.poll():
+                    return True
+                continue
+            time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+            if self.poll():
+                return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,198 @@
+"""Per-task leases so several runner processes can share one queue.
+
+A lease is a small JSON file under ``queue/leases/`` named after a hash of the
+row's ``lease_key``::
+
+    {"expires_at": 1700000030.0, "lease_key": "task_id:t1", "owner": "host:pid:nonce"}
+
+Every read-modify-write of a lease file happens under ``flock`` on that file,
+which Linux also provides over NFS, so runners on several hosts sharing the
+runtime root agree on one owner. Locks are held only for the update, never
+for the lease's lifetime: a crashed runner leaves a lease that simply expires
+and is reclaimed by the next runner that wants the row. Holders renew their
+leases from a heartbeat thread every third of the TTL, and confirm with
+``owns()`` before writing a leased row, since a pause longer than the TTL
+can hand the row to another runner before the heartbeat notices.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+from acp_slice.contracts.acp_contracts import LOCK_HELD
+
+
+DEFAULT_LEASE_TTL_SECONDS = 30.0
+LEASE_SUFFIX = ".lease"
+
+
+def lease_dir_for(tasks_path: str) -> str:
+    return os.path.join(os.path.dirname(tasks_path) or ".", "leases")
+
+
+def _default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _read_lease(lease_file) -> dict | None:
+    lease_file.seek(0)
+    try:
+        lease = json.loads(lease_file.read() or "null")
+    except ValueError:
+        return None
+    return lease if isinstance(lease, dict) else None
+
+
+def _write_lease(lease_file, lease: dict) -> None:
+    lease_file.seek(0)
+    lease_file.truncate()
+    lease_file.write(json.dumps(lease, sort_keys=True))
+    lease_file.flush()
+    os.fsync(lease_file.fileno())
+
+
+class TaskLeases:
+    def __init__(self, lease_dir: str, ttl: float = DEFAULT_LEASE_TTL_SECONDS, owner: str | None = None) -> None:
+        self.lease_dir = lease_dir
+        self.ttl = ttl
+        self.owner = owner or _default_owner()
+        self._held = {}
+        # Keys taken over by another owner while this one held them.
+        self._lost = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+        os.makedirs(lease_dir, exist_ok=True)
+
+    def _path(self, lease_key: str) -> str:
+        digest = hashlib.sha1(lease_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.lease_dir, digest + LEASE_SUFFIX)
+
+    def _open_locked(self, lease_key: str):
+        # Releasing unlinks the file while holding its lock, so re-check that
+        # the locked inode is still the one at the path.
+        path = self._path(lease_key)
+        while True:
+            lease_file = open(path, "a+", encoding="utf-8")
+            fcntl.flock(lease_file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(lease_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return lease_file
+            except FileNotFoundError:
+                pass
+            lease_file.close()
+
+    def acquire(self, lease_key: str) -> dict:
+        """Claim lease_key, returning {"acquired": bool, ...}.
+
+        A failed claim reports ``reason`` ``LOCK_HELD`` with the current owner
+        and expiry; a claim over an expired lease reports ``reclaimed_from``.
+        """
+        with self._lock:
+            with self._open_locked(lease_key) as lease_file:
+                now = time.time()
+                current = _read_lease(lease_file)
+                result = {"acquired": True}
+                if current is not None and current.get("owner") != self.owner:
+                    expires_at = current.get("expires_at")
+                    if isinstance(expires_at, (int, float)) and expires_at > now:
+                        return {
+                            "acquired": False,
+                            "reason": LOCK_HELD,
+                            "owner": current.get("owner"),
+                            "expires_at": expires_at,
+                        }
+                    result["reclaimed_from"] = current.get("owner")
+                lease = {"owner": self.owner, "lease_key": lease_key, "expires_at": now + self.ttl}
+                _write_lease(lease_file, lease)
+                self._held[lease_key] = lease["expires_at"]
+                self._lost.discard(lease_key)
+            self._start_heartbeat()
+        result.update(owner=self.owner, expires_at=lease["expires_at"])
+        return result
+
+    def release(self, lease_key: str) -> bool:
+        """Drop a lease this owner holds; False if it was lost meanwhile."""
+        with self._lock:
+            if self._held.pop(lease_key, None) is None:
+                return False
+            with self._open_locked(lease_key) as lease_file:
+                current = _read_lease(lease_file)
+                if current is None or current.get("owner") != self.owner:
+                    return False
+                os.remove(self._path(lease_key))
+                return True
+
+    def renew(self) -> list[str]:
+        """Extend every held lease; return the keys lost to another owner."""
+        lost = []
+        with self._lock:
+            for lease_key in list(self._held):
+                with self._open_locked(lease_key) as lease_file:
+                    current = _read_lease(lease_file)
+                    if current is None or current.get("owner") != self.owner:
+                        lost.append(lease_key)
+                        del self._held[lease_key]
+                        self._lost.add(lease_key)
+                        continue
+                    current["expires_at"] = time.time() + self.ttl
+                    _write_lease(lease_file, current)
+                    self._held[lease_key] = current["expires_at"]
+        return lost
+
+    def owns(self, lease_key: str) -> bool:
+        """Return whether this owner still holds lease_key, checked against
+        the lease file. A lapsed lease nobody reclaimed is renewed on the spot."""
+        with self._lock:
+            if lease_key not in self._held:
+                return False
+            with self._open_locked(lease_key) as lease_file:
+                current = _read_lease(lease_file)
+                if current is None or current.get("owner") != self.owner:
+                    del self._held[lease_key]
+                    self._lost.add(lease_key)
+                    return False
+                expires_at = current.get("expires_at")
+                if not isinstance(expires_at, (int, float)) or expires_at <= time.time():
+                    current["expires_at"] = time.time() + self.ttl
+                    _write_lease(lease_file, current)
+                    self._held[lease_key] = current["expires_at"]
+                return True
+
+    def held(self) -> list[str]:
+        with self._lock:
+            return list(self._held)
+
+    def lost(self) -> list[str]:
+        with self._lock:
+            return sorted(self._lost)
+
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            return
+        self._heartbeat = threading.Thread(target=self._run_heartbeat, name="acp-lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _run_heartbeat(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except Exception:
+                # A failed renewal is retried on the next beat; the lease only
+                # lapses if renewals keep failing for a whole TTL.
+                pass
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        for lease_key in self.held():
+            try:
+                self.release(lease_key)
+            except Exception:
+                pass
@@ -0,0 +1,224 @@
+"""asyncio ACP queue runner with harness timeouts and SIGTERM cancellation.
+
+Passes follow the same phases as ``acp_run_loop.main``. Harness processes run
+through ``asyncio.create_subprocess_exec``, at most ``max_concurrency`` at a
+time. Each one is bounded by ``harness_timeout_seconds`` from config.json and
+fails with ``HARNESS_TIMEOUT`` when it runs over. SIGTERM or SIGINT stops
+admission, kills in-flight harnesses and fails their tasks with
+``RUNNER_CANCELLED`` (retrying where eligible), so no task is left in
+EVALUATING. Every queue write and event still happens on the event loop
+thread. In ``--loop`` mode an idle runner waits, like ``run_forever``, for
+the next due task, the next housekeeping deadline or a queue file change.
+"""
+
+import asyncio
+import signal
+import subprocess
+import sys
+import time
+
+from acp_slice.contracts.acp_contracts import FIELD_TASK_ID, RUNNER_CANCELLED, SPAN_HARNESS
+from acp_slice.queue.acp_queue_backends import QueueBackend, get_queue_backend
+from acp_slice.queue.acp_queue_watch import QueueWatcher
+from acp_slice.runners.acp_run_loop import (
+    TASKS_PATH,
+    _archive_validated_tasks,
+    _claim_task,
+    _complete_task,
+    _finish_task,
+    _harness_command,
+    _idle_delay,
+    _is_due,
+    _kill_process_group,
+    _lease_lost,
+    _load_harness_timeout,
+    _load_queue,
+    _load_max_concurrency,
+    _load_max_tasks_per_run,
+    _load_task_leases,
+    _mark_failed,
+    _maybe_apply_event_retention,
+    _phase,
+    _prepare_task,
+    _recover_orphaned_tasks,
+    _start_metrics,
+)
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH, flush_events
+from acp_slice.telemetry.acp_lifecycle_checkpoint import maybe_write_checkpoint
+from acp_slice.telemetry.acp_metrics import HARNESS_RUN_SECONDS
+
+
+async def _kill_harness(process: asyncio.subprocess.Process) -> None:
+    _kill_process_group(process.pid)
+    await process.wait()
+
+
+async def _run_harness_async(
+    task_id: str, task_payload: dict, timeout: float | None
+) -> subprocess.CompletedProcess[str] | Exception:
+    try:
+        command = _harness_command(task_id, task_payload)
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+    except Exception as exc:
+        return exc
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill_harness(process)
+        return subprocess.TimeoutExpired(command, timeout)
+    except asyncio.CancelledError:
+        await _kill_harness(process)
+        raise
+    return subprocess.CompletedProcess(
+        command,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def _run_task(
+    backend: QueueBackend, task: dict, current_time: float, task_payload: dict, timeout: float | None
+) -> None:
+    try:
+        with _phase(task, SPAN_HARNESS, HARNESS_RUN_SECONDS):
+            result = await _run_harness_async(task[FIELD_TASK_ID], task_payload, timeout)
+    except asyncio.CancelledError:
+        if not _lease_lost(task):
+            _mark_failed(task, RUNNER_CANCELLED)
+            _finish_task(backend, task, current_time)
+        raise
+    _complete_task(backend, task, current_time, result)
+
+
+async def _run_pass(backend: QueueBackend, stop: asyncio.Event, in_flight: set) -> int:
+    _load_queue(backend)
+    max_tasks_per_run = _load_max_tasks_per_run()
+    slots = asyncio.Semaphore(_load_max_concurrency())
+    harness_timeout = _load_harness_timeout()
+    leases = _load_task_leases()
+    _recover_orphaned_tasks(backend, leases)
+    processed_count = 0
+
+    for task in backend.due_tasks():
+        if processed_count >= max_tasks_per_run or stop.is_set():
+            break
+        if not _is_due(task, time.time()):
+            continue
+
+        await slots.acquire()
+        current_time = time.time()
+        if stop.is_set():
+            slots.release()
+            break
+        if not _claim_task(backend, task, leases, current_time):
+            slots.release()
+            continue
+        processed_count += 1
+        task_payload = _prepare_task(backend, task, current_time)
+        if task_payload is None:
+            slots.release()
+            continue
+        runner = asyncio.create_task(_run_task(backend, task, current_time, task_payload, harness_timeout))
+        in_flight.add(runner)
+        runner.add_done_callback(in_flight.discard)
+        runner.add_done_callback(lambda _: slots.release())
+
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    _archive_validated_tasks(backend)
+    return processed_count
+
+
+async def _wait_for_queue_change(watcher: QueueWatcher, stop: asyncio.Event, timeout: float | None) -> None:
+    """Return once stop is set, a queue file changes or timeout elapses."""
+    event_loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else event_loop.time() + timeout
+    wake = asyncio.Event()
+    fd = watcher.fileno()
+    if fd is not None:
+        event_loop.add_reader(fd, wake.set)
+    stopped = asyncio.create_task(stop.wait())
+    stopped.add_done_callback(lambda _: wake.set())
+    try:
+        while not stop.is_set():
+            remaining = None if deadline is None else deadline - event_loop.time()
+            if remaining is not None and remaining <= 0:
+                return
+            if fd is None:
+                # Stat polling fallback.
+                remaining = watcher.poll_interval if remaining is None else min(watcher.poll_interval, remaining)
+            try:
+                await asyncio.wait_for(wake.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            if watcher.poll():
+                return
+    finally:
+        stopped.cancel()
+        if fd is not None:
+            event_loop.remove_reader(fd)
+
+
+async def run_async(loop_forever: bool = False, poll_interval: float = 2.0) -> int:
+    """Run one pass (or passes until signalled) and return the exit code.
+
+    poll_interval is only used by the stat-polling fallback when inotify is
+    unavailable.
+    """
+    stop = asyncio.Event()
+    event_loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        event_loop.add_signal_handler(signum, stop.set)
+
+    in_flight = set()
+
+    async def cancel_on_stop() -> None:
+        await stop.wait()
+        for runner in list(in_flight):
+            runner.cancel()
+
+    canceller = asyncio.create_task(cancel_on_stop())
+    backend = get_queue_backend(TASKS_PATH)
+    exporter = _start_metrics(serve_http=loop_forever)
+    watcher = QueueWatcher(TASKS_PATH, poll_interval) if loop_forever else None
+    retention_due_at = time.monotonic()
+    try:
+        while True:
+            if watcher is not None:
+                # As in run_forever: changes from here on, including this
+                # pass's own writes, wake the next wait.
+                watcher.drain()
+            processed_count = await _run_pass(backend, stop, in_flight)
+            exporter.maybe_write()
+            maybe_write_checkpoint(EVENTS_LOG_PATH)
+            if not loop_forever or stop.is_set():
+                break
+            retention_due_at = _maybe_apply_event_retention(backend, retention_due_at)
+            delay = _idle_delay(backend, processed_count, poll_interval, retention_due_at)
+            if delay is None or delay > 0:
+                await _wait_for_queue_change(watcher, stop, delay)
+    finally:
+        canceller.cancel()
+        if watcher is not None:
+            watcher.close()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            event_loop.remove_signal_handler(signum)
+        flush_events()
+        exporter.maybe_write(force=True)
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--loop":
+        poll_interval = 2.0
+        if len(sys.argv) >= 3:
+            poll_interval = float(sys.argv[2])
+        raise SystemExit(asyncio.run(run_async(loop_forever=True, poll_interval=poll_interval)))
+    raise SystemExit(asyncio.run(run_async()))
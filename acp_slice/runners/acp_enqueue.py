@@ -0,0 +1,144 @@
+"""Bulk admission of tasks into the ACP queue.
+
+Usage: python -m acp_slice.runners.acp_enqueue [tasks.jsonl|-] [--workers N] [--dry-run]
+
+Each input line is a queue row with at least ``task_id`` and ``task_file``;
+``status`` defaults to QUEUED. Rows are checked before admission, so a bad
+task never burns a lifecycle in the runner:
+
+- a row that is not an object, lacks a string ``task_id`` or ``task_file``,
+  or is not QUEUED is rejected with ``PRECHECK_INVALID``;
+- a ``task_id`` repeated in the batch, already queued or archived is rejected
+  with ``DUPLICATE_TASK_ID`` (the first row in the batch wins);
+- task files go through the runner's own gates, in parallel, and fail with
+  ``TASK_FILE_MISSING``, ``TASK_FILE_INVALID`` or ``REPO_PATH_INVALID``.
+
+The admitted rows are committed in a single queue write, then each gets an
+``EVENT_TASK_ADMITTED``.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from acp_slice.contracts.acp_contracts import (
+    DUPLICATE_TASK_ID,
+    EVENT_TASK_ADMITTED,
+    FIELD_STATUS,
+    FIELD_TASK_FILE,
+    FIELD_TASK_ID,
+    PRECHECK_INVALID,
+    QUEUED,
+)
+from acp_slice.queue.acp_queue_backends import get_queue_backend
+from acp_slice.runners.acp_run_loop import TASKS_PATH, _evaluate_task_file_gates
+from acp_slice.telemetry.acp_events import append_event, flush_events
+
+
+ENQUEUE_WORKERS = 8
+
+
+def _precheck(task) -> str | None:
+    if not isinstance(task, dict):
+        return PRECHECK_INVALID
+    task_id = task.get(FIELD_TASK_ID)
+    if not isinstance(task_id, str) or task_id == "" or not isinstance(task.get(FIELD_TASK_FILE), str):
+        return PRECHECK_INVALID
+    if task.get(FIELD_STATUS, QUEUED) != QUEUED:
+        return PRECHECK_INVALID
+    return None
+
+
+def _rejection(task, reason: str) -> dict:
+    task_id = task.get(FIELD_TASK_ID) if isinstance(task, dict) else None
+    return {"task_id": task_id, "reason": reason}
+
+
+def enqueue_tasks(
+    tasks: list, tasks_path: str | None = None, workers: int = ENQUEUE_WORKERS, dry_run: bool = False
+) -> dict:
+    """Validate and admit a batch of queue rows.
+
+    Returns {"admitted": [task_id, ...], "rejected": [{"task_id", "reason"}, ...]}.
+    With dry_run nothing is written and "admitted" lists the rows that passed
+    validation.
+    """
+    rejected = []
+    candidates = []
+    seen = set()
+    for task in tasks:
+        reason = _precheck(task)
+        if reason is None and task[FIELD_TASK_ID] in seen:
+            reason = DUPLICATE_TASK_ID
+        if reason is not None:
+            rejected.append(_rejection(task, reason))
+            continue
+        seen.add(task[FIELD_TASK_ID])
+        candidates.append({**task, FIELD_STATUS: QUEUED})
+
+    # Task files are often shared; each distinct path is gated once.
+    task_files = list(dict.fromkeys(task[FIELD_TASK_FILE] for task in candidates))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        gates = dict(zip(task_files, pool.map(_evaluate_task_file_gates, task_files)))
+    valid = []
+    for task in candidates:
+        failure_reason = gates[task[FIELD_TASK_FILE]][1]
+        if failure_reason is not None:
+            rejected.append(_rejection(task, failure_reason))
+        else:
+            valid.append(task)
+
+    if dry_run:
+        return {"admitted": [task[FIELD_TASK_ID] for task in valid], "rejected": rejected}
+
+    added = get_queue_backend(tasks_path or TASKS_PATH).add_tasks(valid)
+    added_ids = {task[FIELD_TASK_ID] for task in added}
+    for task in valid:
+        if task[FIELD_TASK_ID] not in added_ids:
+            rejected.append(_rejection(task, DUPLICATE_TASK_ID))
+    for task in added:
+        append_event(
+            {
+                "event_type": EVENT_TASK_ADMITTED,
+                "task_id": task[FIELD_TASK_ID],
+                "payload": {FIELD_TASK_FILE: task[FIELD_TASK_FILE]},
+            }
+        )
+    flush_events()
+    return {"admitted": [task[FIELD_TASK_ID] for task in added], "rejected": rejected}
+
+
+def _read_rows(source) -> list:
+    rows = []
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError:
+            rows.append(None)
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.runners.acp_enqueue", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("source", nargs="?", default="-", help="JSONL file of queue rows, or - for stdin (default)")
+    parser.add_argument("--workers", type=int, default=ENQUEUE_WORKERS, help="parallel task-file checks")
+    parser.add_argument("--dry-run", action="store_true", help="validate without admitting anything")
+    args = parser.parse_args(argv)
+    if args.source == "-":
+        rows = _read_rows(sys.stdin)
+    else:
+        with open(args.source, "r", encoding="utf-8") as source:
+            rows = _read_rows(source)
+    result = enqueue_tasks(rows, workers=args.workers, dry_run=args.dry_run)
+    print(json.dumps(result, sort_keys=True))
+    return 0 if not result["rejected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
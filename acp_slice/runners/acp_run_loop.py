@@ -1,11 +1,16 @@
 """Minimal deterministic ACP queue runner loop."""
 
+import atexit
+import contextlib
+import itertools
 import json
 import os
+import signal
 import subprocess
 import sys
-import tempfile
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from acp_slice.contracts.acp_contracts import (
@@ -14,6 +19,12 @@ from acp_slice.contracts.acp_contracts import (
     DEAD_LETTER,
     EVALUATING,
     EVENT_DEAD_LETTERED,
+    EVENT_GATES_EVALUATED,
+    EVENT_LOCK_ACQUIRED,
+    EVENT_LOCK_HELD,
+    EVENT_LOCK_LOST,
+    EVENT_LOCK_RELEASED,
+    EVENT_ORPHAN_RECOVERED,
     EVENT_RETRY_SCHEDULED,
     EVENT_RUN_FINISHED,
     EVENT_RUN_STARTED,
@@ -31,20 +42,59 @@ from acp_slice.contracts.acp_contracts import (
     FIELD_TASK_FILE,
     FIELD_TASK_ID,
     FIELD_HARNESS_LOG_PATH,
+    HARNESS_TIMEOUT,
     INVARIANT_VIOLATION,
+    ORPHANED_EVALUATING,
+    PAYLOAD_SPANS,
     PRECHECK_INVALID,
     QUEUED,
     REPO_PATH_INVALID,
     REFUSED,
     RETRIES_EXHAUSTED,
+    RUNNER_CANCELLED,
     RUNNER_EXCEPTION,
+    SPAN_CLAIM,
+    SPAN_HARNESS,
+    SPAN_QUEUE_WRITE,
+    SPAN_TASK_FILE_VALIDATION,
+    SPAN_TERMINAL_VALIDATION,
+    SPAN_TOTAL,
     TASK_FILE_INVALID,
     TASK_FILE_MISSING,
     UNKNOWN_FAILURE,
 )
+from acp_slice.queue.acp_queue_archive import iter_archived_tasks
+from acp_slice.queue.acp_queue_backends import QueueBackend, get_queue_backend
+from acp_slice.queue.acp_queue_watch import QueueWatcher
+from acp_slice.queue.acp_task_leases import TaskLeases, lease_dir_for
+from acp_slice.runners.acp_task_file_cache import TASK_FILE_CACHE_SIZE, TaskFileCache, task_file_key
 from acp_slice.telemetry.acp_consistency_validator import validate_task_consistency
-from acp_slice.telemetry.acp_events import append_event
-from acp_slice.telemetry.acp_replay_validator import validate_task_lifecycle
+from acp_slice.telemetry.acp_event_retention import RETENTION_INTERVAL_SECONDS, apply_retention
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH, append_event, flush_events
+from acp_slice.telemetry.acp_lifecycle_checkpoint import maybe_write_checkpoint, seconds_until_checkpoint
+from acp_slice.telemetry.acp_lifecycle_tracker import forget_tasks, is_tracked
+from acp_slice.telemetry.acp_metrics import (
+    DEAD_LETTERS,
+    HARNESS_RUN_SECONDS,
+    METRICS,
+    METRICS_INTERVAL_SECONDS,
+    METRICS_PORT,
+    METRICS_TEXTFILE_PATH,
+    QUEUE_LOAD_SECONDS,
+    QUEUE_WRITE_SECONDS,
+    RETRIES_SCHEDULED,
+    TASK_FAILURES,
+    TASKS_PROCESSED,
+    TERMINAL_VALIDATION_SECONDS,
+    MetricsExporter,
+)
+from acp_slice.telemetry.acp_replay_validator import (
+    LIFECYCLE_MODE_INCREMENTAL,
+    LIFECYCLE_MODE_REPLAY,
+    LIFECYCLE_MODES,
+    start_lifecycle_tracking,
+    validate_task_lifecycle,
+)
 
 
 SLICE_ROOT = Path(__file__).resolve().parents[1]
@@ -56,45 +106,92 @@ HARNESS_LOG_DIR = str(RUNTIME_ROOT / "logs" / "harness")
 TASKFILE_REQUIRED_FIELDS = {"repo_path", "argv"}
 TASKFILE_OPTIONAL_FIELDS = {"label"}
 TASKFILE_ALLOWED_FIELDS = TASKFILE_REQUIRED_FIELDS | TASKFILE_OPTIONAL_FIELDS
+LIFECYCLE_VALIDATION_MODE = os.environ.get("ACP_LIFECYCLE_VALIDATION", LIFECYCLE_MODE_INCREMENTAL)
 
+if LIFECYCLE_VALIDATION_MODE not in LIFECYCLE_MODES:
+    LIFECYCLE_VALIDATION_MODE = LIFECYCLE_MODE_INCREMENTAL
 
-def _load_tasks(path: str) -> list[dict]:
-    tasks = []
-    with open(path, "r", encoding="utf-8") as tasks_file:
-        for line in tasks_file:
-            line = line.strip()
-            if not line:
-                continue
-            tasks.append(json.loads(line))
-    return tasks
+# Move tasks that passed their terminal validations to the queue archive
+# after each pass.
+QUEUE_ARCHIVE_ENABLED = os.environ.get("ACP_QUEUE_ARCHIVE") == "1"
 
+# (start, {span: seconds}) for each claimed task attempt, keyed by id(task)
+# like the queue backends' row maps. Spans use time.perf_counter, so they are
+# immune to wall-clock steps; the entry is dropped at EVENT_RUN_FINISHED.
+_TASK_SPANS = {}
 
-def _write_tasks_atomic(path: str, tasks: list[dict]) -> None:
-    directory = os.path.dirname(path) or "."
-    with tempfile.NamedTemporaryFile(
-        "w", encoding="utf-8", dir=directory, delete=False
-    ) as tmp_file:
-        for task in tasks:
-            tmp_file.write(json.dumps(task, sort_keys=True) + "\n")
-        temp_path = tmp_file.name
-    os.replace(temp_path, path)
+# Lease key of each claimed task attempt that holds a lease, keyed by id(task).
+_TASK_LEASE_KEYS = {}
 
+# time.monotonic() of the next orphaned-EVALUATING scan; see _recover_orphaned_tasks.
+_NEXT_ORPHAN_SCAN_AT = 0.0
 
-def _load_max_tasks_per_run() -> int:
-    default_value = 1
+# task_ids that passed _run_terminal_validations and await archiving.
+_ARCHIVE_PENDING = []
+
+# Process group ids of running harnesses, so an interrupted pass can kill
+# those started on pool threads. Once _HARNESSES_CANCELLED is set, harnesses
+# starting late kill themselves.
+_HARNESS_PIDS = set()
+_HARNESS_LOCK = threading.Lock()
+_HARNESSES_CANCELLED = threading.Event()
+
+# Validated task-file payloads, so retries and repeated tasks skip re-parsing
+# and re-validating an unchanged task file.
+_TASK_FILE_CACHE = TaskFileCache(TASK_FILE_CACHE_SIZE)
+
+
+def _load_config() -> dict:
     try:
         with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
             config = json.load(config_file)
     except Exception:
-        return default_value
-    if not isinstance(config, dict):
-        return default_value
-    value = config.get("max_tasks_per_run", default_value)
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def _config_positive_int(config: dict, key: str, default_value: int) -> int:
+    value = config.get(key, default_value)
     if not isinstance(value, int) or value <= 0:
         return default_value
     return value
 
 
+def _load_max_tasks_per_run() -> int:
+    return _config_positive_int(_load_config(), "max_tasks_per_run", 1)
+
+
+def _load_max_concurrency() -> int:
+    return _config_positive_int(_load_config(), "max_concurrency", 1)
+
+
+def _config_positive_float(config: dict, key: str) -> float | None:
+    value = config.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return None
+    return float(value)
+
+
+def _load_harness_timeout() -> float | None:
+    return _config_positive_float(_load_config(), "harness_timeout_seconds")
+
+
+_TASK_LEASES = None
+
+
+def _load_task_leases() -> TaskLeases | None:
+    """Return the process-wide lease holder when lease_ttl_seconds is set."""
+    global _TASK_LEASES
+    ttl = _config_positive_float(_load_config(), "lease_ttl_seconds")
+    if ttl is None:
+        return None
+    if _TASK_LEASES is None:
+        _TASK_LEASES = TaskLeases(lease_dir_for(TASKS_PATH), ttl)
+        atexit.register(_TASK_LEASES.close)
+    _TASK_LEASES.ttl = ttl
+    return _TASK_LEASES
+
+
 def _load_json_object(path: str) -> dict:
     with open(path, "r", encoding="utf-8") as f:
         payload = json.load(f)
@@ -119,32 +216,38 @@ def _resolve_repo_path(raw_repo_path: str) -> str | None:
 
 
 def _validate_task_file_contract(task_file_payload: dict) -> tuple[bool, str | None]:
+    failure_reason = _check_task_file_contract(task_file_payload)[1]
+    return failure_reason is None, failure_reason
+
+
+def _check_task_file_contract(task_file_payload: dict) -> tuple[str | None, str | None]:
+    """Return (resolved repo path, None) for a valid payload, else (None, failure reason)."""
     if any(key not in TASKFILE_ALLOWED_FIELDS for key in task_file_payload.keys()):
-        return False, TASK_FILE_INVALID
+        return None, TASK_FILE_INVALID
 
     missing = TASKFILE_REQUIRED_FIELDS - set(task_file_payload.keys())
     if missing:
-        return False, TASK_FILE_INVALID
+        return None, TASK_FILE_INVALID
 
     repo_path = task_file_payload.get("repo_path")
     if not isinstance(repo_path, str) or repo_path == "":
-        return False, TASK_FILE_INVALID
+        return None, TASK_FILE_INVALID
 
     argv = task_file_payload.get("argv")
     if not isinstance(argv, list) or len(argv) == 0:
-        return False, TASK_FILE_INVALID
+        return None, TASK_FILE_INVALID
     if any(not isinstance(item, str) or item == "" for item in argv):
-        return False, TASK_FILE_INVALID
+        return None, TASK_FILE_INVALID
 
     if "label" in task_file_payload:
         label = task_file_payload.get("label")
         if not isinstance(label, str) or label == "":
-            return False, TASK_FILE_INVALID
+            return None, TASK_FILE_INVALID
 
     resolved_repo = _resolve_repo_path(repo_path)
     if resolved_repo is None:
-        return False, REPO_PATH_INVALID
-    return True, None
+        return None, REPO_PATH_INVALID
+    return resolved_repo, None
 
 
 def _harness_log_path(task_id: str) -> str:
@@ -152,8 +255,11 @@ def _harness_log_path(task_id: str) -> str:
     return os.path.join(HARNESS_LOG_DIR, f"{task_id}.jsonl")
 
 
-def _run_harness(task_id: str, task_file_payload: dict) -> subprocess.CompletedProcess[str]:
-    resolved_repo = _resolve_repo_path(task_file_payload["repo_path"])
+def _harness_command(task_id: str, task_file_payload: dict) -> list[str]:
+    # A payload from the task-file cache was validated this attempt, repo included.
+    resolved_repo = _TASK_FILE_CACHE.resolved_repo(task_file_payload) or _resolve_repo_path(
+        task_file_payload["repo_path"]
+    )
     if resolved_repo is None:
         raise ValueError(REPO_PATH_INVALID)
     argv = task_file_payload["argv"]
@@ -161,7 +267,7 @@ def _run_harness(task_id: str, task_file_payload: dict) -> subprocess.CompletedP
     resolved_label = label if isinstance(label, str) and label else task_id
     log_path = _harness_log_path(task_id)
 
-    command = [
+    return [
         "aah",
         "run",
         "--repo",
@@ -172,7 +278,46 @@ def _run_harness(task_id: str, task_file_payload: dict) -> subprocess.CompletedP
         resolved_label,
         "--",
     ] + argv
-    return subprocess.run(command, capture_output=True, text=True, shell=False)
+
+
+def _kill_process_group(pid: int) -> None:
+    # The harness leads its own session; kill the whole group so processes it
+    # spawned neither outlive it nor hold its output pipes open.
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _run_harness(
+    task_id: str, task_file_payload: dict, timeout: float | None = None
+) -> subprocess.CompletedProcess[str]:
+    command = _harness_command(task_id, task_file_payload)
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        shell=False,
+        start_new_session=True,
+    ) as process:
+        with _HARNESS_LOCK:
+            _HARNESS_PIDS.add(process.pid)
+            if _HARNESSES_CANCELLED.is_set():
+                _kill_process_group(process.pid)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process.pid)
+            process.communicate()
+            raise
+        except BaseException:
+            _kill_process_group(process.pid)
+            raise
+        finally:
+            with _HARNESS_LOCK:
+                _HARNESS_PIDS.discard(process.pid)
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
 
 
 def _transition(task: dict, new_status: str) -> None:
@@ -197,6 +342,7 @@ def _transition(task: dict, new_status: str) -> None:
                 "payload": {FIELD_DEAD_LETTER_REASON: task.get(FIELD_DEAD_LETTER_REASON)},
             }
         )
+        DEAD_LETTERS.inc(task.get(FIELD_DEAD_LETTER_REASON))
         return
     allowed_next = ALLOWED_TRANSITIONS[current_status]
     if new_status not in allowed_next:
@@ -218,6 +364,7 @@ def _transition(task: dict, new_status: str) -> None:
                 "payload": {FIELD_DEAD_LETTER_REASON: task.get(FIELD_DEAD_LETTER_REASON)},
             }
         )
+        DEAD_LETTERS.inc(task.get(FIELD_DEAD_LETTER_REASON))
         return
     task[FIELD_STATUS] = new_status
     append_event(
@@ -233,16 +380,59 @@ def _mark_failed(task: dict, reason: str) -> None:
     _transition(task, FAILED)
     if task.get(FIELD_STATUS) == FAILED:
         task[FIELD_FAILURE_REASON] = reason
+        TASK_FAILURES.inc(reason)
 
 
-def _emit_run_finished(task: dict) -> None:
+def _add_span(task: dict, span: str, seconds: float) -> None:
+    entry = _TASK_SPANS.get(id(task))
+    if entry is not None:
+        entry[1][span] = entry[1].get(span, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def _phase(task: dict, span: str, histogram):
+    """Time the block into the task's span and the phase histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed)
+        _add_span(task, span, elapsed)
+
+
+def _spans_payload(task: dict, finished: bool = False) -> dict:
+    entry = _TASK_SPANS.pop(id(task), None) if finished else _TASK_SPANS.get(id(task))
+    if entry is None:
+        return {}
+    started, spans = entry
+    payload = {span: round(seconds, 6) for span, seconds in spans.items()}
+    if finished:
+        payload[SPAN_TOTAL] = round(time.perf_counter() - started, 6)
+    return payload
+
+
+def _emit_run_finished(task: dict, event_type: str = EVENT_RUN_FINISHED) -> None:
+    task_id = task.get(FIELD_TASK_ID) if isinstance(task.get(FIELD_TASK_ID), str) else None
     append_event(
         {
-            "event_type": EVENT_RUN_FINISHED,
-            "task_id": task.get(FIELD_TASK_ID) if isinstance(task.get(FIELD_TASK_ID), str) else None,
-            "payload": {"final_status": task.get(FIELD_STATUS)},
+            "event_type": event_type,
+            "task_id": task_id,
+            "payload": {"final_status": task.get(FIELD_STATUS), PAYLOAD_SPANS: _spans_payload(task, finished=True)},
         }
     )
+    if task_id is not None and task.get(FIELD_STATUS) in TERMINAL_STATUSES:
+        forget_tasks([task_id])
+
+
+def _start_lifecycle_tracking(task: dict, reseed: bool = False) -> None:
+    task_id = task.get(FIELD_TASK_ID)
+    if not isinstance(task_id, str) or (is_tracked(task_id) and not reseed):
+        return
+    # Only retries lead back to QUEUED, so a QUEUED task that was never
+    # retried has no status events yet and needs no replay to seed it.
+    retries = task.get(FIELD_RETRIES, 0)
+    start_lifecycle_tracking(task_id, fresh=not isinstance(retries, int) or retries == 0)
 
 
 def _apply_retry_if_eligible(task: dict, current_time: float) -> None:
@@ -273,6 +463,7 @@ def _apply_retry_if_eligible(task: dict, current_time: float) -> None:
                 },
             }
         )
+        RETRIES_SCHEDULED.inc()
         _transition(task, QUEUED)
         if task.get(FIELD_STATUS) == QUEUED:
             task.pop(FIELD_FAILURE_REASON, None)
@@ -288,6 +479,7 @@ def _apply_retry_if_eligible(task: dict, current_time: float) -> None:
                 "payload": {FIELD_DEAD_LETTER_REASON: task.get(FIELD_DEAD_LETTER_REASON)},
             }
         )
+        DEAD_LETTERS.inc(task.get(FIELD_DEAD_LETTER_REASON))
 
 
 def _validator_error_message(result: dict) -> str:
@@ -321,121 +513,594 @@ def _mark_dead_letter_for_validator_failure(task: dict, code: str, message: str)
             "payload": {FIELD_DEAD_LETTER_REASON: task.get(FIELD_DEAD_LETTER_REASON)},
         }
     )
+    DEAD_LETTERS.inc(task.get(FIELD_DEAD_LETTER_REASON))
+
 
+def _run_terminal_validations(task: dict) -> bool:
+    """Dead-letter a terminal task whose lifecycle or queue state is invalid.
 
-def _run_terminal_validations(task: dict) -> None:
+    Returns True only for a terminal task that passed both checks.
+    """
     task_id = task.get(FIELD_TASK_ID)
     if not isinstance(task_id, str):
-        return
+        return False
     if task.get(FIELD_STATUS) not in TERMINAL_STATUSES:
-        return
+        return False
 
-    replay_result = validate_task_lifecycle(task_id)
+    replay_result = validate_task_lifecycle(task_id, mode=LIFECYCLE_VALIDATION_MODE)
     if not replay_result.get("valid"):
         _mark_dead_letter_for_validator_failure(
             task,
             "REPLAY_INVALID",
             _validator_error_message(replay_result),
         )
-        return
+        return False
 
-    consistency_result = validate_task_consistency(task_id)
+    consistency_result = validate_task_consistency(task_id, lifecycle_mode=LIFECYCLE_VALIDATION_MODE)
     if not consistency_result.get("valid"):
         _mark_dead_letter_for_validator_failure(
             task,
             "CONSISTENCY_INVALID",
             _validator_error_message(consistency_result),
         )
+        return False
+    return True
 
 
-def main() -> int:
-    tasks = _load_tasks(TASKS_PATH)
+def _event_task_id(task: dict) -> str | None:
+    return task.get(FIELD_TASK_ID) if isinstance(task.get(FIELD_TASK_ID), str) else None
+
+
+def _is_due(task: dict, current_time: float) -> bool:
+    if task.get(FIELD_STATUS) != QUEUED:
+        return False
+    next_attempt_at = task.get(FIELD_NEXT_ATTEMPT_AT)
+    return not (isinstance(next_attempt_at, (int, float)) and current_time < float(next_attempt_at))
+
+
+def _claim_task(backend: QueueBackend, task: dict, leases: TaskLeases | None, current_time: float) -> bool:
+    """Claim a due task for this attempt and start timing its phases."""
+    started = time.perf_counter()
+    if not _claim_lease(backend, task, leases, current_time):
+        return False
+    _TASK_SPANS[id(task)] = (started, {SPAN_CLAIM: time.perf_counter() - started})
+    return True
+
+
+def _claim_lease(backend: QueueBackend, task: dict, leases: TaskLeases | None, current_time: float) -> bool:
+    """Take the task's lease and confirm from storage that it is still due.
+
+    Without leases every due task is claimed as-is. With them, the row is
+    re-read after the lease is taken, since another runner may have run it
+    since this pass loaded the queue.
+    """
+    if leases is None:
+        return True
+    lease_key = backend.lease_key(task)
+    lease = leases.acquire(lease_key)
+    if not lease["acquired"]:
+        append_event(
+            {
+                "event_type": EVENT_LOCK_HELD,
+                "task_id": _event_task_id(task),
+                "payload": {"reason": lease["reason"], "owner": lease["owner"], "expires_at": lease["expires_at"]},
+            }
+        )
+        return False
+    if not backend.reload_task(task) or not _is_due(task, current_time):
+        leases.release(lease_key)
+        return False
+
+    _TASK_LEASE_KEYS[id(task)] = lease_key
+    payload = {"owner": lease["owner"], "expires_at": lease["expires_at"]}
+    if "reclaimed_from" in lease:
+        payload["reclaimed_from"] = lease["reclaimed_from"]
+    append_event({"event_type": EVENT_LOCK_ACQUIRED, "task_id": _event_task_id(task), "payload": payload})
+    # Other runners may have moved this task since this process last saw it.
+    _start_lifecycle_tracking(task, reseed=True)
+    return True
+
+
+def _lease_lost(task: dict) -> bool:
+    """Drop this attempt if another runner has taken over the task's lease.
+
+    Returns True when the lease is gone, in which case the caller must leave
+    the row alone: its current state belongs to the new owner.
+    """
+    lease_key = _TASK_LEASE_KEYS.get(id(task))
+    if lease_key is None or _TASK_LEASES is None or _TASK_LEASES.owns(lease_key):
+        return False
+    del _TASK_LEASE_KEYS[id(task)]
+    _TASK_SPANS.pop(id(task), None)
+    task_id = _event_task_id(task)
+    if task_id is not None:
+        # The new owner's status changes never reach this process's tracker.
+        forget_tasks([task_id])
+    append_event(
+        {
+            "event_type": EVENT_LOCK_LOST,
+            "task_id": task_id,
+            "payload": {"owner": _TASK_LEASES.owner, "status": task.get(FIELD_STATUS)},
+        }
+    )
+    return True
+
+
+def _release_task(backend: QueueBackend, task: dict) -> None:
+    lease_key = _TASK_LEASE_KEYS.pop(id(task), None)
+    if lease_key is None or _TASK_LEASES is None:
+        return
+    if _TASK_LEASES.release(lease_key):
+        append_event(
+            {
+                "event_type": EVENT_LOCK_RELEASED,
+                "task_id": _event_task_id(task),
+                "payload": {"owner": _TASK_LEASES.owner},
+            }
+        )
+
+
+def _save_task(backend: QueueBackend, task: dict) -> bool:
+    """Persist a row of this attempt; False if its lease was lost instead."""
+    if _lease_lost(task):
+        return False
+    with _phase(task, SPAN_QUEUE_WRITE, QUEUE_WRITE_SECONDS):
+        backend.save_task(task)
+    return True
+
+
+def _load_queue(backend: QueueBackend) -> None:
+    with QUEUE_LOAD_SECONDS.time():
+        backend.load()
+
+
+def _finish_task(
+    backend: QueueBackend, task: dict, current_time: float, finished_event: str = EVENT_RUN_FINISHED
+) -> None:
+    if _lease_lost(task):
+        return
+    _apply_retry_if_eligible(task, current_time)
+    if not _save_task(backend, task):
+        return
+    with _phase(task, SPAN_TERMINAL_VALIDATION, TERMINAL_VALIDATION_SECONDS):
+        validated = _run_terminal_validations(task)
+    if not _save_task(backend, task):
+        return
+    if validated and QUEUE_ARCHIVE_ENABLED:
+        _ARCHIVE_PENDING.append(task[FIELD_TASK_ID])
+    _emit_run_finished(task, finished_event)
+    TASKS_PROCESSED.inc(task.get(FIELD_STATUS))
+    _release_task(backend, task)
+
+
+def _evaluate_task_file_gates(task_file: str) -> tuple[dict | None, str | None]:
+    """Return (task-file payload, None) if the task file passes its gates,
+    else (None, failure reason).
+
+    A task file unchanged since it last passed is served from the cache after
+    one stat of it and one of its repo's ``.git``.
+    """
+    try:
+        key = task_file_key(task_file)
+    except (OSError, ValueError):
+        return None, TASK_FILE_MISSING
+    cached = _TASK_FILE_CACHE.get(key)
+    if cached is not None and os.path.exists(os.path.join(cached[1], ".git")):
+        return cached[0], None
+    try:
+        task_payload = _load_json_object(task_file)
+    except Exception:
+        return None, TASK_FILE_INVALID
+    resolved_repo, failure_reason = _check_task_file_contract(task_payload)
+    if resolved_repo is None:
+        return None, failure_reason if isinstance(failure_reason, str) else TASK_FILE_INVALID
+    _TASK_FILE_CACHE.put(key, task_payload, resolved_repo)
+    return task_payload, None
+
+
+def _prepare_task(backend: QueueBackend, task: dict, current_time: float) -> dict | None:
+    """Run a due task up to its harness call.
+
+    Returns the validated task-file payload to hand to the harness, or None
+    when the task already failed and has been finished.
+    """
+    _start_lifecycle_tracking(task)
+    if (
+        not isinstance(task.get(FIELD_TASK_ID), str)
+        or not isinstance(task.get(FIELD_STATUS), str)
+        or not isinstance(task.get(FIELD_TASK_FILE), str)
+    ):
+        _mark_failed(task, PRECHECK_INVALID)
+        _finish_task(backend, task, current_time)
+        return None
+
+    task_file = task.get(FIELD_TASK_FILE)
+
+    _transition(task, EVALUATING)
+    if not _save_task(backend, task):
+        return None
+
+    try:
+        append_event(
+            {
+                "event_type": EVENT_RUN_STARTED,
+                "task_id": task.get(FIELD_TASK_ID),
+                "payload": {PAYLOAD_SPANS: _spans_payload(task)},
+            }
+        )
+        started = time.perf_counter()
+        task_payload, failure_reason = _evaluate_task_file_gates(task_file)
+        elapsed = time.perf_counter() - started
+        _add_span(task, SPAN_TASK_FILE_VALIDATION, elapsed)
+        append_event(
+            {
+                "event_type": EVENT_GATES_EVALUATED,
+                "task_id": task.get(FIELD_TASK_ID),
+                "payload": {
+                    "passed": failure_reason is None,
+                    FIELD_FAILURE_REASON: failure_reason,
+                    PAYLOAD_SPANS: {SPAN_TASK_FILE_VALIDATION: round(elapsed, 6)},
+                },
+            }
+        )
+        if failure_reason is None:
+            return task_payload
+        _mark_failed(task, failure_reason)
+    except Exception:
+        _mark_failed(task, RUNNER_EXCEPTION)
+    _finish_task(backend, task, current_time)
+    return None
+
+
+def _call_harness(
+    task: dict, task_payload: dict, timeout: float | None
+) -> subprocess.CompletedProcess[str] | Exception:
+    # Workers hand exceptions back as values so the owner thread decides the
+    # outcome. Only this worker touches the task's spans until it returns.
+    try:
+        with _phase(task, SPAN_HARNESS, HARNESS_RUN_SECONDS):
+            return _run_harness(task[FIELD_TASK_ID], task_payload, timeout)
+    except Exception as exc:
+        return exc
+
+
+def _complete_task(
+    backend: QueueBackend,
+    task: dict,
+    current_time: float,
+    result: subprocess.CompletedProcess[str] | Exception,
+) -> None:
+    if _lease_lost(task):
+        # Another runner owns the task now; its outcome is theirs to record.
+        return
+    try:
+        if isinstance(result, subprocess.TimeoutExpired):
+            # The hung harness has already been killed by whoever timed it out.
+            task[FIELD_HARNESS_LOG_PATH] = _harness_log_path(task[FIELD_TASK_ID])
+            _mark_failed(task, HARNESS_TIMEOUT)
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            task[FIELD_LAST_EXIT_CODE] = result.returncode
+            task[FIELD_HARNESS_LOG_PATH] = _harness_log_path(task[FIELD_TASK_ID])
+            if result.returncode == 0:
+                _transition(task, COMPLETED)
+                task.pop(FIELD_FAILURE_REASON, None)
+            else:
+                _mark_failed(task, UNKNOWN_FAILURE)
+    except Exception:
+        _mark_failed(task, RUNNER_EXCEPTION)
+    _finish_task(backend, task, current_time)
+
+
+def _complete_finished_harnesses(backend: QueueBackend, in_flight: dict, block: bool) -> None:
+    if not in_flight:
+        return
+    done, _ = wait(list(in_flight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+    for future in done:
+        task, current_time = in_flight.pop(future)
+        _complete_task(backend, task, current_time, future.result())
+
+
+def _cancel_tasks(backend: QueueBackend, tasks: list[tuple[dict, float]]) -> None:
+    """Fail the tasks of an interrupted pass with RUNNER_CANCELLED, retrying
+    where eligible, so none is left EVALUATING."""
+    for task, current_time in tasks:
+        if not _lease_lost(task):
+            _mark_failed(task, RUNNER_CANCELLED)
+            _finish_task(backend, task, current_time)
+
+
+def _cancel_harnesses(backend: QueueBackend, pool: ThreadPoolExecutor, in_flight: dict) -> None:
+    # Harnesses lead their own sessions and never see the terminal's SIGINT;
+    # kill them so the pool's threads return instead of running to the end.
+    with _HARNESS_LOCK:
+        _HARNESSES_CANCELLED.set()
+        pids = list(_HARNESS_PIDS)
+    for pid in pids:
+        _kill_process_group(pid)
+    pool.shutdown(wait=True, cancel_futures=True)
+    _cancel_tasks(backend, list(in_flight.values()))
+    in_flight.clear()
+
+
+def _recover_orphaned_tasks(backend: QueueBackend, leases: TaskLeases | None, force: bool = False) -> int:
+    """Fail EVALUATING rows left by a dead runner, retrying them if eligible.
+
+    With leases a row is orphaned once its lease can be taken, so passes
+    rescan every lease TTL. Without them nothing tells a dead runner's row
+    from one a live runner is evaluating, so rows are only recovered when
+    forced (``--recover-orphans``). Recovered rows finish with
+    EVENT_ORPHAN_RECOVERED rather than EVENT_RUN_FINISHED, since no run
+    started in this process. Returns the number of rows recovered.
+    """
+    global _NEXT_ORPHAN_SCAN_AT
+    if not force:
+        if leases is None or time.monotonic() < _NEXT_ORPHAN_SCAN_AT:
+            return 0
+        _NEXT_ORPHAN_SCAN_AT = time.monotonic() + leases.ttl
+    recovered = 0
+    for task in backend.tasks_with_status(EVALUATING):
+        if leases is not None:
+            lease_key = backend.lease_key(task)
+            if not leases.acquire(lease_key)["acquired"]:
+                continue
+            if not backend.reload_task(task) or task.get(FIELD_STATUS) != EVALUATING:
+                leases.release(lease_key)
+                continue
+            _TASK_LEASE_KEYS[id(task)] = lease_key
+        if isinstance(task.get(FIELD_TASK_ID), str):
+            # Unlike a QUEUED row, an EVALUATING row always has logged history.
+            start_lifecycle_tracking(task[FIELD_TASK_ID], fresh=False)
+        _mark_failed(task, ORPHANED_EVALUATING)
+        _finish_task(backend, task, time.time(), finished_event=EVENT_ORPHAN_RECOVERED)
+        recovered += 1
+    return recovered
+
+
+def recover_orphaned_tasks() -> int:
+    """Recover every EVALUATING row now and return how many were recovered.
+
+    Without leases, run this only while no runner is live on the queue, for
+    instance before starting the runners after a crash.
+    """
+    backend = get_queue_backend(TASKS_PATH)
+    _load_queue(backend)
+    recovered = _recover_orphaned_tasks(backend, _load_task_leases(), force=True)
+    _archive_validated_tasks(backend)
+    flush_events()
+    return recovered
+
+
+def _archive_validated_tasks(backend: QueueBackend) -> int:
+    """Move this process's validated terminal tasks to the queue archive.
+
+    Runs once every task of the pass is saved, so each pass rewrites the hot
+    queue at most once more. Returns the number of rows archived.
+    """
+    if not _ARCHIVE_PENDING:
+        return 0
+    try:
+        archived = backend.archive_tasks(_ARCHIVE_PENDING)
+    except Exception:
+        # Archiving is housekeeping; the rows stay queued and are retried
+        # after the next pass.
+        return 0
+    del _ARCHIVE_PENDING[:]
+    return len(archived)
+
+
+def archive_terminal_tasks() -> int:
+    """Archive every queued terminal row that passes the terminal validations.
+
+    Backfills the archive with history from before archiving was enabled,
+    re-checking each row against a replay of the event log. Rows dead-lettered
+    by a failed validation stay in the queue. Returns the number archived.
+    """
+    backend = get_queue_backend(TASKS_PATH)
+    task_ids = []
+    for task in backend.all_tasks():
+        task_id = task.get(FIELD_TASK_ID)
+        if not isinstance(task_id, str) or task.get(FIELD_STATUS) not in TERMINAL_STATUSES:
+            continue
+        if FIELD_INVARIANT_VIOLATION in task:
+            continue
+        if validate_task_consistency(task_id, lifecycle_mode=LIFECYCLE_MODE_REPLAY).get("valid"):
+            task_ids.append(task_id)
+    return len(backend.archive_tasks(task_ids))
+
+
+def _run_pass() -> int:
+    """Run one pass over the due tasks and return how many were started."""
+    backend = get_queue_backend(TASKS_PATH)
+    _load_queue(backend)
     max_tasks_per_run = _load_max_tasks_per_run()
+    max_concurrency = _load_max_concurrency()
+    harness_timeout = _load_harness_timeout()
+    leases = _load_task_leases()
+    _recover_orphaned_tasks(backend, leases)
     processed_count = 0
 
-    for task in tasks:
-        if processed_count >= max_tasks_per_run:
-            break
-        if task.get(FIELD_STATUS) == QUEUED:
+    # Only harness subprocesses run on pool threads. Every queue write and
+    # event is issued from this thread, so _transition ordering per task and
+    # the replay validator's view of it are the same as in a serial pass.
+    pool = ThreadPoolExecutor(max_workers=max_concurrency) if max_concurrency > 1 else None
+    in_flight = {}
+    _HARNESSES_CANCELLED.clear()
+    try:
+        for task in backend.due_tasks():
+            if processed_count >= max_tasks_per_run:
+                break
+            if pool is not None:
+                # Wait for a free slot before claiming, so every claimed
+                # task is either finished or in flight.
+                _complete_finished_harnesses(backend, in_flight, block=False)
+                while len(in_flight) >= max_concurrency:
+                    _complete_finished_harnesses(backend, in_flight, block=True)
             current_time = time.time()
-            next_attempt_at = task.get(FIELD_NEXT_ATTEMPT_AT)
-            if isinstance(next_attempt_at, (int, float)) and current_time < float(
-                next_attempt_at
-            ):
+            if not _is_due(task, current_time) or not _claim_task(backend, task, leases, current_time):
                 continue
 
-            if (
-                not isinstance(task.get(FIELD_TASK_ID), str)
-                or not isinstance(task.get(FIELD_STATUS), str)
-                or not isinstance(task.get(FIELD_TASK_FILE), str)
-            ):
-                _mark_failed(task, PRECHECK_INVALID)
-                _apply_retry_if_eligible(task, current_time)
-                _write_tasks_atomic(TASKS_PATH, tasks)
-                _run_terminal_validations(task)
-                _write_tasks_atomic(TASKS_PATH, tasks)
-                _emit_run_finished(task)
-                processed_count += 1
+            processed_count += 1
+            task_payload = _prepare_task(backend, task, current_time)
+            if task_payload is None:
+                continue
+            if pool is None:
+                try:
+                    result = _call_harness(task, task_payload, harness_timeout)
+                except BaseException:
+                    # _run_harness has killed the harness on its way out.
+                    _cancel_tasks(backend, [(task, current_time)])
+                    raise
+                _complete_task(backend, task, current_time, result)
                 continue
 
-            task_file = task.get(FIELD_TASK_FILE)
-
-            _transition(task, EVALUATING)
-            _write_tasks_atomic(TASKS_PATH, tasks)
-
-            try:
-                append_event(
-                    {
-                        "event_type": EVENT_RUN_STARTED,
-                        "task_id": task.get(FIELD_TASK_ID),
-                        "payload": {},
-                    }
-                )
-                if not os.path.exists(task_file):
-                    _mark_failed(task, TASK_FILE_MISSING)
-                else:
-                    try:
-                        task_payload = _load_json_object(task_file)
-                    except Exception:
-                        _mark_failed(task, TASK_FILE_INVALID)
-                        task_payload = None
-
-                    if task_payload is not None:
-                        valid, failure_reason = _validate_task_file_contract(task_payload)
-                        if not valid:
-                            _mark_failed(task, failure_reason if isinstance(failure_reason, str) else TASK_FILE_INVALID)
-                        else:
-                            result = _run_harness(task[FIELD_TASK_ID], task_payload)
-                            task[FIELD_LAST_EXIT_CODE] = result.returncode
-                            task[FIELD_HARNESS_LOG_PATH] = _harness_log_path(task[FIELD_TASK_ID])
-                            if result.returncode == 0:
-                                _transition(task, COMPLETED)
-                                task.pop(FIELD_FAILURE_REASON, None)
-                            else:
-                                _mark_failed(task, UNKNOWN_FAILURE)
-            except Exception:
-                _mark_failed(task, RUNNER_EXCEPTION)
-            _apply_retry_if_eligible(task, current_time)
-            _write_tasks_atomic(TASKS_PATH, tasks)
-            _run_terminal_validations(task)
-            _write_tasks_atomic(TASKS_PATH, tasks)
-            _emit_run_finished(task)
-            processed_count += 1
-            continue
+            future = pool.submit(_call_harness, task, task_payload, harness_timeout)
+            in_flight[future] = (task, current_time)
 
+        while in_flight:
+            _complete_finished_harnesses(backend, in_flight, block=True)
+    except BaseException:
+        if pool is not None:
+            _cancel_harnesses(backend, pool, in_flight)
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    _archive_validated_tasks(backend)
+    return processed_count
+
+
+_METRICS_EXPORTER = None
+
+
+def _start_metrics(serve_http: bool) -> MetricsExporter:
+    """Return the process-wide exporter, registering the runner's callback
+    metrics and starting the textfile timer on first use."""
+    global _METRICS_EXPORTER
+    if _METRICS_EXPORTER is None:
+        METRICS.callback(
+            "acp_queue_depth",
+            "Queue rows by status.",
+            "gauge",
+            lambda: get_queue_backend(TASKS_PATH).status_counts(),
+            "status",
+        )
+        METRICS.callback(
+            "acp_task_file_cache_lookups_total",
+            "Validated task-file cache lookups, by result.",
+            "counter",
+            lambda: {"hit": _TASK_FILE_CACHE.hits, "miss": _TASK_FILE_CACHE.misses},
+            "result",
+        )
+        _METRICS_EXPORTER = MetricsExporter(
+            METRICS, textfile_path=METRICS_TEXTFILE_PATH, interval=METRICS_INTERVAL_SECONDS
+        )
+        atexit.register(_METRICS_EXPORTER.close)
+    if serve_http and METRICS_PORT > 0:
+        _METRICS_EXPORTER.serve(METRICS_PORT)
+    return _METRICS_EXPORTER
+
+
+def main() -> int:
+    exporter = _start_metrics(serve_http=False)
+    try:
+        _run_pass()
+        maybe_write_checkpoint(EVENTS_LOG_PATH)
+    finally:
+        exporter.maybe_write(force=True)
     return 0
 
 
+def _seconds_until_next_pass(backend: QueueBackend) -> float | None:
+    next_due_at = backend.next_due_at()
+    if next_due_at is None:
+        return None
+    return max(0.0, next_due_at - time.time())
+
+
+def _seconds_until_housekeeping(retention_due_at: float) -> float | None:
+    """Return the seconds until the next orphan scan, retention sweep or
+    checkpoint is due, or None when none of them is configured."""
+    now = time.monotonic()
+    delays = []
+    if _load_task_leases() is not None:
+        delays.append(_NEXT_ORPHAN_SCAN_AT - now)
+    if RETENTION_INTERVAL_SECONDS > 0:
+        delays.append(retention_due_at - now)
+    checkpoint_delay = seconds_until_checkpoint(EVENTS_LOG_PATH)
+    if checkpoint_delay is not None:
+        delays.append(checkpoint_delay)
+    return max(0.0, min(delays)) if delays else None
+
+
+def _idle_delay(
+    backend: QueueBackend, processed_count: int, poll_interval: float, retention_due_at: float
+) -> float | None:
+    """Return how long to wait for a queue change before the next pass, or
+    None to wait for a change alone."""
+    delay = _seconds_until_next_pass(backend)
+    if delay == 0 and processed_count == 0:
+        # Due rows that could not be claimed (leased by another runner) wait
+        # for that runner's writes or poll_interval.
+        delay = poll_interval
+    housekeeping_delay = _seconds_until_housekeeping(retention_due_at)
+    if housekeeping_delay is not None and (delay is None or housekeeping_delay < delay):
+        # An idle queue sees no writes, so wake for the housekeeping that
+        # only runs between passes.
+        delay = housekeeping_delay
+    return delay
+
+
+def _maybe_apply_event_retention(backend: QueueBackend, due_at: float) -> float:
+    """Drop droppable event log segments if due_at has passed; return the next due time."""
+    if RETENTION_INTERVAL_SECONDS <= 0 or time.monotonic() < due_at:
+        return due_at
+    try:
+        # The archive is streamed; only statuses of tasks still in the log are kept.
+        apply_retention(EVENTS_LOG_PATH, itertools.chain(backend.all_tasks(), iter_archived_tasks(TASKS_PATH)))
+    except Exception:
+        # Retention is housekeeping; a failed sweep is retried next interval.
+        pass
+    return time.monotonic() + RETENTION_INTERVAL_SECONDS
+
+
 def run_forever(poll_interval: float) -> int:
+    """Run passes back to back while work is due, otherwise sleep until the
+    next retry or housekeeping deadline or a queue file change. poll_interval
+    is only used by the stat-polling fallback when inotify is unavailable."""
+    backend = get_queue_backend(TASKS_PATH)
+    watcher = QueueWatcher(TASKS_PATH, poll_interval)
+    exporter = _start_metrics(serve_http=True)
+    retention_due_at = time.monotonic()
     try:
         while True:
-            main()
-            time.sleep(poll_interval)
+            # Changes seen from here on, including this pass's own writes,
+            # wake the next wait; at worst that costs one idle pass.
+            watcher.drain()
+            processed_count = _run_pass()
+            exporter.maybe_write()
+            maybe_write_checkpoint(EVENTS_LOG_PATH)
+            retention_due_at = _maybe_apply_event_retention(backend, retention_due_at)
+            delay = _idle_delay(backend, processed_count, poll_interval, retention_due_at)
+            if delay is None or delay > 0:
+                watcher.wait(delay)
     except KeyboardInterrupt:
         return 0
+    finally:
+        watcher.close()
+        flush_events()
+        exporter.maybe_write(force=True)
 
 
 if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--archive":
+        print(archive_terminal_tasks())
+        raise SystemExit(0)
+    if len(sys.argv) >= 2 and sys.argv[1] == "--recover-orphans":
+        print(recover_orphaned_tasks())
+        raise SystemExit(0)
     if len(sys.argv) >= 2 and sys.argv[1] == "--loop":
         poll_interval = 2.0
         if len(sys.argv) >= 3:
@@ -0,0 +1,75 @@
+"""Bounded LRU cache of validated task files.
+
+Entries map a task file's identity, ``(path, st_mtime_ns, st_size, st_ino)``,
+to its validated payload and resolved repo path. Any rewrite or replacement
+of the file changes the key, so a stale payload is never returned; stale
+keys simply age out. Payloads are shared between attempts and must not be
+mutated.
+"""
+
+import collections
+import os
+import threading
+
+from acp_slice.contracts.acp_config import env_int
+
+
+# Entries kept by the runner's cache; 0 disables caching.
+TASK_FILE_CACHE_SIZE = env_int("ACP_TASK_FILE_CACHE_SIZE", 1024)
+
+
+def task_file_key(path: str) -> tuple:
+    """Return the cache key for path; raises OSError if it cannot be stat'ed."""
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class TaskFileCache:
+    """Thread-safe LRU of key -> (payload, resolved repo path)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        # id(payload) -> resolved repo path for payloads still cached; the
+        # entry keeps the payload alive, so its id cannot be reused meanwhile.
+        self._repos = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[dict, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, payload: dict, resolved_repo: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._repos.pop(id(previous[0]), None)
+            self._entries[key] = (payload, resolved_repo)
+            self._repos[id(payload)] = resolved_repo
+            while len(self._entries) > self.max_entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._repos.pop(id(evicted), None)
+
+    def resolved_repo(self, payload: dict) -> str | None:
+        """Return the resolved repo path cached with payload, if still cached."""
+        with self._lock:
+            return self._repos.get(id(payload))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._repos.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,189 @@
+"""Whole-queue consistency audit in one pass over the queue and event log.
+
+Usage: python -m acp_slice.telemetry.acp_consistency_audit [--workers N]
+
+Runs the ``validate_task_consistency`` checks for every queued (or archived)
+task at once. Queue rows are read once. The event log is streamed once from
+the newest lifecycle checkpoint, with status-change lines parsed in ordered
+chunks on a process pool and folded through the lifecycle state machine in
+log order, so the audit is O(tasks + events) rather than a replay per task.
+
+Findings, one per task:
+
+- ``STATE_MISMATCH``: the replayed lifecycle is valid but ends elsewhere
+  than the queue status;
+- ``REPLAY_INVALID``: the replayed lifecycle breaks the state machine;
+- ``NO_STATUS_EVENTS``: a queued task has no status changes in the log;
+- ``TASK_NOT_FOUND``: the log has status changes for a task that is neither
+  queued nor archived.
+"""
+
+import argparse
+import collections
+import contextlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from acp_slice.contracts.acp_contracts import FIELD_STATUS, FIELD_TASK_ID
+from acp_slice.queue.acp_queue_archive import iter_archived_tasks
+from acp_slice.queue.acp_queue_backends import get_queue_backend
+from acp_slice.telemetry import acp_consistency_validator
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH, flush_events
+from acp_slice.telemetry.acp_lifecycle_checkpoint import (
+    _STATUS_MARKER,
+    _iter_file_lines,
+    load_latest_checkpoint,
+    open_tail_files,
+)
+from acp_slice.telemetry.acp_lifecycle_tracker import (
+    apply_transition,
+    lifecycle_result,
+    new_lifecycle_state,
+    status_transition,
+)
+
+
+AUDIT_CHUNK_LINES = 10000
+FINDING_REASONS = ("STATE_MISMATCH", "REPLAY_INVALID", "NO_STATUS_EVENTS", "TASK_NOT_FOUND")
+
+
+def _parse_transitions(raw_lines: list[bytes]) -> list[tuple[str, str, str]]:
+    """Return (task_id, old_status, new_status) for the status changes in raw_lines."""
+    transitions = []
+    for raw_line in raw_lines:
+        try:
+            event = json.loads(raw_line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict) or not isinstance(event.get("task_id"), str):
+            continue
+        transition = status_transition(event)
+        if transition is not None:
+            transitions.append((event["task_id"], transition[0], transition[1]))
+    return transitions
+
+
+def _status_line_chunks(files: list, chunk_lines: int):
+    chunk = []
+    for log_file, start, _ in files:
+        for _, raw_line in _iter_file_lines(log_file, start):
+            if _STATUS_MARKER not in raw_line:
+                continue
+            chunk.append(raw_line)
+            if len(chunk) >= chunk_lines:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ordered_map(pool: ProcessPoolExecutor | None, chunks, window: int):
+    """Yield _parse_transitions of each chunk in order, keeping at most window in flight."""
+    if pool is None:
+        for chunk in chunks:
+            yield _parse_transitions(chunk)
+        return
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_parse_transitions, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def replay_all_lifecycles(
+    log_path: str, workers: int = 1, chunk_lines: int = AUDIT_CHUNK_LINES
+) -> tuple[dict, int]:
+    """Return ({task_id: lifecycle state} for every task in the log, status events read)."""
+    flush_events()
+    checkpoint = load_latest_checkpoint(log_path)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    events_read = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            # The files are opened under the log lock but read without it.
+            files, resumed, _ = open_tail_files(log_path, checkpoint, stack)
+            states = {}
+            if resumed:
+                states = {task_id: dict(state) for task_id, state in checkpoint["tasks"].items()}
+            for transitions in _ordered_map(pool, _status_line_chunks(files, chunk_lines), 2 * workers):
+                events_read += len(transitions)
+                for task_id, from_status, to_status in transitions:
+                    state = states.get(task_id)
+                    if state is None:
+                        state = states[task_id] = new_lifecycle_state()
+                    apply_transition(state, from_status, to_status)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return states, events_read
+
+
+def _finding(task_id: str, queue_task: dict | None, result: dict) -> dict | None:
+    """Return validate_task_consistency's failure for the task plus its task_id,
+    with a missing lifecycle reported as NO_STATUS_EVENTS, or None if valid."""
+    if queue_task is None:
+        return {"task_id": task_id, "valid": False, "reason": "TASK_NOT_FOUND"}
+    if not result.get("valid"):
+        if result.get("reason") == "NO_STATUS_EVENTS":
+            return {"task_id": task_id, "valid": False, "reason": "NO_STATUS_EVENTS"}
+        return {"task_id": task_id, "valid": False, "reason": "REPLAY_INVALID", "details": result}
+    if queue_task.get(FIELD_STATUS) != result.get("final_status"):
+        return {
+            "task_id": task_id,
+            "valid": False,
+            "reason": "STATE_MISMATCH",
+            "queue_status": queue_task.get(FIELD_STATUS),
+            "replay_status": result.get("final_status"),
+        }
+    return None
+
+
+def audit_consistency(
+    queue_tasks: list[dict], log_path: str, workers: int = 1, chunk_lines: int = AUDIT_CHUNK_LINES
+) -> dict:
+    """Check every task in queue_tasks (first row per task_id wins) against the log.
+
+    Returns {"tasks", "events", "valid", "counts": {reason: n}, "findings": [...]}.
+    """
+    rows = {}
+    for task in queue_tasks:
+        task_id = task.get(FIELD_TASK_ID) if isinstance(task, dict) else None
+        if isinstance(task_id, str):
+            rows.setdefault(task_id, task)
+    states, events_read = replay_all_lifecycles(log_path, workers, chunk_lines)
+
+    findings = []
+    empty = new_lifecycle_state()
+    for task_id in list(rows) + sorted(task_id for task_id in states if task_id not in rows):
+        finding = _finding(task_id, rows.get(task_id), lifecycle_result(states.get(task_id, empty)))
+        if finding is not None:
+            findings.append(finding)
+    counts = collections.Counter(finding["reason"] for finding in findings)
+    return {
+        "tasks": len(rows),
+        "events": events_read,
+        "valid": len(rows) - sum(counts[reason] for reason in FINDING_REASONS if reason != "TASK_NOT_FOUND"),
+        "counts": {reason: counts[reason] for reason in FINDING_REASONS},
+        "findings": findings,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.telemetry.acp_consistency_audit", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="event parsing processes")
+    args = parser.parse_args(argv)
+    tasks_path = acp_consistency_validator.TASKS_PATH
+    queue_tasks = get_queue_backend(tasks_path).all_tasks() + list(iter_archived_tasks(tasks_path))
+    report = audit_consistency(queue_tasks, EVENTS_LOG_PATH, workers=args.workers)
+    print(json.dumps(report, sort_keys=True))
+    return 0 if not report["findings"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,12 @@
 """Validate consistency between queue task state and replayed lifecycle state."""
 
-import json
 import os
 from pathlib import Path
 
-from acp_slice.contracts.acp_contracts import FIELD_STATUS, FIELD_TASK_ID
-from acp_slice.telemetry.acp_replay_validator import validate_task_lifecycle
+from acp_slice.contracts.acp_contracts import FIELD_STATUS
+from acp_slice.queue.acp_queue_archive import find_archived_task
+from acp_slice.queue.acp_queue_backends import get_queue_backend
+from acp_slice.telemetry.acp_replay_validator import LIFECYCLE_MODE_REPLAY, validate_task_lifecycle
 
 
 SLICE_ROOT = Path(__file__).resolve().parents[1]
@@ -13,39 +14,24 @@ RUNTIME_ROOT = Path(os.environ.get("ACP_SLICE_RUNTIME_ROOT", str(SLICE_ROOT / ".
 TASKS_PATH = str(RUNTIME_ROOT / "queue" / "tasks.jsonl")
 
 
-def _load_queue_tasks() -> list[dict]:
-    tasks = []
-    if not os.path.exists(TASKS_PATH):
-        return tasks
+def _load_queue_task(task_id: str) -> dict | None:
+    # The hot queue wins over the archive: a row only ever leaves the queue
+    # after it has been archived.
     try:
-        with open(TASKS_PATH, "r", encoding="utf-8") as queue_file:
-            for line in queue_file:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    item = json.loads(line)
-                except Exception:
-                    continue
-                if isinstance(item, dict):
-                    tasks.append(item)
+        task = get_queue_backend(TASKS_PATH).get_task(task_id)
+        if task is None:
+            task = find_archived_task(TASKS_PATH, task_id)
+        return task
     except Exception:
-        return []
-    return tasks
+        return None
 
 
-def validate_task_consistency(task_id: str) -> dict:
-    queue_tasks = _load_queue_tasks()
-    queue_task = None
-    for task in queue_tasks:
-        if isinstance(task, dict) and task.get(FIELD_TASK_ID) == task_id:
-            queue_task = task
-            break
-
+def validate_task_consistency(task_id: str, lifecycle_mode: str = LIFECYCLE_MODE_REPLAY) -> dict:
+    queue_task = _load_queue_task(task_id)
     if queue_task is None:
         return {"valid": False, "reason": "TASK_NOT_FOUND"}
 
-    replay_result = validate_task_lifecycle(task_id)
+    replay_result = validate_task_lifecycle(task_id, mode=lifecycle_mode)
     if not replay_result.get("valid"):
         return {"valid": False, "reason": "REPLAY_INVALID", "details": replay_result}
 
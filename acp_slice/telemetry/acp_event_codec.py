@@ -0,0 +1,59 @@
+"""Event record encoder producing the same bytes as ``json.dumps(sort_keys=True)``.
+
+Event records always carry the same six keys, so their sorted order is fixed:
+``event_type``, ``event_version``, ``payload``, ``run_id``, ``task_id``,
+``timestamp``. ``event_version`` and ``run_id`` are constant for a process,
+so the text between ``event_type`` and ``payload`` and between ``payload`` and
+``task_id`` is precomputed once. Only the payload goes through a JSON encoder,
+built once because ``json.dumps(..., sort_keys=True)`` constructs a new one on
+every call; string fields use the same C string escaper ``json.dumps`` uses.
+Any record that does not have exactly that shape is encoded with
+``json.dumps``.
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+
+_encode_payload = json.JSONEncoder(sort_keys=True).encode
+
+EVENT_KEYS = frozenset({"event_type", "event_version", "payload", "run_id", "task_id", "timestamp"})
+
+
+def _encode_scalar(value: object) -> str:
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    return json.dumps(value)
+
+
+def encode_event_generic(record: dict) -> bytes:
+    return (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+
+
+class EventCodec:
+    def __init__(self, event_version: str, run_id: str) -> None:
+        self.event_version = event_version
+        self.run_id = run_id
+        self._after_event_type = ', "event_version": ' + json.dumps(event_version) + ', "payload": '
+        self._after_payload = ', "run_id": ' + json.dumps(run_id) + ', "task_id": '
+
+    def encode(self, record: dict) -> bytes:
+        """Return the newline-terminated log line for record."""
+        if (
+            record.keys() != EVENT_KEYS
+            or record["event_version"] != self.event_version
+            or record["run_id"] != self.run_id
+        ):
+            return encode_event_generic(record)
+        return (
+            '{"event_type": '
+            + _encode_scalar(record["event_type"])
+            + self._after_event_type
+            + _encode_payload(record["payload"])
+            + self._after_payload
+            + _encode_scalar(record["task_id"])
+            + ', "timestamp": '
+            + _encode_scalar(record["timestamp"])
+            + "}\n"
+        ).encode("utf-8")
@@ -0,0 +1,201 @@
+"""Persistent task_id -> byte offset sidecar index for the ACP event log.
+
+The index lives next to the log as ``<log>.idx`` and holds one entry per log
+line: ``<offset>\\t<length>\\t<task_id json>``. Entries are contiguous, so the
+byte range covered by the index is always the end of its last entry. Only the
+writer appends to the index; readers scan any log tail it does not cover yet
+into their in-memory view, and rebuild the index from scratch when it no
+longer lines up with the log.
+"""
+
+import json
+import os
+import tempfile
+
+
+INDEX_SUFFIX = ".idx"
+
+# Per-process view of each index file, keyed by log path.
+_INDEX_CACHE = {}
+
+
+def index_path_for(log_path: str) -> str:
+    return log_path + INDEX_SUFFIX
+
+
+def format_index_entry(offset: int, length: int, task_id: object) -> bytes:
+    key = task_id if isinstance(task_id, str) else None
+    return f"{offset}\t{length}\t{json.dumps(key)}\n".encode("utf-8")
+
+
+def append_index_entries(log_path: str, entries: list[tuple[int, int, object]]) -> None:
+    """Append (offset, length, task_id) entries for freshly written log lines."""
+    if not entries:
+        return
+    data = b"".join(format_index_entry(offset, length, task_id) for offset, length, task_id in entries)
+    with open(index_path_for(log_path), "ab") as index_file:
+        index_file.write(data)
+
+
+def _line_task_id(raw_line: bytes) -> str | None:
+    line = raw_line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except Exception:
+        return None
+    if not isinstance(event, dict):
+        return None
+    task_id = event.get("task_id")
+    return task_id if isinstance(task_id, str) else None
+
+
+def _scan_log(log_path: str, start: int) -> list[tuple[int, int, str | None]]:
+    """Return index entries for every complete log line at or after ``start``."""
+    entries = []
+    with open(log_path, "rb") as log_file:
+        log_file.seek(start)
+        offset = start
+        for raw_line in log_file:
+            if not raw_line.endswith(b"\n"):
+                # A writer is mid-line; leave it for the next catch-up.
+                break
+            entries.append((offset, len(raw_line), _line_task_id(raw_line)))
+            offset += len(raw_line)
+    return entries
+
+
+def _new_state() -> dict:
+    # "indexed" is the log range the sidecar covers; "covered" also includes
+    # any tail this process scanned from the log itself.
+    return {"index_ino": None, "index_size": 0, "indexed": 0, "covered": 0, "offsets": {}}
+
+
+def _add_entries(state: dict, entries: list[tuple[int, int, object]]) -> bool:
+    for offset, length, task_id in entries:
+        if offset != state["covered"]:
+            return False
+        state["covered"] = offset + length
+        if isinstance(task_id, str):
+            state["offsets"].setdefault(task_id, []).append((offset, length))
+    return True
+
+
+def _add_index_entries(state: dict, entries: list[tuple[int, int, object]]) -> bool:
+    for position, (offset, length, _) in enumerate(entries):
+        if offset != state["indexed"]:
+            return False
+        state["indexed"] = offset + length
+        if state["indexed"] > state["covered"]:
+            # Past the tail already scanned from the log.
+            return _add_entries(state, entries[position:])
+    return True
+
+
+def _read_index_tail(state: dict, index_path: str) -> bool:
+    with open(index_path, "rb") as index_file:
+        index_file.seek(state["index_size"])
+        entries = []
+        consumed = state["index_size"]
+        for raw_entry in index_file:
+            if not raw_entry.endswith(b"\n"):
+                break
+            consumed += len(raw_entry)
+            try:
+                offset_text, length_text, key_text = raw_entry.decode("utf-8").rstrip("\n").split("\t", 2)
+                entries.append((int(offset_text), int(length_text), json.loads(key_text)))
+            except Exception:
+                return False
+    state["index_size"] = consumed
+    return _add_index_entries(state, entries)
+
+
+def rebuild_index(log_path: str) -> dict:
+    """Rewrite the sidecar index from a full log scan and cache the result."""
+    index_path = index_path_for(log_path)
+    entries = _scan_log(log_path, 0) if os.path.exists(log_path) else []
+    directory = os.path.dirname(index_path) or "."
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as tmp_file:
+        for offset, length, task_id in entries:
+            tmp_file.write(format_index_entry(offset, length, task_id))
+        temp_path = tmp_file.name
+    os.replace(temp_path, index_path)
+
+    state = _new_state()
+    index_stat = os.stat(index_path)
+    state["index_ino"] = index_stat.st_ino
+    state["index_size"] = index_stat.st_size
+    _add_entries(state, entries)
+    state["indexed"] = state["covered"]
+    _INDEX_CACHE[log_path] = state
+    return state
+
+
+def _load_index(log_path: str) -> dict:
+    index_path = index_path_for(log_path)
+    try:
+        index_stat = os.stat(index_path)
+    except FileNotFoundError:
+        return rebuild_index(log_path)
+
+    state = _INDEX_CACHE.get(log_path)
+    if (
+        state is None
+        or state["index_ino"] != index_stat.st_ino
+        or state["index_size"] > index_stat.st_size
+    ):
+        state = _new_state()
+        state["index_ino"] = index_stat.st_ino
+    if not _read_index_tail(state, index_path):
+        return rebuild_index(log_path)
+
+    log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    if log_size < state["covered"]:
+        return rebuild_index(log_path)
+    if log_size > state["covered"]:
+        # The writer may be appending these entries right now; keep them in
+        # memory rather than racing it on the sidecar.
+        _add_entries(state, _scan_log(log_path, state["covered"]))
+
+    _INDEX_CACHE[log_path] = state
+    return state
+
+
+def _read_indexed_events(log_path: str, task_id: str, offsets: list[tuple[int, int]]) -> list[dict] | None:
+    events = []
+    with open(log_path, "rb") as log_file:
+        for offset, length in offsets:
+            log_file.seek(offset)
+            event = json.loads(log_file.read(length).decode("utf-8").strip())
+            if not isinstance(event, dict) or event.get("task_id") != task_id:
+                return None
+            events.append(event)
+    return events
+
+
+def _task_offsets(state: dict, task_id: str, start: int) -> list[tuple[int, int]]:
+    offsets = state["offsets"].get(task_id, [])
+    return offsets if start <= 0 else [entry for entry in offsets if entry[0] >= start]
+
+
+def read_task_events(log_path: str, task_id: str, start: int = 0) -> list[dict] | None:
+    """Return a task's events at or after byte start via the index, or None
+    when the index is unusable."""
+    try:
+        state = _load_index(log_path)
+        events = _read_indexed_events(log_path, task_id, _task_offsets(state, task_id, start))
+        if events is None:
+            state = rebuild_index(log_path)
+            events = _read_indexed_events(log_path, task_id, _task_offsets(state, task_id, start))
+        return events
+    except Exception:
+        _INDEX_CACHE.pop(log_path, None)
+        return None
+
+
+def indexed_task_ids(log_path: str) -> set[str]:
+    """Return the task_ids with at least one line in the log at log_path."""
+    if not os.path.exists(log_path):
+        return set()
+    return set(_load_index(log_path)["offsets"])
@@ -1,34 +1,92 @@
-"""Read ACP event logs deterministically in file order."""
+"""Read ACP event logs deterministically in file order.
+
+Sealed segments are read oldest first, then the active log. A rotation
+between listing the segments and reading the active log would hide the newly
+sealed segment, so reads retry when the active log was replaced meanwhile.
+Reads for one task or event type decode only candidate lines (see
+``acp_event_scan``).
+"""
 
 import json
 import os
 
-from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH
+from acp_slice.telemetry.acp_event_index import read_task_events
+from acp_slice.telemetry.acp_event_scan import event_filters, prefilter_enabled, scan_file
+from acp_slice.telemetry.acp_event_segments import list_segments, read_segment_events, segment_task_ids
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH, flush_events
+
+
+READ_ATTEMPTS = 3
+
+
+def _log_identity(path: str) -> int | None:
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
 
 
-def get_events() -> list[dict]:
-    """Return all valid event dicts in file order."""
+def _read_log(path: str, task_id: str | None = None, event_type: str | None = None) -> list[dict]:
     events = []
-    if not os.path.exists(EVENTS_LOG_PATH):
+    if not os.path.exists(path):
         return events
+    filters = event_filters(task_id, event_type)
+    if filters and prefilter_enabled():
+        return scan_file(path, filters)
+    with open(path, "r", encoding="utf-8") as events_file:
+        for line in events_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(event, dict) and all(event.get(field) == value for field, value in filters.items()):
+                events.append(event)
+    return events
+
 
+def _read_all(task_id: str | None, event_type: str | None = None) -> list[dict]:
+    events = []
+    for attempt in range(READ_ATTEMPTS):
+        identity = _log_identity(EVENTS_LOG_PATH)
+        events = []
+        try:
+            for _, path in list_segments(EVENTS_LOG_PATH):
+                if task_id is None or task_id in segment_task_ids(path):
+                    events.extend(read_segment_events(path, task_id, event_type))
+            active = None
+            if task_id is not None and identity is not None:
+                # The sidecar index lets us decode only this task's lines;
+                # fall back to a scan whenever it cannot be trusted.
+                active = read_task_events(EVENTS_LOG_PATH, task_id)
+                if active is not None and event_type is not None:
+                    active = [event for event in active if event.get("event_type") == event_type]
+            if active is None:
+                active = _read_log(EVENTS_LOG_PATH, task_id, event_type)
+        except FileNotFoundError:
+            # A segment was dropped by retention since it was listed.
+            continue
+        events.extend(active)
+        if _log_identity(EVENTS_LOG_PATH) == identity:
+            break
+    return events
+
+
+def get_events(event_type: str | None = None) -> list[dict]:
+    """Return all valid event dicts in file order, optionally of one event type."""
+    flush_events()
     try:
-        with open(EVENTS_LOG_PATH, "r", encoding="utf-8") as events_file:
-            for line in events_file:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                except Exception:
-                    continue
-                if isinstance(event, dict):
-                    events.append(event)
+        return _read_all(None, event_type)
     except Exception:
         return []
-    return events
 
 
 def get_events_for_task(task_id: str) -> list[dict]:
     """Return all events whose task_id matches exactly."""
-    return [event for event in get_events() if event.get("task_id") == task_id]
+    flush_events()
+    try:
+        return _read_all(task_id)
+    except Exception:
+        return []
@@ -0,0 +1,162 @@
+"""Retention of sealed ACP event log segments.
+
+Usage: python -m acp_slice.telemetry.acp_event_retention [--dry-run]
+
+A sealed segment may be dropped once every task with events in it is
+terminal in the queue and already validated: its replayed lifecycle is valid
+and ends in the queue status, as ``validate_task_consistency`` checks.
+Archived queue rows count as queue rows. Only
+whole task histories are dropped. A task with events in a kept segment or in
+the active log keeps every segment it appears in, so replay never sees a
+partial history. Segments younger than ``RETENTION_GRACE_SECONDS`` are kept
+too, leaving room for events still being written for just-finished tasks,
+and so is the newest segment, so segment numbers are never reused.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from typing import Iterable
+
+from acp_slice.contracts.acp_config import env_float
+from acp_slice.contracts.acp_contracts import FIELD_STATUS, FIELD_TASK_ID
+from acp_slice.queue.acp_queue_archive import iter_archived_tasks
+from acp_slice.queue.acp_queue_backends import get_queue_backend
+from acp_slice.telemetry import acp_consistency_validator
+from acp_slice.telemetry.acp_event_index import indexed_task_ids
+from acp_slice.telemetry.acp_event_segments import (
+    COMPRESSED_SUFFIX,
+    list_segments,
+    log_lock,
+    meta_path_for,
+    read_segment_events,
+    segment_task_ids,
+)
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH
+from acp_slice.telemetry.acp_lifecycle_tracker import (
+    TERMINAL_STATUSES,
+    apply_transition,
+    lifecycle_result,
+    new_lifecycle_state,
+    status_transition,
+)
+
+
+# --loop runners apply retention at most this often; 0 disables it.
+RETENTION_INTERVAL_SECONDS = env_float("ACP_EVENTS_RETENTION_SECONDS", 0.0)
+RETENTION_GRACE_SECONDS = 60.0
+
+
+def _pin_shared(candidates: dict, pinned: set) -> None:
+    # Drop candidates sharing a task with a kept segment, until stable.
+    changed = True
+    while changed:
+        changed = False
+        for path, task_ids in list(candidates.items()):
+            if task_ids & pinned:
+                del candidates[path]
+                pinned.update(task_ids)
+                changed = True
+
+
+def _replay_candidates(candidates: dict) -> dict:
+    states = {}
+    for path in candidates:
+        for event in read_segment_events(path):
+            transition = status_transition(event)
+            task_id = event.get("task_id")
+            if transition is None or not isinstance(task_id, str):
+                continue
+            state = states.setdefault(task_id, new_lifecycle_state())
+            apply_transition(state, transition[0], transition[1])
+    return {task_id: lifecycle_result(state) for task_id, state in states.items()}
+
+
+def droppable_segments(
+    log_path: str,
+    queue_tasks: Iterable[dict],
+    now: float | None = None,
+    grace_seconds: float = RETENTION_GRACE_SECONDS,
+) -> list[str]:
+    """Return the sealed segments of log_path that retention may drop.
+
+    queue_tasks is read once, first row per task_id winning, and only the
+    statuses of tasks with events in a segment are kept, so the queue archive
+    can be streamed in without loading it.
+    """
+    now = time.time() if now is None else now
+
+    # Rotation moves active-log events into a new segment; hold it off while
+    # taking the snapshot so no task's events are missed.
+    with log_lock(log_path, exclusive=True):
+        segments = [path for _, path in list_segments(log_path)]
+        pinned = indexed_task_ids(log_path)
+
+    segment_ids = {path: segment_task_ids(path) for path in segments}
+    wanted = set().union(*segment_ids.values())
+    statuses = {}
+    for task in queue_tasks:
+        task_id = task.get(FIELD_TASK_ID)
+        if task_id in wanted:
+            statuses.setdefault(task_id, task.get(FIELD_STATUS))
+
+    candidates = {}
+    for path in segments:
+        task_ids = segment_ids[path]
+        sealed = path.endswith(COMPRESSED_SUFFIX)
+        if (
+            not sealed
+            or path == segments[-1]
+            or now - os.path.getmtime(path) < grace_seconds
+            or any(statuses.get(task_id) not in TERMINAL_STATUSES for task_id in task_ids)
+        ):
+            pinned.update(task_ids)
+            continue
+        candidates[path] = task_ids
+    _pin_shared(candidates, pinned)
+
+    # Every event of a remaining candidate's tasks is in the candidates now.
+    results = _replay_candidates(candidates)
+    no_status_events = lifecycle_result(new_lifecycle_state())
+    for task_ids in list(candidates.values()):
+        for task_id in task_ids:
+            result = results.get(task_id, no_status_events)
+            if not result.get("valid") or result.get("final_status") != statuses[task_id]:
+                pinned.add(task_id)
+    _pin_shared(candidates, pinned)
+    return list(candidates)
+
+
+def apply_retention(
+    log_path: str, queue_tasks: Iterable[dict], dry_run: bool = False, now: float | None = None
+) -> list[str]:
+    """Drop every droppable segment and its metadata; return their paths."""
+    dropped = droppable_segments(log_path, queue_tasks, now=now)
+    if dry_run:
+        return dropped
+    for path in dropped:
+        for doomed in (path, meta_path_for(path)):
+            try:
+                os.unlink(doomed)
+            except FileNotFoundError:
+                pass
+    return dropped
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.telemetry.acp_event_retention", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--dry-run", action="store_true", help="list droppable segments without deleting them")
+    args = parser.parse_args(argv)
+    tasks_path = acp_consistency_validator.TASKS_PATH
+    queue_tasks = itertools.chain(get_queue_backend(tasks_path).all_tasks(), iter_archived_tasks(tasks_path))
+    for path in apply_retention(EVENTS_LOG_PATH, queue_tasks, dry_run=args.dry_run):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
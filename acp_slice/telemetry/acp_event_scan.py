@@ -0,0 +1,153 @@
+"""Byte-prefiltered event log scans for readers that want one task or event type.
+
+A filtered read only needs the lines whose ``task_id`` or ``event_type``
+equals one value. Rather than decoding every line, the scan memory-maps a
+plain log file and jumps between occurrences of the value's JSON encoding
+(``"<value>"``, in both its ASCII-escaped and raw UTF-8 spellings), decoding
+just the lines that contain one. Whatever the separators around it, a line
+whose field equals the value contains one of those tokens verbatim unless the
+line uses escapes, so lines containing a backslash are decoded too.
+Candidates are then parsed and checked exactly like a full scan.
+
+Results match the text-mode reader: lines end at ``\\n``, ``\\r\\n`` or a lone
+``\\r`` (universal newlines), and a file holding invalid UTF-8 anywhere raises
+``UnicodeDecodeError`` just as decoding it line by line would, so readers
+return no events for it either way.
+
+``ACP_EVENTS_READ_MODE=stream`` turns the prefilter off.
+"""
+
+import codecs
+import json
+import mmap
+import os
+
+
+EVENTS_READ_MODE_MMAP = "mmap"
+EVENTS_READ_MODE_STREAM = "stream"
+EVENTS_READ_MODE = os.environ.get("ACP_EVENTS_READ_MODE", EVENTS_READ_MODE_MMAP)
+
+_ESCAPE = b"\\"
+# Bytes of the mapped file validated as UTF-8 per step.
+_UTF8_CHECK_CHUNK = 1 << 20
+
+
+def prefilter_enabled() -> bool:
+    return EVENTS_READ_MODE != EVENTS_READ_MODE_STREAM
+
+
+def value_tokens(value: str) -> tuple[bytes, ...]:
+    """Return the byte strings one of which every escape-free line holding
+    value as a JSON string contains: its ASCII-escaped and raw UTF-8 JSON."""
+    escaped = json.dumps(value).encode("utf-8")
+    try:
+        raw = json.dumps(value, ensure_ascii=False).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates cannot appear unescaped in valid UTF-8.
+        return (escaped,)
+    return (escaped,) if raw == escaped else (escaped, raw)
+
+
+def event_filters(task_id: str | None = None, event_type: str | None = None) -> dict:
+    """Return the {field: value} filters a read asks for."""
+    filters = {}
+    if task_id is not None:
+        filters["task_id"] = task_id
+    if event_type is not None:
+        filters["event_type"] = event_type
+    return filters
+
+
+def _parse_line(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except Exception:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _matches(event: dict, filters: dict) -> bool:
+    return all(event.get(field) == value for field, value in filters.items())
+
+
+def _needles(filters: dict) -> tuple[bytes, ...]:
+    # task_id is the most selective field when both are given.
+    value = filters.get("task_id", filters.get("event_type"))
+    return value_tokens(value) + (_ESCAPE,)
+
+
+def filter_lines(raw_lines, filters: dict) -> list[dict]:
+    """Return the events among raw (bytes) lines that match every filter.
+
+    Raises UnicodeDecodeError if any line is not valid UTF-8.
+    """
+    needles = _needles(filters)
+    events = []
+    for raw_line in raw_lines:
+        if not raw_line.isascii():
+            # Binary lines end at b"\n", so each holds whole characters.
+            raw_line.decode("utf-8")
+        for line in raw_line.splitlines() if b"\r" in raw_line else (raw_line,):
+            if not any(needle in line for needle in needles):
+                continue
+            event = _parse_line(line.decode("utf-8"))
+            if event is not None and _matches(event, filters):
+                events.append(event)
+    return events
+
+
+def _check_utf8(view: mmap.mmap) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for offset in range(0, len(view), _UTF8_CHECK_CHUNK):
+        chunk = view[offset : offset + _UTF8_CHECK_CHUNK]
+        if not chunk.isascii() or decoder.getstate()[0]:
+            decoder.decode(chunk)
+    decoder.decode(b"", final=True)
+
+
+def _candidate_spans(view: mmap.mmap, needles: tuple[bytes, ...]):
+    """Yield (start, end) of each line containing any needle, in file order."""
+    size = len(view)
+    next_hits = [view.find(needle) for needle in needles]
+    while True:
+        hits = [hit for hit in next_hits if hit >= 0]
+        if not hits:
+            return
+        hit = min(hits)
+        start = view.rfind(b"\n", 0, hit) + 1
+        end = view.find(b"\n", hit)
+        if end < 0:
+            end = size
+        # Only look for b"\r" inside the b"\n" line, so a file without any
+        # costs no extra scan.
+        carriage_return = view.rfind(b"\r", start, hit)
+        if carriage_return >= 0:
+            start = carriage_return + 1
+        carriage_return = view.find(b"\r", hit, end)
+        if carriage_return >= 0:
+            end = carriage_return
+        yield start, end
+        for index, needle in enumerate(needles):
+            if 0 <= next_hits[index] <= end:
+                next_hits[index] = view.find(needle, end + 1)
+
+
+def scan_file(path: str, filters: dict) -> list[dict]:
+    """Return the events of a plain log file that match every filter, in file order.
+
+    Raises UnicodeDecodeError if the file is not valid UTF-8.
+    """
+    with open(path, "rb") as log_file:
+        if os.fstat(log_file.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            _check_utf8(view)
+            events = []
+            for start, end in _candidate_spans(view, _needles(filters)):
+                event = _parse_line(view[start:end].decode("utf-8"))
+                if event is not None and _matches(event, filters):
+                    events.append(event)
+            return events
@@ -0,0 +1,312 @@
+"""Sealed segments of the ACP event log.
+
+The active log (``events.jsonl``) is rotated by renaming it to a numbered
+segment, ``events.jsonl.<n>``; higher numbers are newer. A background sealer
+then gzips it to ``events.jsonl.<n>.gz`` and writes ``events.jsonl.<n>.meta.json``
+with the segment's task_ids, so per-task readers only decompress segments
+that hold the task. A segment left uncompressed by a crash is still readable
+and is sealed on the next rotation.
+
+Writers append under a shared flock on ``events.jsonl.lock``; rotation takes
+it exclusively, so no writer appends to a file once it has become a segment.
+"""
+
+import datetime
+import fcntl
+import gzip
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from acp_slice.telemetry.acp_event_index import index_path_for
+from acp_slice.telemetry.acp_event_scan import event_filters, filter_lines, prefilter_enabled, scan_file
+
+
+LOCK_SUFFIX = ".lock"
+COMPRESSED_SUFFIX = ".gz"
+META_SUFFIX = ".meta.json"
+COMPRESS_LEVEL = 6
+
+# Per-process view of segment metadata: segment path -> (mtime_ns, task_ids).
+_META_CACHE = {}
+
+_SEALINGS = {}
+_SEALINGS_LOCK = threading.Lock()
+
+
+@contextmanager
+def log_lock(log_path: str, exclusive: bool = False):
+    # Appends share the lock; rotation and retention snapshots take it
+    # exclusively. flock is per open file, so threads exclude each other too.
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with open(log_path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def segment_path(log_path: str, number: int, compressed: bool = True) -> str:
+    return f"{log_path}.{number}" + (COMPRESSED_SUFFIX if compressed else "")
+
+
+def meta_path_for(path: str) -> str:
+    if path.endswith(COMPRESSED_SUFFIX):
+        path = path[: -len(COMPRESSED_SUFFIX)]
+    return path + META_SUFFIX
+
+
+def list_segments(log_path: str) -> list[tuple[int, str]]:
+    """Return (number, path) for every segment of log_path, oldest first.
+
+    While a segment is being sealed both files exist; the compressed one wins.
+    """
+    directory = os.path.dirname(log_path) or "."
+    pattern = re.compile(re.escape(os.path.basename(log_path)) + r"\.(\d+)(\.gz)?$")
+    segments = {}
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        match = pattern.match(name)
+        if match is None:
+            continue
+        number = int(match.group(1))
+        if match.group(2) or number not in segments:
+            segments[number] = os.path.join(directory, name)
+    return sorted(segments.items())
+
+
+def open_segment(path: str, binary: bool = False):
+    """Open a segment's uncompressed content for reading (text by default)."""
+    kwargs = {} if binary else {"encoding": "utf-8"}
+    if path.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, "rb" if binary else "rt", **kwargs)
+    try:
+        return open(path, "rb" if binary else "r", **kwargs)
+    except FileNotFoundError:
+        # Sealed since it was listed.
+        return gzip.open(path + COMPRESSED_SUFFIX, "rb" if binary else "rt", **kwargs)
+
+
+def _parse_event(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except Exception:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def read_segment_events(path: str, task_id: str | None = None, event_type: str | None = None) -> list[dict]:
+    """Return a segment's valid events in file order, optionally for one task
+    and/or event type."""
+    filters = event_filters(task_id, event_type)
+    if filters and prefilter_enabled():
+        if not path.endswith(COMPRESSED_SUFFIX) and os.path.exists(path):
+            try:
+                return scan_file(path, filters)
+            except FileNotFoundError:
+                # Sealed since it was checked; read the compressed copy.
+                pass
+        with open_segment(path, binary=True) as segment_file:
+            return filter_lines(segment_file, filters)
+    events = []
+    with open_segment(path) as segment_file:
+        for line in segment_file:
+            event = _parse_event(line)
+            if event is not None and all(event.get(field) == value for field, value in filters.items()):
+                events.append(event)
+    return events
+
+
+def iter_log_lines(log_path: str):
+    """Yield every line of the sealed segments, then of the active log."""
+    for _, path in list_segments(log_path):
+        try:
+            segment_file = open_segment(path)
+        except FileNotFoundError:
+            # Dropped by retention since it was listed.
+            continue
+        with segment_file:
+            yield from segment_file
+    if os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf-8") as log_file:
+            yield from log_file
+
+
+def _scan_task_ids(path: str) -> frozenset:
+    with open_segment(path) as segment_file:
+        task_ids = {event.get("task_id") for event in map(_parse_event, segment_file) if event is not None}
+    return frozenset(task_id for task_id in task_ids if isinstance(task_id, str))
+
+
+def segment_task_ids(path: str) -> frozenset:
+    """Return the task_ids with events in a segment, from its metadata if sealed."""
+    meta_path = meta_path_for(path)
+    try:
+        mtime_ns = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        return _scan_task_ids(path)
+    cached = _META_CACHE.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    with open(meta_path, "r", encoding="utf-8") as meta_file:
+        task_ids = frozenset(json.load(meta_file)["task_ids"])
+    _META_CACHE[path] = (mtime_ns, task_ids)
+    return task_ids
+
+
+def _event_time(event: dict | None) -> float | None:
+    try:
+        timestamp = datetime.datetime.fromisoformat(event["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Event timestamps are naive UTC.
+    return timestamp.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def first_event_time(log_path: str) -> float | None:
+    """Return the epoch time of the first event in log_path, if readable."""
+    try:
+        with open(log_path, "r", encoding="utf-8") as log_file:
+            return _event_time(_parse_event(log_file.readline()))
+    except OSError:
+        return None
+
+
+def rotation_due(log_path: str, rotate_bytes: int, rotate_seconds: int, now: float) -> bool:
+    try:
+        size = os.path.getsize(log_path)
+    except FileNotFoundError:
+        return False
+    if size == 0:
+        return False
+    if rotate_bytes > 0 and size >= rotate_bytes:
+        return True
+    if rotate_seconds > 0:
+        started = first_event_time(log_path)
+        return started is not None and now - started >= rotate_seconds
+    return False
+
+
+def rotate_log(log_path: str, rotate_bytes: int, rotate_seconds: int, now: float) -> str | None:
+    """Rename the active log to the next segment if it is still due.
+
+    Returns the new (uncompressed) segment path, or None when another writer
+    rotated first. The active log's sidecar index is dropped; the next append
+    starts a new log and index.
+    """
+    with log_lock(log_path, exclusive=True):
+        if not rotation_due(log_path, rotate_bytes, rotate_seconds, now):
+            return None
+        segments = list_segments(log_path)
+        number = segments[-1][0] + 1 if segments else 1
+        sealed_path = segment_path(log_path, number, compressed=False)
+        os.rename(log_path, sealed_path)
+        try:
+            os.unlink(index_path_for(log_path))
+        except FileNotFoundError:
+            pass
+    return sealed_path
+
+
+def seal_segment(path: str) -> str | None:
+    """Compress one uncompressed segment and write its metadata.
+
+    Returns the compressed path, or None if another process is sealing it or
+    already has.
+    """
+    directory = os.path.dirname(path) or "."
+    compressed_path = path + COMPRESSED_SUFFIX
+    with open(path, "rb") as source:
+        try:
+            fcntl.flock(source, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        if not os.path.exists(path):
+            return None
+        source_stat = os.fstat(source.fileno())
+        task_ids = set()
+        count = 0
+        first_event = last_event = None
+        with tempfile.NamedTemporaryFile("wb", dir=directory, prefix=".seal-", delete=False) as tmp_file:
+            with gzip.GzipFile(
+                filename=os.path.basename(path), mode="wb", fileobj=tmp_file, compresslevel=COMPRESS_LEVEL
+            ) as gzip_file:
+                for raw_line in source:
+                    gzip_file.write(raw_line)
+                    event = _parse_event(raw_line.decode("utf-8", errors="replace"))
+                    if event is None:
+                        continue
+                    count += 1
+                    if first_event is None:
+                        first_event = event
+                    last_event = event
+                    if isinstance(event.get("task_id"), str):
+                        task_ids.add(event["task_id"])
+        meta = {
+            "events": count,
+            "first_timestamp": (first_event or {}).get("timestamp"),
+            "last_timestamp": (last_event or {}).get("timestamp"),
+            "task_ids": sorted(task_ids),
+        }
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=".seal-", delete=False) as meta_file:
+            json.dump(meta, meta_file, sort_keys=True)
+        os.replace(meta_file.name, meta_path_for(path))
+        # Keep the segment's last write time; retention ages segments by it.
+        os.utime(tmp_file.name, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_file.name, compressed_path)
+        os.unlink(path)
+    return compressed_path
+
+
+def seal_segments(log_path: str) -> list[str]:
+    """Seal every uncompressed segment of log_path."""
+    sealed = []
+    for _, path in list_segments(log_path):
+        if path.endswith(COMPRESSED_SUFFIX):
+            continue
+        try:
+            compressed_path = seal_segment(path)
+        except FileNotFoundError:
+            continue
+        if compressed_path is not None:
+            sealed.append(compressed_path)
+    return sealed
+
+
+def _run_sealing(log_path: str) -> None:
+    try:
+        # Segments rotated while we were sealing are picked up by another round.
+        while seal_segments(log_path):
+            pass
+    except Exception:
+        # Unsealed segments stay readable and are retried on the next rotation.
+        pass
+    finally:
+        with _SEALINGS_LOCK:
+            _SEALINGS.pop(log_path, None)
+
+
+def seal_in_background(log_path: str) -> None:
+    with _SEALINGS_LOCK:
+        if log_path in _SEALINGS:
+            return
+        thread = threading.Thread(target=_run_sealing, args=(log_path,), name="acp-event-sealing", daemon=True)
+        _SEALINGS[log_path] = thread
+    thread.start()
+
+
+def wait_for_sealing(log_path: str) -> None:
+    with _SEALINGS_LOCK:
+        thread = _SEALINGS.get(log_path)
+    if thread is not None:
+        thread.join()
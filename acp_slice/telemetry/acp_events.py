@@ -1,12 +1,32 @@
 """Append-only ACP event telemetry writer."""
 
+import atexit
 import datetime
-import json
+import errno
 import os
 import sys
+import threading
+import time
 import uuid
 from pathlib import Path
 
+from acp_slice.contracts.acp_config import env_int
+from acp_slice.contracts.acp_contracts import (
+    EVENT_DEAD_LETTERED,
+    EVENT_RUN_FINISHED,
+    EVENT_RUN_STARTED,
+)
+from acp_slice.telemetry.acp_event_codec import EventCodec
+from acp_slice.telemetry.acp_event_index import append_index_entries
+from acp_slice.telemetry.acp_event_segments import (
+    first_event_time,
+    log_lock,
+    rotate_log,
+    seal_in_background,
+    wait_for_sealing,
+)
+from acp_slice.telemetry.acp_lifecycle_tracker import forget_tasks, observe_event
+
 
 SLICE_ROOT = Path(__file__).resolve().parents[1]
 RUNTIME_ROOT = Path(os.environ.get("ACP_SLICE_RUNTIME_ROOT", str(SLICE_ROOT / ".tmp")))
@@ -14,11 +34,253 @@ EVENTS_LOG_PATH = str(RUNTIME_ROOT / "logs" / "events.jsonl")
 EVENT_VERSION = "v0"
 EVENT_WRITE_ERRORS_TOTAL = 0
 RUN_ID = str(uuid.uuid4())
+EVENT_CODEC = EventCodec(EVENT_VERSION, RUN_ID)
+
+# Durability policies for group commits:
+# - none: hand each batch to the OS, never fsync
+# - batch: fsync once per group commit
+# - always: write and fsync every event individually
+FSYNC_NONE = "none"
+FSYNC_BATCH = "batch"
+FSYNC_ALWAYS = "always"
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_BATCH, FSYNC_ALWAYS)
+
+# Lifecycle points where buffered events must reach the log before returning.
+FLUSH_EVENT_TYPES = frozenset({EVENT_RUN_STARTED, EVENT_RUN_FINISHED, EVENT_DEAD_LETTERED})
+
+
+def _count_write_errors(count: int) -> None:
+    global EVENT_WRITE_ERRORS_TOTAL
+    EVENT_WRITE_ERRORS_TOTAL += count
+    if os.getenv("ACP_EVENTS_WARN") == "1":
+        print("ACP event logging failed", file=sys.stderr)
+
+
+class EventWriter:
+    """Group-commit writer that keeps the events log open between batches.
+
+    Records are buffered and committed every ``batch_size`` events, every
+    ``batch_interval_ms`` milliseconds, or immediately for event types in
+    ``flush_event_types``. Like ``append_event``, no method ever raises:
+    failures are counted in ``EVENT_WRITE_ERRORS_TOTAL`` and the batch is
+    dropped.
+
+    With ``rotate_bytes`` or ``rotate_seconds`` set, a commit that leaves the
+    log at least that large (or its first event that old) rotates it into a
+    segment that is sealed in the background. Every process writing the log
+    must then use rotation, since appends are only safe under the log lock.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        batch_size: int = 1,
+        batch_interval_ms: int = 0,
+        fsync_policy: str = FSYNC_NONE,
+        flush_event_types: frozenset = FLUSH_EVENT_TYPES,
+        rotate_bytes: int = 0,
+        rotate_seconds: int = 0,
+    ) -> None:
+        # path=None follows the module-level EVENTS_LOG_PATH at commit time.
+        self._path = path
+        self.batch_size = max(1, batch_size)
+        self.batch_interval_ms = max(0, batch_interval_ms)
+        self.fsync_policy = fsync_policy if fsync_policy in FSYNC_POLICIES else FSYNC_NONE
+        self.flush_event_types = flush_event_types
+        self.rotate_bytes = max(0, rotate_bytes)
+        self.rotate_seconds = max(0, rotate_seconds)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._handle = None
+        self._handle_path = None
+        self._handle_started = None
+        self._timer = None
+        self._closed = threading.Event()
+        # Set while our last write left a partial line at the end of the log.
+        self._torn = False
+
+    def append(self, record: dict) -> None:
+        try:
+            line = EVENT_CODEC.encode(record)
+        except Exception:
+            _count_write_errors(1)
+            # append_event has already fed the record to the tracker.
+            forget_tasks([record.get("task_id")])
+            return
+        with self._lock:
+            self._pending.append((line, record.get("task_id")))
+            if (
+                self.fsync_policy == FSYNC_ALWAYS
+                or len(self._pending) >= self.batch_size
+                or record.get("event_type") in self.flush_event_types
+            ):
+                self._commit_locked()
+                return
+        self._ensure_timer()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit_locked()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._commit_locked()
+            self._close_handle_locked()
+        wait_for_sealing(self._path or EVENTS_LOG_PATH)
+
+    @property
+    def rotating(self) -> bool:
+        return self.rotate_bytes > 0 or self.rotate_seconds > 0
+
+    def _ensure_timer(self) -> None:
+        if self.batch_interval_ms <= 0 or self._timer is not None:
+            return
+        self._timer = threading.Thread(target=self._timer_loop, name="acp-event-writer", daemon=True)
+        self._timer.start()
+
+    def _timer_loop(self) -> None:
+        interval = self.batch_interval_ms / 1000.0
+        while not self._closed.wait(interval):
+            self.flush()
+
+    def _close_handle_locked(self) -> None:
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except Exception:
+                pass
+        self._handle = None
+        self._handle_path = None
+        self._handle_started = None
+
+    def _open_locked(self, path: str):
+        if self._handle is not None and self._handle_path == path:
+            return self._handle
+        self._close_handle_locked()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unbuffered O_APPEND handle: tell() after a write is the end of our
+        # batch even if another process appended concurrently.
+        self._handle = open(path, "ab", buffering=0)
+        self._handle_path = path
+        if self.rotating:
+            self._handle_started = first_event_time(path) or time.time()
+        return self._handle
+
+    def _check_rotated_locked(self, path: str) -> None:
+        # Another writer may have rotated the file under our open handle.
+        if self._handle is None or self._handle_path != path:
+            return
+        try:
+            current = os.stat(path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self._handle.fileno()).st_ino:
+            self._close_handle_locked()
+
+    def _rotation_due_locked(self, end: int) -> bool:
+        if self.rotate_bytes > 0 and end >= self.rotate_bytes:
+            return True
+        return (
+            self.rotate_seconds > 0
+            and self._handle_started is not None
+            and time.time() - self._handle_started >= self.rotate_seconds
+        )
+
+    def _rotate_locked(self, path: str) -> None:
+        self._close_handle_locked()
+        try:
+            rotated = rotate_log(path, self.rotate_bytes, self.rotate_seconds, time.time())
+        except Exception:
+            # Retried after the next commit.
+            return
+        if rotated is not None:
+            seal_in_background(path)
+
+    def _commit_locked(self) -> None:
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = []
+        path = self._path or EVENTS_LOG_PATH
+        if not self.rotating:
+            self._write_batch_locked(path, batch)
+            return
+        try:
+            with log_lock(path):
+                self._check_rotated_locked(path)
+                end = self._write_batch_locked(path, batch)
+        except Exception:
+            # Taking the log lock or checking for rotation failed before any write.
+            _count_write_errors(len(batch))
+            forget_tasks({task_id for _, task_id in batch})
+            return
+        if end is not None and self._rotation_due_locked(end):
+            self._rotate_locked(path)
+
+    def _write_batch_locked(self, path: str, batch: list) -> int | None:
+        """Write and index one batch; return the log size after it, or None."""
+        # Terminate a partial line left by a failed write, so this batch's
+        # first event does not run into it.
+        prefix = b"\n" if self._torn else b""
+        data = prefix + b"".join(line for line, _ in batch)
+        written = 0
+        try:
+            handle = self._open_locked(path)
+            # An unbuffered write may stop short (e.g. disk full) without raising.
+            view = memoryview(data)
+            while written < len(data):
+                count = handle.write(view[written:])
+                if not count:
+                    raise OSError(errno.EIO, "short write to the event log", path)
+                written += count
+            end = handle.tell()
+            if self.fsync_policy != FSYNC_NONE:
+                os.fsync(handle.fileno())
+        except Exception:
+            if written:
+                self._torn = data[written - 1 : written] != b"\n"
+            self._close_handle_locked()
+            _count_write_errors(len(batch))
+            # Tracked lifecycles no longer match the log; force a replay.
+            forget_tasks({task_id for _, task_id in batch})
+            return None
+        self._torn = False
+
+        offset = end - len(data) + len(prefix)
+        entries = []
+        for line, task_id in batch:
+            entries.append((offset, len(line), task_id))
+            offset += len(line)
+        try:
+            append_index_entries(path, entries)
+        except Exception:
+            # The index is advisory; readers rebuild it when it falls behind.
+            pass
+        return end
+
+
+def _writer_from_env() -> EventWriter:
+    return EventWriter(
+        batch_size=env_int("ACP_EVENTS_BATCH_SIZE", 1),
+        batch_interval_ms=env_int("ACP_EVENTS_BATCH_INTERVAL_MS", 0),
+        fsync_policy=os.environ.get("ACP_EVENTS_FSYNC", FSYNC_NONE),
+        rotate_bytes=env_int("ACP_EVENTS_ROTATE_BYTES", 0),
+        rotate_seconds=env_int("ACP_EVENTS_ROTATE_SECONDS", 0),
+    )
+
+
+EVENT_WRITER = _writer_from_env()
+atexit.register(EVENT_WRITER.close)
+
+
+def flush_events() -> None:
+    """Commit any buffered events so readers in this process see them."""
+    EVENT_WRITER.flush()
 
 
 def append_event(event: dict) -> None:
     """Append one structured event line and never raise."""
-    global EVENT_WRITE_ERRORS_TOTAL
     try:
         payload = event.get("payload", {})
         if not isinstance(payload, dict):
@@ -31,11 +293,8 @@ def append_event(event: dict) -> None:
             "task_id": event.get("task_id"),
             "payload": payload,
         }
-        os.makedirs(os.path.dirname(EVENTS_LOG_PATH), exist_ok=True)
-        with open(EVENTS_LOG_PATH, "a", encoding="utf-8") as events_file:
-            events_file.write(json.dumps(record, sort_keys=True) + "\n")
     except Exception:
-        EVENT_WRITE_ERRORS_TOTAL += 1
-        if os.getenv("ACP_EVENTS_WARN") == "1":
-            print("ACP event logging failed", file=sys.stderr)
+        _count_write_errors(1)
         return
+    observe_event(record)
+    EVENT_WRITER.append(record)
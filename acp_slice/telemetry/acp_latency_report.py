@@ -0,0 +1,133 @@
+"""Phase latency report over an ACP event log.
+
+Usage: python -m acp_slice.telemetry.acp_latency_report [events.jsonl] [--json]
+
+Streams the log once, sealed segments first. Phase durations come from the ``spans`` payload of
+``EVENT_RUN_FINISHED`` (one sample per finished attempt and phase). Queue wait
+is the wall-clock time from a task's ``EVENT_TASK_ADMITTED`` to its next
+``EVENT_RUN_STARTED``; tasks admitted without that event have no queue wait
+sample. Prints count and p50/p95/p99/max seconds per phase.
+"""
+
+import argparse
+import array
+import datetime
+import json
+import math
+import os
+import sys
+
+from acp_slice.contracts.acp_contracts import (
+    EVENT_RUN_FINISHED,
+    EVENT_RUN_STARTED,
+    EVENT_TASK_ADMITTED,
+    PAYLOAD_SPANS,
+    SPANS,
+)
+from acp_slice.telemetry.acp_event_segments import iter_log_lines, list_segments
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH
+
+
+QUEUE_WAIT = "queue_wait"
+REPORT_PHASES = (QUEUE_WAIT,) + SPANS
+REPORT_QUANTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+
+
+def _parse_timestamp(value: object) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_phase_samples(lines) -> dict:
+    """Return {phase: array of seconds} from an iterable of event log lines."""
+    samples = {phase: array.array("d") for phase in REPORT_PHASES}
+    admitted_at = {}
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        event_type = event.get("event_type")
+        task_id = event.get("task_id")
+        if event_type == EVENT_RUN_FINISHED:
+            payload = event.get("payload")
+            spans = payload.get(PAYLOAD_SPANS) if isinstance(payload, dict) else None
+            if not isinstance(spans, dict):
+                continue
+            for phase, seconds in spans.items():
+                if isinstance(seconds, (int, float)):
+                    samples.setdefault(phase, array.array("d")).append(seconds)
+        elif event_type == EVENT_TASK_ADMITTED and isinstance(task_id, str):
+            timestamp = _parse_timestamp(event.get("timestamp"))
+            if timestamp is not None:
+                admitted_at.setdefault(task_id, timestamp)
+        elif event_type == EVENT_RUN_STARTED and task_id in admitted_at:
+            timestamp = _parse_timestamp(event.get("timestamp"))
+            if timestamp is not None:
+                wait = (timestamp - admitted_at.pop(task_id)).total_seconds()
+                samples[QUEUE_WAIT].append(max(0.0, wait))
+    return samples
+
+
+def summarize(values) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    summary = {"count": len(ordered)}
+    for name, quantile in REPORT_QUANTILES:
+        # Nearest-rank percentile.
+        rank = max(1, math.ceil(len(ordered) * quantile))
+        summary[name] = round(ordered[rank - 1], 6)
+    summary["max"] = round(ordered[-1], 6)
+    return summary
+
+
+def latency_report(path: str) -> dict:
+    """Report over the log at path and its sealed segments."""
+    samples = collect_phase_samples(iter_log_lines(path))
+    return {phase: summarize(values) for phase, values in samples.items()}
+
+
+def format_report(report: dict) -> str:
+    columns = ("count",) + tuple(name for name, _ in REPORT_QUANTILES) + ("max",)
+    lines = [f"{'phase (seconds)':<22}" + "".join(f"{column:>12}" for column in columns)]
+    for phase, summary in report.items():
+        cells = []
+        for column in columns:
+            value = summary.get(column)
+            if value is None:
+                cells.append(f"{'-':>12}")
+            elif column == "count":
+                cells.append(f"{value:>12}")
+            else:
+                cells.append(f"{value:>12.6f}")
+        lines.append(f"{phase:<22}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.telemetry.acp_latency_report", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("events_path", nargs="?", default=None, help="event log (default: the runtime root's)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    path = args.events_path or EVENTS_LOG_PATH
+    if not os.path.exists(path) and not list_segments(path):
+        print(f"cannot read {path}: no such event log", file=sys.stderr)
+        return 1
+    try:
+        report = latency_report(path)
+    except OSError as exc:
+        print(f"cannot read {path}: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, sort_keys=True) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""Persisted task lifecycle checkpoints over the ACP event log.
+
+Usage: python -m acp_slice.telemetry.acp_lifecycle_checkpoint [events.jsonl]
+
+A checkpoint is ``<log>.checkpoints/lifecycle-<ns>-<pid>.json`` holding every
+task's replayed lifecycle state plus the log position it covers:
+
+    {"segment": n, "offset": bytes, "head": sha1 of the first line}
+
+meaning every sealed segment numbered up to ``n`` and the first ``offset``
+bytes of the file that was the active log when it was written. That file is
+segment ``n + 1`` once rotated, else still the active log; ``head`` tells
+whether it still is the same file. Lifecycle replays resume from the newest
+checkpoint and read only events after its position. A checkpoint whose
+position no longer matches the log is ignored, falling back to a full replay.
+"""
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from acp_slice.contracts.acp_config import env_float
+from acp_slice.contracts.acp_contracts import EVENT_STATUS_CHANGED
+from acp_slice.telemetry.acp_event_index import read_task_events
+from acp_slice.telemetry.acp_event_segments import list_segments, log_lock, open_segment, segment_task_ids
+from acp_slice.telemetry.acp_events import EVENTS_LOG_PATH, flush_events
+from acp_slice.telemetry.acp_lifecycle_tracker import apply_transition, new_lifecycle_state, status_transition
+
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_DIR_SUFFIX = ".checkpoints"
+CHECKPOINT_PREFIX = "lifecycle-"
+CHECKPOINTS_KEPT = 2
+# Runners write a checkpoint after a pass once the newest one is this old; 0 disables.
+CHECKPOINT_INTERVAL_SECONDS = env_float("ACP_LIFECYCLE_CHECKPOINT_SECONDS", 0.0)
+
+_STATUS_MARKER = json.dumps(EVENT_STATUS_CHANGED).encode("utf-8")
+
+# Per-process view of parsed checkpoints: path -> (mtime_ns, checkpoint).
+_LOADED = {}
+
+
+def checkpoint_dir_for(log_path: str) -> str:
+    return log_path + CHECKPOINT_DIR_SUFFIX
+
+
+def _checkpoint_paths(log_path: str) -> list[str]:
+    """Return checkpoint file paths, newest first."""
+    directory = checkpoint_dir_for(log_path)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    names = [name for name in names if name.startswith(CHECKPOINT_PREFIX) and name.endswith(".json")]
+    return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+
+
+def _read_checkpoint(path: str) -> dict | None:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = _LOADED.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    _LOADED[path] = (mtime_ns, checkpoint)
+    return checkpoint
+
+
+def load_latest_checkpoint(log_path: str) -> dict | None:
+    """Return the newest readable checkpoint for log_path, if any."""
+    for path in _checkpoint_paths(log_path):
+        checkpoint = _read_checkpoint(path)
+        if checkpoint is not None:
+            return checkpoint
+    return None
+
+
+def _fingerprint(first_line: bytes) -> str:
+    return hashlib.sha1(first_line).hexdigest()
+
+
+def _open_log_file(path: str, active: bool):
+    return open(path, "rb") if active else open_segment(path, binary=True)
+
+
+def _iter_file_lines(log_file, start: int):
+    """Yield (offset, raw line) for the complete lines of an open log file from start."""
+    log_file.seek(start)
+    offset = start
+    for raw_line in log_file:
+        if not raw_line.endswith(b"\n"):
+            # A writer is mid-line in the active log; a torn last line of
+            # a sealed segment is never completed.
+            return
+        yield offset, raw_line
+        offset += len(raw_line)
+
+
+def _iter_lines(path: str, start: int, active: bool):
+    """Yield (offset, raw line) for the complete lines of a log file from start."""
+    with _open_log_file(path, active) as log_file:
+        yield from _iter_file_lines(log_file, start)
+
+
+def _head_matches(path: str, active: bool, head: str | None) -> bool:
+    try:
+        log_file = open(path, "rb") if active else open_segment(path, binary=True)
+    except FileNotFoundError:
+        return False
+    with log_file:
+        return head is not None and _fingerprint(log_file.readline()) == head
+
+
+def _tail_files(log_path: str, position: dict) -> list[tuple[str, int, bool]] | None:
+    """Return (path, start offset, is active log) for every file holding events
+    after position, oldest first, or None if position is not in this log.
+    Call under the log lock so no rotation happens meanwhile."""
+    segment = position.get("segment")
+    offset = position.get("offset")
+    if not isinstance(segment, int) or not isinstance(offset, int):
+        return None
+    files = [(path, 0, False) for number, path in list_segments(log_path) if number > segment]
+    files.append((log_path, 0, True))
+    path, _, active = files[0]
+    if offset > 0:
+        if not _head_matches(path, active, position.get("head")):
+            return None
+        files[0] = (path, offset, active)
+    return files
+
+
+def open_tail_files(log_path: str, checkpoint: dict | None, stack: contextlib.ExitStack) -> tuple[list, bool, int]:
+    """Open every file holding events after checkpoint, or the whole log when
+    there is none or it no longer matches, closing them with stack.
+
+    Only the listing and opening happen under the log lock. Rotation renames
+    and retention unlinks, so the open files stay readable afterwards and a
+    long read never holds off a writer's rotation. Returns ([(file, start
+    offset, is active log)], whether the checkpoint applies, number of the
+    newest segment then).
+    """
+    with log_lock(log_path):
+        files = None if checkpoint is None else _tail_files(log_path, checkpoint["position"])
+        resumed = files is not None
+        if files is None:
+            files = _tail_files(log_path, {"segment": 0, "offset": 0})
+        segments = list_segments(log_path)
+        opened = []
+        for path, start, active in files:
+            if active and not os.path.exists(path):
+                continue
+            opened.append((stack.enter_context(_open_log_file(path, active)), start, active))
+    return opened, resumed, segments[-1][0] if segments else 0
+
+
+def _fold(state: dict, event: dict) -> None:
+    transition = status_transition(event)
+    if transition is not None:
+        apply_transition(state, transition[0], transition[1])
+
+
+def resume_lifecycle_state(log_path: str, task_id: str) -> dict | None:
+    """Return task_id's lifecycle state from the newest checkpoint plus the
+    events logged after it, or None when no usable checkpoint exists."""
+    checkpoint = load_latest_checkpoint(log_path)
+    if checkpoint is None:
+        return None
+    flush_events()
+    state = dict(checkpoint["tasks"].get(task_id) or new_lifecycle_state())
+    with log_lock(log_path):
+        files = _tail_files(log_path, checkpoint["position"])
+        if files is None:
+            return None
+        for path, start, active in files:
+            if active:
+                if not os.path.exists(path):
+                    continue
+                events = read_task_events(path, task_id, start)
+                if events is not None:
+                    for event in events:
+                        _fold(state, event)
+                    continue
+            elif start == 0 and task_id not in segment_task_ids(path):
+                continue
+            for _, raw_line in _iter_lines(path, start, active):
+                if _STATUS_MARKER not in raw_line:
+                    continue
+                try:
+                    event = json.loads(raw_line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and event.get("task_id") == task_id:
+                    _fold(state, event)
+    return state
+
+
+def _replay_tail(files: list, checkpoint: dict | None, last_segment: int) -> tuple[dict, dict]:
+    """Fold every status change in files into a copy of checkpoint's states.
+
+    files and last_segment come from open_tail_files; checkpoint is None when
+    they cover the whole log. Returns (tasks, position reached).
+    """
+    tasks = {}
+    if checkpoint is not None:
+        tasks = {task_id: dict(state) for task_id, state in checkpoint["tasks"].items()}
+    position = {"segment": last_segment, "offset": 0, "head": None}
+    for log_file, start, active in files:
+        end = start
+        for offset, raw_line in _iter_file_lines(log_file, start):
+            end = offset + len(raw_line)
+            if active and offset == 0:
+                position["head"] = _fingerprint(raw_line)
+            if _STATUS_MARKER not in raw_line:
+                continue
+            try:
+                event = json.loads(raw_line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict) or not isinstance(event.get("task_id"), str):
+                continue
+            _fold(tasks.setdefault(event["task_id"], new_lifecycle_state()), event)
+        if active:
+            position["offset"] = end
+            if end > 0 and position["head"] is None:
+                # Resumed mid-file; the head is unchanged from the checkpoint.
+                position["head"] = checkpoint["position"]["head"]
+    return tasks, position
+
+
+def write_checkpoint(log_path: str) -> str:
+    """Write a checkpoint covering the whole log and return its path."""
+    flush_events()
+    checkpoint = load_latest_checkpoint(log_path)
+    with contextlib.ExitStack() as stack:
+        files, resumed, last_segment = open_tail_files(log_path, checkpoint, stack)
+        tasks, position = _replay_tail(files, checkpoint if resumed else None, last_segment)
+    directory = checkpoint_dir_for(log_path)
+    os.makedirs(directory, exist_ok=True)
+    payload = {
+        "version": CHECKPOINT_VERSION,
+        "created_at": datetime.datetime.utcnow().isoformat(),
+        "position": position,
+        "tasks": tasks,
+    }
+    path = os.path.join(directory, f"{CHECKPOINT_PREFIX}{time.time_ns():020d}-{os.getpid()}.json")
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=".tmp-", delete=False) as tmp_file:
+        json.dump(payload, tmp_file, sort_keys=True)
+    os.replace(tmp_file.name, path)
+    for stale_path in _checkpoint_paths(log_path)[CHECKPOINTS_KEPT:]:
+        try:
+            os.unlink(stale_path)
+        except FileNotFoundError:
+            pass
+        _LOADED.pop(stale_path, None)
+    return path
+
+
+def maybe_write_checkpoint(log_path: str, interval: float = CHECKPOINT_INTERVAL_SECONDS) -> str | None:
+    """Write a checkpoint if the newest one is at least interval seconds old.
+
+    Never raises; returns the new checkpoint path, or None.
+    """
+    if interval <= 0:
+        return None
+    try:
+        paths = _checkpoint_paths(log_path)
+        if paths and time.time() - os.path.getmtime(paths[0]) < interval:
+            return None
+        return write_checkpoint(log_path)
+    except Exception:
+        return None
+
+
+def seconds_until_checkpoint(log_path: str, interval: float = CHECKPOINT_INTERVAL_SECONDS) -> float | None:
+    """Return the seconds until maybe_write_checkpoint would write again, or
+    None when checkpoints are disabled.
+
+    A log with no readable checkpoint counts as just checkpointed, so an idle
+    runner whose writes fail retries once per interval instead of spinning.
+    """
+    if interval <= 0:
+        return None
+    try:
+        paths = _checkpoint_paths(log_path)
+        if not paths:
+            return interval
+        return max(0.0, os.path.getmtime(paths[0]) + interval - time.time())
+    except OSError:
+        return interval
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m acp_slice.telemetry.acp_lifecycle_checkpoint", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("events_path", nargs="?", default=None, help="event log (default: the runtime root's)")
+    args = parser.parse_args(argv)
+    print(write_checkpoint(args.events_path or EVENTS_LOG_PATH))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
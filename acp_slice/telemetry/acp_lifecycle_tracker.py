@@ -0,0 +1,137 @@
+"""Incremental task lifecycle state machine fed by the events writer.
+
+The state machine here is the single definition of lifecycle validity: the
+replay validator folds logged transitions through ``apply_transition`` and the
+events writer feeds every appended ``EVENT_STATUS_CHANGED`` into the tasks
+being tracked, so both always agree on what a valid lifecycle is.
+"""
+
+import threading
+
+from acp_slice.contracts.acp_contracts import (
+    ALLOWED_TRANSITIONS,
+    COMPLETED,
+    DEAD_LETTER,
+    EVENT_STATUS_CHANGED,
+    QUEUED,
+    REFUSED,
+)
+
+
+TERMINAL_STATUSES = {DEAD_LETTER, COMPLETED, REFUSED}
+
+# task_id -> lifecycle state, only for tasks whose full history this process holds.
+_TRACKED = {}
+_TRACKED_LOCK = threading.Lock()
+
+
+def new_lifecycle_state() -> dict:
+    return {"status": None, "transition_count": 0, "violation": None}
+
+
+def status_transition(event: dict) -> tuple[str, str] | None:
+    """Return (old_status, new_status) for a well-formed status change event."""
+    if event.get("event_type") != EVENT_STATUS_CHANGED:
+        return None
+    payload = event.get("payload")
+    if not isinstance(payload, dict):
+        return None
+    from_status = payload.get("old_status")
+    to_status = payload.get("new_status")
+    if not isinstance(from_status, str) or not isinstance(to_status, str):
+        return None
+    return from_status, to_status
+
+
+def _invalid_transition(from_status: str, to_status: str, index: int) -> dict:
+    return {
+        "valid": False,
+        "reason": "INVALID_TRANSITION",
+        "from": from_status,
+        "to": to_status,
+        "index": index,
+    }
+
+
+def apply_transition(state: dict, from_status: str, to_status: str) -> None:
+    """Advance state by one transition, keeping only the first violation."""
+    index = state["transition_count"]
+    state["transition_count"] = index + 1
+    if state["violation"] is not None:
+        return
+
+    if index == 0:
+        if from_status != QUEUED:
+            state["violation"] = {
+                "valid": False,
+                "reason": "INVALID_BOOTSTRAP",
+                "from": from_status,
+            }
+            return
+        current_status = from_status
+    else:
+        current_status = state["status"]
+
+    if current_status in TERMINAL_STATUSES or from_status != current_status:
+        state["violation"] = _invalid_transition(current_status, to_status, index)
+        return
+
+    allowed_next = ALLOWED_TRANSITIONS.get(from_status)
+    if allowed_next is None or to_status not in allowed_next:
+        state["violation"] = _invalid_transition(from_status, to_status, index)
+        return
+
+    state["status"] = to_status
+
+
+def lifecycle_result(state: dict) -> dict:
+    """Render a lifecycle state in the validate_task_lifecycle result shape."""
+    if state["transition_count"] == 0:
+        return {"valid": False, "reason": "NO_STATUS_EVENTS"}
+    if state["violation"] is not None:
+        return dict(state["violation"])
+    return {
+        "valid": True,
+        "final_status": state["status"],
+        "transition_count": state["transition_count"],
+    }
+
+
+def track_task(task_id: str, state: dict | None = None) -> None:
+    """Start tracking task_id from a seed state (a fresh lifecycle by default)."""
+    with _TRACKED_LOCK:
+        _TRACKED[task_id] = dict(state) if state is not None else new_lifecycle_state()
+
+
+def is_tracked(task_id: str) -> bool:
+    with _TRACKED_LOCK:
+        return task_id in _TRACKED
+
+
+def forget_tasks(task_ids) -> None:
+    with _TRACKED_LOCK:
+        for task_id in task_ids:
+            _TRACKED.pop(task_id, None)
+
+
+def observe_event(record: dict) -> None:
+    """Feed one appended event record into its task's tracked state."""
+    task_id = record.get("task_id")
+    if not isinstance(task_id, str):
+        return
+    transition = status_transition(record)
+    if transition is None:
+        return
+    with _TRACKED_LOCK:
+        state = _TRACKED.get(task_id)
+        if state is not None:
+            apply_transition(state, transition[0], transition[1])
+
+
+def tracked_lifecycle(task_id: str) -> dict | None:
+    """Return the tracked lifecycle result in O(1), or None if not tracked."""
+    with _TRACKED_LOCK:
+        state = _TRACKED.get(task_id)
+        if state is None:
+            return None
+        return lifecycle_result(state)
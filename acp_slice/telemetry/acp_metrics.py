@@ -0,0 +1,313 @@
+"""In-process runner metrics with Prometheus text exposition.
+
+Counters and histograms are updated on the hot path; both are a dict or list
+update under a per-metric lock. Gauges that need I/O (queue depth) and the
+event write error counter are callbacks read only when metrics are rendered.
+``MetricsExporter`` renders ``METRICS`` to a textfile (atomically, for a
+node_exporter textfile collector) every ``interval`` seconds from a timer
+thread, so the file's mtime stays fresh while a runner idles, and can serve
+it at ``http://127.0.0.1:<port>/metrics``. Like event telemetry, exporting
+never raises into the runner.
+"""
+
+import bisect
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from acp_slice.contracts.acp_config import env_float, env_int
+from acp_slice.telemetry import acp_events
+
+
+METRICS_TEXTFILE_PATH = os.environ.get("ACP_METRICS_TEXTFILE") or None
+METRICS_INTERVAL_SECONDS = env_float("ACP_METRICS_INTERVAL_SECONDS", 15.0)
+METRICS_PORT = env_int("ACP_METRICS_PORT", 0)
+METRICS_HOST = "127.0.0.1"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+HARNESS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by one label."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, label: str | None = None) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: object = None, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: object = None) -> float:
+        with self._lock:
+            return self._values.get(label_value, 0)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: str(item[0]))
+        if self.label is None:
+            return [(self.name, {}, values[0][1] if values else 0)]
+        return [(self.name, {self.label: label_value}, value) for label_value, value in values]
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: "Histogram") -> None:
+        self._histogram = histogram
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values (seconds)."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket bound plus the +Inf overflow slot.
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        """Context manager observing the wall time of its block."""
+        return _Timer(self)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            samples.append((self.name + "_bucket", {"le": _format_value(bound)}, cumulative))
+        samples.append((self.name + "_sum", {}, total))
+        samples.append((self.name + "_count", {}, cumulative))
+        return samples
+
+
+class CallbackMetric:
+    """Counter or gauge whose value is read from callback at render time.
+
+    callback returns a number, or a {label_value: number} mapping when the
+    metric has a label.
+    """
+
+    def __init__(self, name: str, help_text: str, metric_type: str, callback, label: str | None = None) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.callback = callback
+        self.label = label
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        value = self.callback()
+        if self.label is None:
+            return [(self.name, {}, value)]
+        items = sorted(value.items(), key=lambda item: str(item[0]))
+        return [(self.name, {self.label: label_value}, count) for label_value, count in items]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add metric, replacing any metric registered under the same name."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label: str | None = None) -> Counter:
+        return self.register(Counter(name, help_text, label))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, buckets))
+
+    def callback(self, name: str, help_text: str, metric_type: str, callback, label: str | None = None):
+        return self.register(CallbackMetric(name, help_text, metric_type, callback, label))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A failing callback drops its metric from this scrape only.
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+TASKS_PROCESSED = METRICS.counter("acp_tasks_processed_total", "Tasks finished by a runner, by resulting status.", "status")
+TASK_FAILURES = METRICS.counter("acp_task_failures_total", "Task failures by failure reason.", "reason")
+RETRIES_SCHEDULED = METRICS.counter("acp_retries_scheduled_total", "Failed tasks requeued for another attempt.")
+DEAD_LETTERS = METRICS.counter("acp_dead_letters_total", "Tasks moved to DEAD_LETTER, by dead letter reason.", "reason")
+QUEUE_LOAD_SECONDS = METRICS.histogram("acp_queue_load_seconds", "Time to load the queue at the start of a pass.")
+QUEUE_WRITE_SECONDS = METRICS.histogram("acp_queue_write_seconds", "Time to persist one task row.")
+HARNESS_RUN_SECONDS = METRICS.histogram(
+    "acp_harness_run_seconds", "Harness subprocess wall time, including timeouts.", HARNESS_BUCKETS
+)
+TERMINAL_VALIDATION_SECONDS = METRICS.histogram(
+    "acp_terminal_validation_seconds", "Time spent in replay and consistency validation of terminal tasks."
+)
+METRICS.callback(
+    "acp_event_write_errors_total",
+    "Event records that could not be written.",
+    "counter",
+    lambda: acp_events.EVENT_WRITE_ERRORS_TOTAL,
+)
+
+
+def write_textfile(path: str, registry: MetricsRegistry = METRICS) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, delete=False) as tmp_file:
+        tmp_file.write(registry.render())
+    os.replace(tmp_file.name, path)
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def _warn(message: str) -> None:
+    # Exporting is explicitly configured, so failures are always reported.
+    print(f"ACP metrics export failed: {message}", file=sys.stderr)
+
+
+class MetricsExporter:
+    """Writes the registry to a textfile every interval and/or serves it over HTTP."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = METRICS,
+        textfile_path: str | None = None,
+        interval: float = METRICS_INTERVAL_SECONDS,
+        port: int = 0,
+        host: str = METRICS_HOST,
+    ) -> None:
+        self.registry = registry
+        self.textfile_path = textfile_path
+        self.interval = interval
+        self._last_write = None
+        self._write_lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+        self._timer = None
+        if textfile_path is not None and interval > 0:
+            self._timer = threading.Thread(target=self._run_timer, name="acp-metrics-textfile", daemon=True)
+            self._timer.start()
+        if port > 0:
+            self.serve(port, host)
+
+    @property
+    def server_address(self) -> tuple | None:
+        return self._server.server_address if self._server is not None else None
+
+    def _run_timer(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.maybe_write()
+
+    def serve(self, port: int, host: str = METRICS_HOST) -> None:
+        """Serve the registry over HTTP, unless already serving."""
+        if self._server is not None:
+            return
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        try:
+            self._server = http.server.ThreadingHTTPServer((host, port), handler)
+        except OSError as exc:
+            _warn(f"cannot serve metrics on {host}:{port}: {exc}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="acp-metrics-http", daemon=True).start()
+
+    def maybe_write(self, force: bool = False) -> None:
+        """Write the textfile if interval has passed since the last write."""
+        if self.textfile_path is None:
+            return
+        with self._write_lock:
+            now = time.monotonic()
+            if not force and self._last_write is not None and now - self._last_write < self.interval:
+                return
+            self._last_write = now
+            try:
+                write_textfile(self.textfile_path, self.registry)
+            except Exception as exc:
+                _warn(f"cannot write metrics to {self.textfile_path}: {exc}")
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.maybe_write(force=True)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
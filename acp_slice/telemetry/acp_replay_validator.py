@@ -1,88 +1,64 @@
 """Deterministic task lifecycle replay validation from event logs."""
 
-from acp_slice.contracts.acp_contracts import (
-    ALLOWED_TRANSITIONS,
-    COMPLETED,
-    DEAD_LETTER,
-    EVENT_STATUS_CHANGED,
-    QUEUED,
-    REFUSED,
-)
+from acp_slice.telemetry import acp_event_reader
 from acp_slice.telemetry.acp_event_reader import get_events_for_task
+from acp_slice.telemetry.acp_lifecycle_checkpoint import resume_lifecycle_state
+from acp_slice.telemetry.acp_lifecycle_tracker import (
+    TERMINAL_STATUSES,
+    apply_transition,
+    lifecycle_result,
+    new_lifecycle_state,
+    status_transition,
+    track_task,
+    tracked_lifecycle,
+)
 
 
-TERMINAL_STATUSES = {DEAD_LETTER, COMPLETED, REFUSED}
+# Validation modes:
+# - replay: rebuild the lifecycle from the event log every time
+# - incremental: use the in-memory tracker when it holds the task, else replay
+# - cross_check: compute both and report any divergence between them
+LIFECYCLE_MODE_REPLAY = "replay"
+LIFECYCLE_MODE_INCREMENTAL = "incremental"
+LIFECYCLE_MODE_CROSS_CHECK = "cross_check"
+LIFECYCLE_MODES = (LIFECYCLE_MODE_REPLAY, LIFECYCLE_MODE_INCREMENTAL, LIFECYCLE_MODE_CROSS_CHECK)
 
 
-def validate_task_lifecycle(task_id: str) -> dict:
-    events = get_events_for_task(task_id)
+def replay_lifecycle_state(task_id: str) -> dict:
+    # Resume from the newest lifecycle checkpoint of the log the reader uses.
+    try:
+        state = resume_lifecycle_state(acp_event_reader.EVENTS_LOG_PATH, task_id)
+    except Exception:
+        state = None
+    if state is not None:
+        return state
+    state = new_lifecycle_state()
+    for event in get_events_for_task(task_id):
+        transition = status_transition(event)
+        if transition is not None:
+            apply_transition(state, transition[0], transition[1])
+    return state
 
-    transitions = []
-    for event in events:
-        if event.get("event_type") != EVENT_STATUS_CHANGED:
-            continue
-        payload = event.get("payload")
-        if not isinstance(payload, dict):
-            continue
-        from_status = payload.get("old_status")
-        to_status = payload.get("new_status")
-        if not isinstance(from_status, str) or not isinstance(to_status, str):
-            continue
-        transitions.append((from_status, to_status))
 
-    if not transitions:
-        return {"valid": False, "reason": "NO_STATUS_EVENTS"}
+def start_lifecycle_tracking(task_id: str, fresh: bool) -> None:
+    """Track task_id incrementally, seeding from a replay unless it is fresh."""
+    track_task(task_id, None if fresh else replay_lifecycle_state(task_id))
 
-    first_from_status = transitions[0][0]
-    if first_from_status != QUEUED:
-        return {
-            "valid": False,
-            "reason": "INVALID_BOOTSTRAP",
-            "from": first_from_status,
-        }
 
-    current_status = first_from_status
-    for index, (from_status, to_status) in enumerate(transitions):
-        if current_status in TERMINAL_STATUSES:
-            return {
-                "valid": False,
-                "reason": "INVALID_TRANSITION",
-                "from": current_status,
-                "to": to_status,
-                "index": index,
-            }
-
-        if from_status != current_status:
-            return {
-                "valid": False,
-                "reason": "INVALID_TRANSITION",
-                "from": current_status,
-                "to": to_status,
-                "index": index,
-            }
+def validate_task_lifecycle(task_id: str, mode: str = LIFECYCLE_MODE_REPLAY) -> dict:
+    if mode == LIFECYCLE_MODE_INCREMENTAL:
+        tracked = tracked_lifecycle(task_id)
+        if tracked is not None:
+            return tracked
 
-        allowed_next = ALLOWED_TRANSITIONS.get(from_status)
-        if allowed_next is None:
+    replayed = lifecycle_result(replay_lifecycle_state(task_id))
+    if mode == LIFECYCLE_MODE_CROSS_CHECK:
+        tracked = tracked_lifecycle(task_id)
+        if tracked is not None and tracked != replayed:
             return {
                 "valid": False,
-                "reason": "INVALID_TRANSITION",
-                "from": from_status,
-                "to": to_status,
-                "index": index,
+                "reason": "INCREMENTAL_DIVERGENCE",
+                "incremental": tracked,
+                "replay": replayed,
             }
-        if to_status not in allowed_next:
-            return {
-                "valid": False,
-                "reason": "INVALID_TRANSITION",
-                "from": from_status,
-                "to": to_status,
-                "index": index,
-            }
-
-        current_status = to_status
-
-    return {
-        "valid": True,
-        "final_status": current_status,
-        "transition_count": len(transitions),
-    }
+    return replayed
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import signal
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+from acp_slice.queue import acp_queue_journal
+from acp_slice.runners import acp_async_run_loop, acp_run_loop
+from acp_slice.telemetry import acp_consistency_validator, acp_event_reader
+from acp_slice.tests.test_acp_run_loop import _RunLoopTestCase
+
+
+class AsyncHarnessTests(unittest.TestCase):
+    def setUp(self):
+        # A harness whose child keeps the output pipes open after the shell is killed.
+        patcher = mock.patch.object(
+            acp_async_run_loop, "_harness_command", return_value=["sh", "-c", "sleep 5; true"]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timeout_kills_harness_group(self):
+        started = time.monotonic()
+        result = asyncio.run(acp_async_run_loop._run_harness_async("t1", {}, 0.2))
+        self.assertIsInstance(result, subprocess.TimeoutExpired)
+        self.assertLess(time.monotonic() - started, 3)
+
+    def test_cancellation_kills_harness_and_propagates(self):
+        async def cancel_soon():
+            runner = asyncio.create_task(acp_async_run_loop._run_harness_async("t1", {}, None))
+            await asyncio.sleep(0.2)
+            runner.cancel()
+            await runner
+
+        started = time.monotonic()
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancel_soon())
+        self.assertLess(time.monotonic() - started, 3)
+
+
+
+class AsyncRunnerSignalTests(_RunLoopTestCase):
+    def setUp(self):
+        super().setUp()
+        patches = [
+            mock.patch.object(acp_async_run_loop, "TASKS_PATH", str(self.tasks_path)),
+            mock.patch.object(acp_async_run_loop, "_harness_command", return_value=["sh", "-c", "sleep 5; true"]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_sigterm_cancels_in_flight_tasks(self):
+        acp_queue_journal.write_snapshot(
+            str(self.tasks_path),
+            [
+                {"task_id": "t1", "status": "QUEUED", "task_file": str(self.task_file)},
+                {"task_id": "t2", "status": "QUEUED", "task_file": str(self.task_file), "max_retries": 1},
+                {"task_id": "t3", "status": "QUEUED", "task_file": str(self.task_file)},
+            ],
+        )
+        self.write_config(max_tasks_per_run=10, max_concurrency=2)
+
+        async def terminate_soon():
+            runner = asyncio.create_task(acp_async_run_loop.run_async())
+            await asyncio.sleep(0.5)
+            os.kill(os.getpid(), signal.SIGTERM)
+            return await runner
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(terminate_soon()), 0)
+        self.assertLess(time.monotonic() - started, 3)
+
+        cancelled = acp_consistency_validator._load_queue_task("t1")
+        self.assertEqual(cancelled["status"], "DEAD_LETTER")
+        self.assertEqual(cancelled["failure_reason"], "RUNNER_CANCELLED")
+        retried = acp_consistency_validator._load_queue_task("t2")
+        self.assertEqual(retried["status"], "QUEUED")
+        self.assertEqual(retried["retries"], 1)
+        for task_id in ("t1", "t2"):
+            with self.subTest(task_id=task_id):
+                self.assert_status_chain(task_id)
+        # Admission stopped before the third task was claimed.
+        self.assertEqual(acp_consistency_validator._load_queue_task("t3")["status"], "QUEUED")
+        self.assertEqual(acp_event_reader.get_events_for_task("t3"), [])
+
+
+class AsyncIdleLoopTests(_RunLoopTestCase):
+    def setUp(self):
+        super().setUp()
+        patches = [
+            mock.patch.object(acp_async_run_loop, "TASKS_PATH", str(self.tasks_path)),
+            mock.patch.object(acp_async_run_loop, "_harness_command", return_value=["true"]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_loop_until(self, condition, action=None):
+        # poll_interval is far beyond the test's patience, so only a deadline
+        # or a queue change can wake the idle runner in time.
+        async def loop():
+            runner = asyncio.create_task(acp_async_run_loop.run_async(loop_forever=True, poll_interval=30.0))
+            await asyncio.sleep(0.3)
+            if action is not None:
+                action()
+            deadline = time.monotonic() + 5
+            while not condition() and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            # Checked before SIGTERM, whose wake-up runs one more pass.
+            met = condition()
+            os.kill(os.getpid(), signal.SIGTERM)
+            self.assertEqual(await runner, 0)
+            return met
+
+        self.assertTrue(asyncio.run(loop()))
+
+    def status(self, task_id):
+        return acp_consistency_validator._load_queue_task(task_id)["status"]
+
+    def test_idle_loop_wakes_when_a_retry_falls_due(self):
+        acp_queue_journal.write_snapshot(
+            str(self.tasks_path),
+            [
+                {
+                    "task_id": "t1",
+                    "status": "QUEUED",
+                    "task_file": str(self.task_file),
+                    "next_attempt_at": time.time() + 0.5,
+                }
+            ],
+        )
+        self.run_loop_until(lambda: self.status("t1") == "COMPLETED")
+
+    def test_idle_loop_wakes_when_the_queue_changes(self):
+        acp_queue_journal.write_snapshot(str(self.tasks_path), [])
+        rows = [{"task_id": "t1", "status": "QUEUED", "task_file": str(self.task_file)}]
+        self.run_loop_until(
+            lambda: self.status("t1") == "COMPLETED",
+            lambda: acp_queue_journal.write_snapshot(str(self.tasks_path), rows),
+        )
+
+    def test_idle_loop_wakes_for_the_next_orphan_scan(self):
+        self.write_config(lease_ttl_seconds=0.3)
+        self.write_orphan(queued=False)
+        # A scan just ran, before the orphan's lease expired.
+        with mock.patch.object(acp_run_loop, "_NEXT_ORPHAN_SCAN_AT", time.monotonic() + 0.3):
+            self.run_loop_until(lambda: self.status("orphan") != "EVALUATING")
+        self.assert_orphan_recovered()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from acp_slice.benchmarks import bench_suite
+from acp_slice.telemetry import acp_events
+
+
+class BenchSuiteTests(unittest.TestCase):
+    def test_compare_flags_moves_in_the_worse_direction_only(self):
+        baseline = {
+            "latency": {"value": 10.0, "unit": "ms", "better": "lower"},
+            "rate": {"value": 100.0, "unit": "ops/s", "better": "higher"},
+            "faster": {"value": 10.0, "unit": "ms", "better": "lower"},
+        }
+        results = {
+            "latency": {"value": 13.0, "unit": "ms", "better": "lower"},
+            "rate": {"value": 70.0, "unit": "ops/s", "better": "higher"},
+            "faster": {"value": 2.0, "unit": "ms", "better": "lower"},
+            "new_result": {"value": 1.0, "unit": "ms", "better": "lower"},
+        }
+
+        comparison = {row["name"]: row for row in bench_suite.compare_results(results, baseline, tolerance=0.25)}
+
+        self.assertEqual(sorted(comparison), ["faster", "latency", "rate"])
+        self.assertTrue(comparison["latency"]["regressed"])
+        self.assertTrue(comparison["rate"]["regressed"])
+        self.assertFalse(comparison["faster"]["regressed"])
+        self.assertEqual(comparison["rate"]["ratio"], 0.7)
+
+    def test_main_runs_small_profile_in_scratch_roots_and_compares_baseline(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = Path(tmpdir) / "results.json"
+            baseline_path = Path(tmpdir) / "baseline.json"
+            events_log_path = acp_events.EVENTS_LOG_PATH
+            argv = [
+                "--events", "40",
+                "--tasks", "10",
+                "--repeat", "1",
+                "--workdir", tmpdir,
+                "--output", str(output_path),
+                "--baseline", str(baseline_path),
+            ]
+
+            self.assertEqual(bench_suite.main(argv + ["--update-baseline"]), 0)
+            first = json.loads(output_path.read_text(encoding="utf-8"))
+            self.assertIn("get_events_for_task.40.warm", first["results"])
+            self.assertIn("queue_save_task.sqlite.10", first["results"])
+            self.assertIn("validate_task_consistency.10", first["results"])
+            self.assertNotIn("comparison", first)
+            self.assertEqual(acp_events.EVENTS_LOG_PATH, events_log_path)
+
+            bench_suite.main(argv)
+            second = json.loads(output_path.read_text(encoding="utf-8"))
+            self.assertEqual(
+                {row["name"] for row in second["comparison"]}, set(first["results"])
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
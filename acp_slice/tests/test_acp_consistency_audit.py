@@ -0,0 +1,112 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import (
+    acp_consistency_audit,
+    acp_consistency_validator,
+    acp_event_reader,
+    acp_event_segments,
+    acp_events,
+    acp_lifecycle_checkpoint,
+)
+
+
+def _status(task_id, old_status, new_status):
+    return {
+        "event_type": "EVENT_STATUS_CHANGED",
+        "task_id": task_id,
+        "payload": {"old_status": old_status, "new_status": new_status},
+    }
+
+
+class ConsistencyAuditTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.events_path = str(Path(self.tmpdir.name) / "logs" / "events.jsonl")
+        patcher = mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", self.events_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, records):
+        writer = acp_events.EventWriter(path=self.events_path)
+        for record in records:
+            writer.append(record)
+        writer.close()
+
+    def test_audit_matches_per_task_validation_across_checkpoint_and_segments(self):
+        self._write([_status("ok", "QUEUED", "EVALUATING"), _status("mismatch", "QUEUED", "EVALUATING")])
+        acp_lifecycle_checkpoint.write_checkpoint(self.events_path)
+        self._write([_status("ok", "EVALUATING", "COMPLETED"), {"event_type": "EVENT_RUN_FINISHED", "task_id": "ok"}])
+        acp_event_segments.rotate_log(self.events_path, 1, 0, time.time())
+        acp_event_segments.seal_segments(self.events_path)
+        self._write(
+            [
+                _status("mismatch", "EVALUATING", "REFUSED"),
+                _status("bad", "EVALUATING", "COMPLETED"),
+                _status("stray", "QUEUED", "FAILED"),
+            ]
+        )
+        queue_tasks = [
+            {"task_id": "ok", "status": "COMPLETED"},
+            {"task_id": "mismatch", "status": "COMPLETED"},
+            {"task_id": "bad", "status": "COMPLETED"},
+            {"task_id": "quiet", "status": "QUEUED"},
+            {"task_id": "ok", "status": "FAILED"},
+            {"task_id": 7, "status": "QUEUED"},
+        ]
+
+        reports = [
+            acp_consistency_audit.audit_consistency(queue_tasks, self.events_path, workers=workers, chunk_lines=1)
+            for workers in (1, 2)
+        ]
+
+        self.assertEqual(reports[0], reports[1])
+        report = reports[0]
+        self.assertEqual((report["tasks"], report["events"], report["valid"]), (4, 4, 1))
+        self.assertEqual(
+            report["counts"], {"STATE_MISMATCH": 1, "REPLAY_INVALID": 1, "NO_STATUS_EVENTS": 1, "TASK_NOT_FOUND": 1}
+        )
+        findings = {finding["task_id"]: finding for finding in report["findings"]}
+        self.assertEqual(findings["stray"], {"task_id": "stray", "valid": False, "reason": "TASK_NOT_FOUND"})
+        for task in queue_tasks[:4]:
+            with mock.patch.object(acp_consistency_validator, "_load_queue_task", return_value=task):
+                expected = acp_consistency_validator.validate_task_consistency(task["task_id"])
+            finding = findings.get(task["task_id"])
+            self.assertEqual(finding is None, expected["valid"], task)
+            if finding is not None and finding["reason"] != "NO_STATUS_EVENTS":
+                self.assertEqual(finding, dict(expected, task_id=task["task_id"]))
+
+
+    def test_rotation_is_not_held_off_while_the_audit_streams(self):
+        self._write([_status("t1", "QUEUED", "EVALUATING"), _status("t1", "EVALUATING", "COMPLETED")])
+        parse = acp_consistency_audit._parse_transitions
+        rotations = []
+
+        def parse_then_rotate(raw_lines):
+            if not rotations:
+                rotator = threading.Thread(
+                    target=lambda: rotations.append(
+                        acp_event_segments.rotate_log(self.events_path, 1, 0, time.time())
+                    )
+                )
+                rotator.start()
+                rotator.join(5)
+                self.assertFalse(rotator.is_alive(), "rotation waited for the audit")
+            return parse(raw_lines)
+
+        with mock.patch.object(acp_consistency_audit, "_parse_transitions", parse_then_rotate):
+            report = acp_consistency_audit.audit_consistency(
+                [{"task_id": "t1", "status": "COMPLETED"}], self.events_path, chunk_lines=1
+            )
+
+        self.assertEqual(rotations, [self.events_path + ".1"])
+        self.assertEqual((report["events"], report["valid"], report["findings"]), (2, 1, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
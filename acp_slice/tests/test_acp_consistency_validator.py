@@ -6,11 +6,11 @@ from acp_slice.telemetry.acp_consistency_validator import validate_task_consiste
 
 class ConsistencyValidatorTests(unittest.TestCase):
     def test_matching_queue_and_replay_valid(self):
-        queue_tasks = [{"task_id": "t1", "status": "COMPLETED"}]
+        queue_task = {"task_id": "t1", "status": "COMPLETED"}
         replay = {"valid": True, "final_status": "COMPLETED", "transition_count": 2}
         with mock.patch(
-            "acp_slice.telemetry.acp_consistency_validator._load_queue_tasks",
-            return_value=queue_tasks,
+            "acp_slice.telemetry.acp_consistency_validator._load_queue_task",
+            return_value=queue_task,
         ), mock.patch(
             "acp_slice.telemetry.acp_consistency_validator.validate_task_lifecycle",
             return_value=replay,
@@ -19,11 +19,11 @@ class ConsistencyValidatorTests(unittest.TestCase):
         self.assertEqual(result, {"valid": True, "status": "COMPLETED"})
 
     def test_mismatch_invalid(self):
-        queue_tasks = [{"task_id": "t1", "status": "FAILED"}]
+        queue_task = {"task_id": "t1", "status": "FAILED"}
         replay = {"valid": True, "final_status": "COMPLETED", "transition_count": 2}
         with mock.patch(
-            "acp_slice.telemetry.acp_consistency_validator._load_queue_tasks",
-            return_value=queue_tasks,
+            "acp_slice.telemetry.acp_consistency_validator._load_queue_task",
+            return_value=queue_task,
         ), mock.patch(
             "acp_slice.telemetry.acp_consistency_validator.validate_task_lifecycle",
             return_value=replay,
@@ -36,8 +36,8 @@ class ConsistencyValidatorTests(unittest.TestCase):
 
     def test_task_not_found_invalid(self):
         with mock.patch(
-            "acp_slice.telemetry.acp_consistency_validator._load_queue_tasks",
-            return_value=[],
+            "acp_slice.telemetry.acp_consistency_validator._load_queue_task",
+            return_value=None,
         ):
             result = validate_task_consistency("t1")
         self.assertEqual(result, {"valid": False, "reason": "TASK_NOT_FOUND"})
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.queue import acp_queue_journal
+from acp_slice.queue.acp_queue_backends import JsonlQueueBackend
+from acp_slice.runners import acp_enqueue
+from acp_slice.telemetry import acp_event_reader, acp_events
+
+
+class EnqueueTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        root = Path(self.tmpdir.name)
+        (root / "repo" / ".git").mkdir(parents=True)
+        self.task_file = str(root / "task.json")
+        task_payload = {"repo_path": str(root / "repo"), "argv": ["make"]}
+        Path(self.task_file).write_text(json.dumps(task_payload), encoding="utf-8")
+        self.bad_repo_file = str(root / "bad_repo.json")
+        Path(self.bad_repo_file).write_text(json.dumps({"repo_path": str(root), "argv": ["make"]}), encoding="utf-8")
+        self.tasks_path = str(root / "queue" / "tasks.jsonl")
+        events_path = str(root / "events.jsonl")
+        patches = [
+            mock.patch.object(acp_enqueue, "TASKS_PATH", self.tasks_path),
+            mock.patch.object(acp_enqueue, "get_queue_backend", lambda path: JsonlQueueBackend(path)),
+            mock.patch.object(acp_events, "EVENTS_LOG_PATH", events_path),
+            mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", events_path),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_batch_is_validated_deduplicated_and_admitted_in_one_write(self):
+        rows = [
+            {"task_id": "t1", "task_file": self.task_file, "max_retries": 2},
+            {"task_id": "t1", "task_file": self.task_file},
+            {"task_id": "t2", "task_file": self.bad_repo_file},
+            {"task_id": "t3", "task_file": self.task_file + ".missing"},
+            {"task_id": "t4", "task_file": self.task_file, "status": "COMPLETED"},
+            None,
+            {"task_id": "t5", "task_file": self.task_file},
+        ]
+
+        with mock.patch.object(
+            acp_queue_journal, "_write_base_atomic", wraps=acp_queue_journal._write_base_atomic
+        ) as write_base:
+            result = acp_enqueue.enqueue_tasks(rows)
+        self.assertEqual(write_base.call_count, 1)
+        self.assertEqual(result["admitted"], ["t1", "t5"])
+        self.assertEqual(
+            result["rejected"],
+            [
+                {"task_id": "t1", "reason": "DUPLICATE_TASK_ID"},
+                {"task_id": "t4", "reason": "PRECHECK_INVALID"},
+                {"task_id": None, "reason": "PRECHECK_INVALID"},
+                {"task_id": "t2", "reason": "REPO_PATH_INVALID"},
+                {"task_id": "t3", "reason": "TASK_FILE_MISSING"},
+            ],
+        )
+        queued = JsonlQueueBackend(self.tasks_path).all_tasks()
+        self.assertEqual([(task["task_id"], task["status"]) for task in queued], [("t1", "QUEUED"), ("t5", "QUEUED")])
+        self.assertEqual(queued[0]["max_retries"], 2)
+        self.assertEqual(
+            [event["event_type"] for event in acp_event_reader.get_events_for_task("t5")], ["EVENT_TASK_ADMITTED"]
+        )
+
+        # Already-queued task_ids are duplicates too.
+        result = acp_enqueue.enqueue_tasks([{"task_id": "t5", "task_file": self.task_file}])
+        self.assertEqual(result, {"admitted": [], "rejected": [{"task_id": "t5", "reason": "DUPLICATE_TASK_ID"}]})
+        self.assertEqual(len(JsonlQueueBackend(self.tasks_path).all_tasks()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import unittest
+
+from acp_slice.telemetry.acp_event_codec import EventCodec
+
+
+def _reference(record):
+    return (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+
+
+class EventCodecTests(unittest.TestCase):
+    def setUp(self):
+        self.codec = EventCodec("v0", "run-é\"1")
+
+    def _record(self, **overrides):
+        record = {
+            "event_version": "v0",
+            "timestamp": "2024-01-01T00:00:00.000001",
+            "run_id": "run-é\"1",
+            "event_type": "EVENT_STATUS_CHANGED",
+            "task_id": "t1",
+            "payload": {"old_status": "QUEUED", "new_status": "EVALUATING"},
+        }
+        record.update(overrides)
+        return record
+
+    def test_encode_matches_json_dumps_byte_for_byte(self):
+        records = [
+            self._record(),
+            self._record(task_id=None, payload={}),
+            self._record(task_id="t☃\n\t\\", event_type="EVENT_ü"),
+            self._record(payload={"z": [1, 2.5, None, True], "a": {"y": "😀", "b": float("inf")}}),
+            self._record(event_type=7, task_id=3.5, timestamp=None),
+        ]
+        for record in records:
+            with self.subTest(record=record):
+                self.assertEqual(self.codec.encode(record), _reference(record))
+
+    def test_records_outside_the_fixed_shape_fall_back_to_json_dumps(self):
+        records = [
+            self._record(run_id="other-run"),
+            self._record(event_version="v1"),
+            dict(self._record(), extra="x"),
+            {"event_type": "EVENT_RUN_STARTED"},
+        ]
+        for record in records:
+            with self.subTest(record=record):
+                self.assertEqual(self.codec.encode(record), _reference(record))
+
+    def test_unserializable_payload_raises_like_json_dumps(self):
+        with self.assertRaises(TypeError):
+            self.codec.encode(self._record(payload={"x": object()}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import acp_event_index, acp_event_reader, acp_events
+
+
+def _event_line(task_id, event_type="EVENT_RUN_STARTED"):
+    return json.dumps({"event_type": event_type, "task_id": task_id, "payload": {}}, sort_keys=True)
+
+
+class EventIndexTests(unittest.TestCase):
+    def test_indexed_lookup_matches_full_scan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = str(Path(tmpdir) / "events.jsonl")
+            with mock.patch.object(acp_events, "EVENTS_LOG_PATH", events_path), mock.patch.object(
+                acp_event_reader, "EVENTS_LOG_PATH", events_path
+            ):
+                for task_id in ["t1", "t2", "t1", None, "t3", "t1"]:
+                    acp_events.append_event({"event_type": "EVENT_RUN_STARTED", "task_id": task_id})
+                indexed = acp_event_reader.get_events_for_task("t1")
+                scanned = [e for e in acp_event_reader.get_events() if e.get("task_id") == "t1"]
+            self.assertEqual(len(indexed), 3)
+            self.assertEqual(indexed, scanned)
+            self.assertTrue(Path(acp_event_index.index_path_for(events_path)).exists())
+
+    def test_unindexed_tail_and_malformed_lines_are_caught_up(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            events_path.write_text(_event_line("t1") + "\n{not-json\n\n", encoding="utf-8")
+            with mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", str(events_path)):
+                self.assertEqual(len(acp_event_reader.get_events_for_task("t1")), 1)
+                with events_path.open("a", encoding="utf-8") as events_file:
+                    events_file.write(_event_line("t1", "EVENT_RUN_FINISHED") + "\n")
+                events = acp_event_reader.get_events_for_task("t1")
+            self.assertEqual([e["event_type"] for e in events], ["EVENT_RUN_STARTED", "EVENT_RUN_FINISHED"])
+
+    def test_reader_catch_up_leaves_the_sidecar_to_the_writer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            index_path = Path(acp_event_index.index_path_for(str(events_path)))
+            with mock.patch.object(acp_events, "EVENTS_LOG_PATH", str(events_path)), mock.patch.object(
+                acp_event_reader, "EVENTS_LOG_PATH", str(events_path)
+            ):
+                acp_events.append_event({"event_type": "EVENT_RUN_STARTED", "task_id": "t1"})
+                self.assertEqual(len(acp_event_reader.get_events_for_task("t1")), 1)
+                # A line the writer has written but not indexed yet.
+                first_line_length = events_path.stat().st_size
+                with events_path.open("a", encoding="utf-8") as events_file:
+                    events_file.write(_event_line("t1", "EVENT_RUN_FINISHED") + "\n")
+                index_before = index_path.read_bytes()
+                self.assertEqual(len(acp_event_reader.get_events_for_task("t1")), 2)
+                self.assertEqual(index_path.read_bytes(), index_before)
+
+                # The writer's late entry is folded in without a rebuild.
+                acp_event_index.append_index_entries(
+                    str(events_path),
+                    [(first_line_length, events_path.stat().st_size - first_line_length, "t1")],
+                )
+                with mock.patch.object(acp_event_index, "rebuild_index", side_effect=AssertionError):
+                    events = acp_event_reader.get_events_for_task("t1")
+            self.assertEqual([e["event_type"] for e in events], ["EVENT_RUN_STARTED", "EVENT_RUN_FINISHED"])
+
+    def test_stale_index_is_rebuilt_after_log_rewrite(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            events_path.write_text(_event_line("t1") + "\n" + _event_line("t2") + "\n", encoding="utf-8")
+            with mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", str(events_path)):
+                self.assertEqual(len(acp_event_reader.get_events_for_task("t2")), 1)
+                # Same size, different layout: offsets in the index now point at t1.
+                events_path.write_text(_event_line("t2") + "\n" + _event_line("t1") + "\n", encoding="utf-8")
+                events = acp_event_reader.get_events_for_task("t2")
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0]["task_id"], "t2")
+
+
+if __name__ == "__main__":
+    unittest.main()
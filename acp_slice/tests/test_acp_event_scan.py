@@ -0,0 +1,95 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import acp_event_reader, acp_event_scan, acp_event_segments
+
+
+LINES = [
+    '{"event_type": "EVENT_STATUS_CHANGED", "payload": {"new_status": "EVALUATING"}, "task_id": "t1"}',
+    '{"event_type":"EVENT_RUN_FINISHED","task_id":"t1","payload":{}}',
+    "{not-json \"t1\"",
+    "",
+    '{"event_type": "EVENT_RUN_STARTED", "payload": {"note": "t1"}, "task_id": "t10"}',
+    '["t1", "EVENT_RUN_FINISHED"]',
+    '{"event_type": "EVENT_RUN_\\u0046INISHED", "task_id": "t\\u0031", "payload": {}}',
+    '{"event_type": "EVENT_RUN_FINISHED", "task_id": "say \\"hi\\"", "payload": {}}',
+    '   {"event_type": "EVENT_LOCK_HELD", "task_id": "t2"}   ',
+    # A lone \r ends a line under universal newlines, as does \r\n.
+    '{"event_type": "EVENT_LOCK_HELD", "task_id": "t1"}\r{"event_type": "EVENT_RUN_FINISHED", "task_id": "t1"}\r',
+    # Non-ASCII written unescaped, so the line holds no backslash.
+    '{"event_type": "EVENT_RUN_FINISHED", "task_id": "tâche-é", "payload": {}}',
+    '{"event_type": "EVENT_RUN_FINISHED", "task_id": "t1", "payload": {"torn": ',
+]
+FILTERS = [
+    {"task_id": "t1"},
+    {"task_id": "t10"},
+    {"task_id": 'say "hi"'},
+    {"task_id": "tâche-é"},
+    {"task_id": "missing"},
+    {"event_type": "EVENT_RUN_FINISHED"},
+    {"event_type": "EVENT_LOCK_HELD"},
+    {"task_id": "t1", "event_type": "EVENT_RUN_FINISHED"},
+]
+
+
+class EventScanTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.log_path = str(Path(self.tmpdir.name) / "events.jsonl")
+        content = "\n".join(LINES)
+        Path(self.log_path).write_text(content, encoding="utf-8")
+        self.segment_path = self.log_path + ".1.gz"
+        with gzip.open(self.segment_path, "wt", encoding="utf-8") as segment_file:
+            segment_file.write(content)
+
+    def _read(self, mode, filters):
+        with mock.patch.object(acp_event_scan, "EVENTS_READ_MODE", mode):
+            return (
+                acp_event_reader._read_log(self.log_path, filters.get("task_id"), filters.get("event_type")),
+                acp_event_segments.read_segment_events(
+                    self.segment_path, filters.get("task_id"), filters.get("event_type")
+                ),
+            )
+
+    def test_prefiltered_reads_match_full_scans(self):
+        for filters in FILTERS:
+            with self.subTest(filters=filters):
+                streamed, streamed_segment = self._read(acp_event_scan.EVENTS_READ_MODE_STREAM, filters)
+                scanned, scanned_segment = self._read(acp_event_scan.EVENTS_READ_MODE_MMAP, filters)
+                self.assertEqual(scanned, streamed)
+                self.assertEqual(scanned_segment, streamed)
+                self.assertEqual(streamed_segment, streamed)
+        self.assertEqual(len(self._read(acp_event_scan.EVENTS_READ_MODE_MMAP, {"task_id": "t1"})[0]), 5)
+        self.assertEqual(len(self._read(acp_event_scan.EVENTS_READ_MODE_MMAP, {"task_id": "tâche-é"})[1]), 1)
+
+    def test_get_events_filters_by_event_type(self):
+        with mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", self.log_path):
+            events = acp_event_reader.get_events("EVENT_RUN_FINISHED")
+        # The sealed segment first, then the active log.
+        self.assertEqual([event["task_id"] for event in events], ["t1", "t1", 'say "hi"', "t1", "tâche-é"] * 2)
+
+        Path(self.log_path).write_bytes(b"")
+        self.assertEqual(acp_event_scan.scan_file(self.log_path, {"task_id": "t1"}), [])
+
+
+    def test_invalid_utf8_fails_the_read_in_both_modes(self):
+        # The bad byte sits on a line that is not a candidate for "t1".
+        data = Path(self.log_path).read_bytes().replace(b"t2", b"t\xff")
+        Path(self.log_path).write_bytes(data)
+        with gzip.open(self.segment_path, "wb") as segment_file:
+            segment_file.write(data)
+        for mode in (acp_event_scan.EVENTS_READ_MODE_STREAM, acp_event_scan.EVENTS_READ_MODE_MMAP):
+            with self.subTest(mode=mode):
+                with self.assertRaises(UnicodeDecodeError):
+                    self._read(mode, {"task_id": "t1"})
+                with mock.patch.object(acp_event_scan, "EVENTS_READ_MODE", mode), mock.patch.object(
+                    acp_event_reader, "EVENTS_LOG_PATH", self.log_path
+                ):
+                    self.assertEqual(acp_event_reader.get_events("EVENT_RUN_FINISHED"), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import itertools
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import acp_event_reader, acp_event_retention, acp_event_segments, acp_events
+
+
+def _status(task_id, old_status, new_status):
+    return {
+        "event_type": "EVENT_STATUS_CHANGED",
+        "task_id": task_id,
+        "payload": {"old_status": old_status, "new_status": new_status},
+    }
+
+
+class EventSegmentTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.events_path = str(Path(self.tmpdir.name) / "logs" / "events.jsonl")
+        patcher = mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", self.events_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, records, rotate_bytes=0):
+        writer = acp_events.EventWriter(path=self.events_path, rotate_bytes=rotate_bytes)
+        for record in records:
+            writer.append(record)
+        writer.close()
+
+    def test_readers_span_sealed_segments_and_the_active_log(self):
+        records = []
+        for task_id in ("t1", "t2"):
+            records.append(_status(task_id, "QUEUED", "EVALUATING"))
+        for task_id in ("t1", "t2"):
+            records.append(_status(task_id, "EVALUATING", "COMPLETED"))
+        records.append({"event_type": "EVENT_RUN_FINISHED", "task_id": "t2", "payload": {}})
+
+        self._write(records, rotate_bytes=200)
+
+        segments = acp_event_segments.list_segments(self.events_path)
+        self.assertGreaterEqual(len(segments), 2)
+        for _, path in segments:
+            self.assertTrue(path.endswith(".gz"))
+            self.assertTrue(os.path.exists(acp_event_segments.meta_path_for(path)))
+        self.assertEqual(
+            [(event["task_id"], event["event_type"]) for event in acp_event_reader.get_events()],
+            [(record["task_id"], record["event_type"]) for record in records],
+        )
+        self.assertEqual(
+            [event["payload"].get("new_status") for event in acp_event_reader.get_events_for_task("t2")],
+            ["EVALUATING", "COMPLETED", None],
+        )
+
+    def test_retention_drops_only_whole_validated_histories(self):
+        def rotate():
+            acp_event_segments.rotate_log(self.events_path, 1, 0, time.time())
+            acp_event_segments.seal_segments(self.events_path)
+
+        # Segment 1: t1 done. Segment 2: t2 starts. Segment 3: t2 done, t3 done
+        # but with a queue status that disagrees with its replay.
+        self._write([_status("t1", "QUEUED", "EVALUATING"), _status("t1", "EVALUATING", "COMPLETED")])
+        rotate()
+        self._write([_status("t2", "QUEUED", "EVALUATING")])
+        rotate()
+        self._write([_status("t2", "EVALUATING", "REFUSED"), _status("t3", "QUEUED", "FAILED")])
+        rotate()
+        self._write([_status("t4", "QUEUED", "EVALUATING")])
+        queue_tasks = [
+            {"task_id": "t1", "status": "COMPLETED"},
+            {"task_id": "t2", "status": "REFUSED"},
+            {"task_id": "t3", "status": "DEAD_LETTER"},
+            {"task_id": "t4", "status": "EVALUATING"},
+        ]
+        segment_paths = [path for _, path in acp_event_segments.list_segments(self.events_path)]
+
+        self.assertEqual(acp_event_retention.droppable_segments(self.events_path, queue_tasks), [])
+        later = time.time() + 3600
+        droppable = acp_event_retention.droppable_segments(self.events_path, queue_tasks, now=later)
+        # t3 pins segment 3, which pins t2 and so segment 2 as well.
+        self.assertEqual(droppable, segment_paths[:1])
+        # Rows may be streamed (queue first, then the archive); the first row per task wins.
+        archived = iter([{"task_id": "t1", "status": "FAILED"}, {"task_id": "t9", "status": "COMPLETED"}])
+        streamed = itertools.chain(queue_tasks, archived)
+        self.assertEqual(acp_event_retention.droppable_segments(self.events_path, streamed, now=later), droppable)
+
+        queue_tasks[0]["status"] = "REFUSED"
+        droppable = acp_event_retention.droppable_segments(self.events_path, queue_tasks, now=later)
+        self.assertEqual(droppable, [])
+
+        queue_tasks[0]["status"] = "COMPLETED"
+        dropped = acp_event_retention.apply_retention(self.events_path, queue_tasks, now=later)
+        self.assertEqual(dropped, segment_paths[:1])
+        self.assertFalse(os.path.exists(segment_paths[0]))
+        self.assertEqual(acp_event_reader.get_events_for_task("t1"), [])
+        self.assertEqual(len(acp_event_reader.get_events_for_task("t2")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 from pathlib import Path
 from unittest import mock
 
-from acp_slice.telemetry import acp_events
+from acp_slice.telemetry import acp_event_index, acp_events, acp_lifecycle_tracker
 
 
 class EventsWriterTests(unittest.TestCase):
@@ -54,6 +54,107 @@ class EventsWriterTests(unittest.TestCase):
             self.assertIn("run_id", first)
             self.assertEqual(first["run_id"], second["run_id"])
 
+    def test_unencodable_event_is_forgotten_by_the_lifecycle_tracker(self):
+        acp_lifecycle_tracker.track_task("t-unencodable")
+        self.addCleanup(acp_lifecycle_tracker.forget_tasks, ["t-unencodable"])
+        acp_events.EVENT_WRITE_ERRORS_TOTAL = 0
+        acp_events.append_event(
+            {
+                "event_type": "EVENT_STATUS_CHANGED",
+                "task_id": "t-unencodable",
+                "payload": {"old_status": "QUEUED", "new_status": "EVALUATING", "extra": object()},
+            }
+        )
+        self.assertEqual(acp_events.EVENT_WRITE_ERRORS_TOTAL, 1)
+        # The transition never reached the log, so validation must replay it.
+        self.assertFalse(acp_lifecycle_tracker.is_tracked("t-unencodable"))
+
+
+class BufferedEventWriterTests(unittest.TestCase):
+    def test_group_commit_by_batch_size_and_flush_event_type(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            writer = acp_events.EventWriter(path=str(events_path), batch_size=3)
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+            self.assertFalse(events_path.exists())
+
+            writer.append({"event_type": "EVENT_RUN_FINISHED", "task_id": "t1", "payload": {}})
+            lines = events_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 3)
+
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t2", "payload": {}})
+            writer.close()
+            lines = events_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 4)
+            self.assertEqual(json.loads(lines[3])["task_id"], "t2")
+
+    def test_failed_group_commit_counts_every_dropped_event(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            unwritable_target = Path(tmpdir) / "as_directory"
+            unwritable_target.mkdir()
+            writer = acp_events.EventWriter(
+                path=str(unwritable_target), batch_size=10, fsync_policy=acp_events.FSYNC_BATCH
+            )
+            acp_events.EVENT_WRITE_ERRORS_TOTAL = 0
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+            writer.flush()
+            self.assertEqual(acp_events.EVENT_WRITE_ERRORS_TOTAL, 2)
+
+    def test_short_writes_are_completed_and_indexed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            writer = acp_events.EventWriter(path=str(events_path), batch_size=2)
+            open_handle = writer._open_locked
+            with mock.patch.object(writer, "_open_locked", lambda path: _ShortWriteHandle(open_handle(path), [7])):
+                writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+                writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t2", "payload": {}})
+            writer.close()
+
+            data = events_path.read_bytes()
+            self.assertEqual([json.loads(line)["task_id"] for line in data.splitlines()], ["t1", "t2"])
+            index_path = acp_event_index.index_path_for(str(events_path))
+            for entry in Path(index_path).read_text(encoding="utf-8").splitlines():
+                offset, length, task_id = entry.split("\t")
+                line = data[int(offset) : int(offset) + int(length)]
+                self.assertEqual(json.loads(line)["task_id"], json.loads(task_id))
+
+    def test_stalled_short_write_fails_the_batch_and_keeps_later_lines_whole(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = Path(tmpdir) / "events.jsonl"
+            writer = acp_events.EventWriter(path=str(events_path))
+            open_handle = writer._open_locked
+            acp_lifecycle_tracker.track_task("t1")
+            self.addCleanup(acp_lifecycle_tracker.forget_tasks, ["t1"])
+            acp_events.EVENT_WRITE_ERRORS_TOTAL = 0
+            with mock.patch.object(writer, "_open_locked", lambda path: _ShortWriteHandle(open_handle(path), [10, 0])):
+                writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t1", "payload": {}})
+            self.assertEqual(acp_events.EVENT_WRITE_ERRORS_TOTAL, 1)
+            self.assertFalse(acp_lifecycle_tracker.is_tracked("t1"))
+
+            writer.append({"event_type": "EVENT_STATUS_CHANGED", "task_id": "t2", "payload": {}})
+            writer.close()
+            torn, whole = events_path.read_bytes().splitlines()
+            self.assertEqual(len(torn), 10)
+            self.assertEqual(json.loads(whole)["task_id"], "t2")
+            self.assertEqual(acp_event_index.read_task_events(str(events_path), "t2")[0]["task_id"], "t2")
+
+
+class _ShortWriteHandle:
+    """File handle whose writes accept at most the next of limits bytes."""
+
+    def __init__(self, handle, limits):
+        self._handle = handle
+        self._limits = list(limits)
+
+    def write(self, data):
+        limit = self._limits.pop(0) if len(self._limits) > 1 else self._limits[0]
+        return self._handle.write(data[:limit]) if limit else 0
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,47 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from acp_slice.telemetry import acp_latency_report
+
+
+def _line(event_type, task_id, timestamp, payload=None):
+    return json.dumps(
+        {"event_type": event_type, "task_id": task_id, "timestamp": timestamp, "payload": payload or {}}
+    )
+
+
+class LatencyReportTests(unittest.TestCase):
+    def test_reports_phase_percentiles_and_queue_wait(self):
+        lines = [
+            _line("EVENT_TASK_ADMITTED", "t1", "2024-01-01T00:00:00"),
+            _line("EVENT_TASK_ADMITTED", "t2", "2024-01-01T00:00:01"),
+            _line("EVENT_RUN_STARTED", "t1", "2024-01-01T00:00:02.500000"),
+            "not json",
+            _line("EVENT_RUN_FINISHED", "t1", "2024-01-01T00:00:03", {"spans": {"harness": 1.0, "total": 1.5}}),
+            _line("EVENT_RUN_STARTED", "t2", "2024-01-01T00:00:05"),
+            _line("EVENT_RUN_FINISHED", "t2", "2024-01-01T00:00:06", {"spans": {"harness": 3.0, "total": 3.5}}),
+            # A retry has no new admission, so it adds no queue wait sample.
+            _line("EVENT_RUN_STARTED", "t2", "2024-01-01T00:00:09"),
+            _line("EVENT_RUN_FINISHED", "t2", "2024-01-01T00:00:10", {"final_status": "COMPLETED"}),
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "events.jsonl"
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+            report = acp_latency_report.latency_report(str(path))
+
+        self.assertEqual(report["queue_wait"], {"count": 2, "p50": 2.5, "p95": 4.0, "p99": 4.0, "max": 4.0})
+        self.assertEqual(report["harness"], {"count": 2, "p50": 1.0, "p95": 3.0, "p99": 3.0, "max": 3.0})
+        self.assertEqual(report["total"]["count"], 2)
+        self.assertEqual(report["claim"], {"count": 0})
+        self.assertIn("queue_wait", acp_latency_report.format_report(report))
+
+    def test_nearest_rank_percentiles(self):
+        summary = acp_latency_report.summarize([float(value) for value in range(1, 101)])
+        self.assertEqual((summary["p50"], summary["p95"], summary["p99"], summary["max"]), (50.0, 95.0, 99.0, 100.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import acp_event_reader, acp_event_segments, acp_events, acp_lifecycle_checkpoint
+from acp_slice.telemetry.acp_replay_validator import replay_lifecycle_state
+
+
+def _status(task_id, old_status, new_status):
+    return {
+        "event_type": "EVENT_STATUS_CHANGED",
+        "task_id": task_id,
+        "payload": {"old_status": old_status, "new_status": new_status},
+    }
+
+
+class LifecycleCheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.events_path = str(Path(self.tmpdir.name) / "logs" / "events.jsonl")
+        patcher = mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", self.events_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, records):
+        writer = acp_events.EventWriter(path=self.events_path)
+        for record in records:
+            writer.append(record)
+        writer.close()
+
+    def _resume(self, task_id):
+        return acp_lifecycle_checkpoint.resume_lifecycle_state(self.events_path, task_id)
+
+    def test_resume_replays_only_the_tail_across_rotation(self):
+        self._write([_status("t1", "QUEUED", "EVALUATING"), _status("t2", "QUEUED", "EVALUATING")])
+        self.assertIsNone(self._resume("t1"))
+        acp_lifecycle_checkpoint.write_checkpoint(self.events_path)
+        self._write([_status("t1", "EVALUATING", "COMPLETED"), {"event_type": "EVENT_RUN_FINISHED", "task_id": "t1"}])
+        acp_event_segments.rotate_log(self.events_path, 1, 0, time.time())
+        acp_event_segments.seal_segments(self.events_path)
+        self._write([_status("t2", "EVALUATING", "FAILED"), _status("t3", "QUEUED", "EVALUATING")])
+
+        for task_id in ("t1", "t2", "t3", "missing"):
+            with mock.patch.object(acp_lifecycle_checkpoint, "load_latest_checkpoint", return_value=None):
+                full = replay_lifecycle_state(task_id)
+            self.assertEqual(self._resume(task_id), full, task_id)
+
+        path = acp_lifecycle_checkpoint.write_checkpoint(self.events_path)
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertEqual(checkpoint["position"]["segment"], 1)
+        self.assertEqual(checkpoint["position"]["offset"], os.path.getsize(self.events_path))
+        self.assertEqual(checkpoint["tasks"]["t2"], {"status": "FAILED", "transition_count": 2, "violation": None})
+        self.assertEqual(len(os.listdir(acp_lifecycle_checkpoint.checkpoint_dir_for(self.events_path))), 2)
+
+    def test_rotation_is_not_held_off_while_a_checkpoint_replays(self):
+        self._write([_status("t1", "QUEUED", "EVALUATING"), _status("t2", "QUEUED", "EVALUATING")])
+        fold = acp_lifecycle_checkpoint._fold
+        rotations = []
+
+        def fold_then_rotate(state, event):
+            if not rotations:
+                rotator = threading.Thread(
+                    target=lambda: rotations.append(
+                        acp_event_segments.rotate_log(self.events_path, 1, 0, time.time())
+                    )
+                )
+                rotator.start()
+                rotator.join(5)
+                self.assertFalse(rotator.is_alive(), "rotation waited for the replay")
+            fold(state, event)
+
+        with mock.patch.object(acp_lifecycle_checkpoint, "_fold", fold_then_rotate):
+            path = acp_lifecycle_checkpoint.write_checkpoint(self.events_path)
+
+        self.assertEqual(rotations, [self.events_path + ".1"])
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        # The replay read the file it opened to its end after it was rotated.
+        self.assertEqual(checkpoint["position"]["segment"], 0)
+        self.assertEqual(checkpoint["position"]["offset"], os.path.getsize(rotations[0]))
+        self._write([_status("t1", "EVALUATING", "COMPLETED")])
+        for task_id in ("t1", "t2"):
+            with mock.patch.object(acp_lifecycle_checkpoint, "load_latest_checkpoint", return_value=None):
+                full = replay_lifecycle_state(task_id)
+            self.assertEqual(self._resume(task_id), full, task_id)
+
+    def test_checkpoint_for_a_replaced_log_is_ignored(self):
+        self._write([_status("t1", "QUEUED", "EVALUATING")])
+        acp_lifecycle_checkpoint.write_checkpoint(self.events_path)
+        os.unlink(self.events_path)
+        self._write([_status("t9", "QUEUED", "FAILED")])
+
+        self.assertIsNone(self._resume("t1"))
+        self.assertEqual(replay_lifecycle_state("t1")["transition_count"], 0)
+        self.assertEqual(replay_lifecycle_state("t9")["status"], "FAILED")
+
+
+if __name__ == "__main__":
+    unittest.main()
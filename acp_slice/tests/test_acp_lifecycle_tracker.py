@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.telemetry import acp_event_reader, acp_events, acp_lifecycle_tracker
+from acp_slice.telemetry.acp_replay_validator import (
+    LIFECYCLE_MODE_CROSS_CHECK,
+    LIFECYCLE_MODE_INCREMENTAL,
+    start_lifecycle_tracking,
+    validate_task_lifecycle,
+)
+
+
+def _status_event(task_id, old_status, new_status):
+    return {
+        "event_type": "EVENT_STATUS_CHANGED",
+        "task_id": task_id,
+        "payload": {"old_status": old_status, "new_status": new_status},
+    }
+
+
+class LifecycleTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        events_path = str(Path(self.tmpdir.name) / "events.jsonl")
+        for patcher in (
+            mock.patch.object(acp_events, "EVENTS_LOG_PATH", events_path),
+            mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", events_path),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(acp_lifecycle_tracker.forget_tasks, ["t1", "t2"])
+
+    def test_incremental_matches_replay_for_valid_and_invalid_sequences(self):
+        start_lifecycle_tracking("t1", fresh=True)
+        start_lifecycle_tracking("t2", fresh=True)
+        for event in [
+            _status_event("t1", "QUEUED", "EVALUATING"),
+            _status_event("t2", "QUEUED", "EVALUATING"),
+            _status_event("t1", "EVALUATING", "COMPLETED"),
+            _status_event("t2", "EVALUATING", "COMPLETED"),
+            _status_event("t2", "COMPLETED", "FAILED"),
+        ]:
+            acp_events.append_event(event)
+
+        for task_id in ("t1", "t2"):
+            incremental = acp_lifecycle_tracker.tracked_lifecycle(task_id)
+            self.assertEqual(incremental, validate_task_lifecycle(task_id))
+            self.assertEqual(incremental, validate_task_lifecycle(task_id, mode=LIFECYCLE_MODE_INCREMENTAL))
+        self.assertTrue(validate_task_lifecycle("t1")["valid"])
+        self.assertEqual(validate_task_lifecycle("t2")["index"], 2)
+
+    def test_seeded_tracking_continues_from_logged_history(self):
+        acp_events.append_event(_status_event("t1", "QUEUED", "EVALUATING"))
+        acp_events.append_event(_status_event("t1", "EVALUATING", "FAILED"))
+        acp_events.append_event(_status_event("t1", "FAILED", "QUEUED"))
+        start_lifecycle_tracking("t1", fresh=False)
+        acp_events.append_event(_status_event("t1", "QUEUED", "EVALUATING"))
+        acp_events.append_event(_status_event("t1", "EVALUATING", "COMPLETED"))
+
+        result = validate_task_lifecycle("t1", mode=LIFECYCLE_MODE_INCREMENTAL)
+        self.assertEqual(result, {"valid": True, "final_status": "COMPLETED", "transition_count": 5})
+
+    def test_cross_check_reports_divergence(self):
+        acp_events.append_event(_status_event("t1", "QUEUED", "EVALUATING"))
+        # Tracking starts too late, so the tracker misses the first transition.
+        start_lifecycle_tracking("t1", fresh=True)
+        acp_events.append_event(_status_event("t1", "EVALUATING", "COMPLETED"))
+
+        result = validate_task_lifecycle("t1", mode=LIFECYCLE_MODE_CROSS_CHECK)
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["reason"], "INCREMENTAL_DIVERGENCE")
+        self.assertTrue(result["replay"]["valid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
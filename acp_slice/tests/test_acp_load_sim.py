@@ -0,0 +1,50 @@
+import random
+import tempfile
+import unittest
+
+from acp_slice.benchmarks import bench_load_sim, stub_aah
+
+
+class StubHarnessTests(unittest.TestCase):
+    def test_parses_latency_distributions_and_exit_code_mix(self):
+        rng = random.Random(0)
+        self.assertEqual(stub_aah.parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= stub_aah.parse_latency("uniform:0.1:0.2")(rng) <= 0.2)
+        self.assertGreater(stub_aah.parse_latency("lognormal:0.05:0.5")(rng), 0)
+        self.assertEqual(stub_aah.parse_exit_codes("0:0.9,2:0.1"), ([0, 2], [0.9, 0.1]))
+        with self.assertRaises(ValueError):
+            stub_aah.parse_latency("normal:1")
+        with self.assertRaises(ValueError):
+            stub_aah.parse_exit_codes("0:0")
+
+
+class LoadSimulatorTests(unittest.TestCase):
+    def test_simulation_drives_queue_to_quiescence_with_consistent_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            options = bench_load_sim.build_parser().parse_args(
+                [
+                    "--tasks", "6",
+                    "--repos", "2",
+                    "--max-concurrency", "2",
+                    "--latency", "fixed:0",
+                    "--exit-codes", "0:1,1:1",
+                    "--poll-interval", "0.1",
+                    "--timeout", "60",
+                    "--workdir", tmpdir,
+                ]
+            )
+
+            report = bench_load_sim.simulate(options)
+
+        self.assertTrue(report["quiescent"])
+        self.assertEqual(report["terminal_tasks"], 6)
+        self.assertEqual(sum(report["statuses"].values()), 6)
+        self.assertLessEqual(set(report["statuses"]), {"COMPLETED", "DEAD_LETTER"})
+        self.assertEqual(report["consistency_pass_rate"], 1.0)
+        self.assertEqual(report["runner_exit_codes"], [0])
+        self.assertEqual(sorted(report["latency_seconds"]), ["count", "max", "p50", "p95", "p99"])
+        self.assertEqual(report["latency_seconds"]["count"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import socket
+import tempfile
+import time
+import unittest
+import urllib.request
+from pathlib import Path
+
+from acp_slice.telemetry import acp_metrics
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = acp_metrics.MetricsRegistry()
+
+    def test_render_uses_prometheus_text_format(self):
+        processed = self.registry.counter("acp_tasks_processed_total", "Tasks.", "status")
+        retries = self.registry.counter("acp_retries_scheduled_total", "Retries.")
+        latency = self.registry.histogram("acp_queue_write_seconds", "Writes.", buckets=(0.01, 0.1))
+        self.registry.callback("acp_queue_depth", "Depth.", "gauge", lambda: {"QUEUED": 2, 'a"b': 1}, "status")
+
+        processed.inc("COMPLETED")
+        processed.inc("COMPLETED")
+        processed.inc("DEAD_LETTER")
+        retries.inc()
+        for value in (0.005, 0.01, 0.05, 3.0):
+            latency.observe(value)
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn("# TYPE acp_tasks_processed_total counter", lines)
+        self.assertIn('acp_tasks_processed_total{status="COMPLETED"} 2', lines)
+        self.assertIn('acp_tasks_processed_total{status="DEAD_LETTER"} 1', lines)
+        self.assertIn("acp_retries_scheduled_total 1", lines)
+        self.assertIn("# TYPE acp_queue_write_seconds histogram", lines)
+        self.assertIn('acp_queue_write_seconds_bucket{le="0.01"} 2', lines)
+        self.assertIn('acp_queue_write_seconds_bucket{le="0.1"} 3', lines)
+        self.assertIn('acp_queue_write_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("acp_queue_write_seconds_count 4", lines)
+        self.assertIn("acp_queue_write_seconds_sum 3.065", lines)
+        self.assertIn('acp_queue_depth{status="a\\"b"} 1', lines)
+
+    def test_failing_callback_is_dropped_from_the_scrape(self):
+        self.registry.counter("acp_ok_total", "Fine.").inc()
+        self.registry.callback("acp_broken", "Broken.", "gauge", lambda: 1 / 0)
+
+        text = self.registry.render()
+
+        self.assertIn("acp_ok_total 1", text)
+        self.assertNotIn("acp_broken", text)
+
+
+class MetricsExporterTests(unittest.TestCase):
+    def test_textfile_is_throttled_and_http_serves_metrics(self):
+        registry = acp_metrics.MetricsRegistry()
+        counter = registry.counter("acp_tasks_processed_total", "Tasks.", "status")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            textfile = Path(tmpdir) / "metrics" / "acp.prom"
+            exporter = acp_metrics.MetricsExporter(
+                registry, textfile_path=str(textfile), interval=3600, port=_free_port()
+            )
+            self.addCleanup(exporter.close)
+            self.assertIsNotNone(exporter.server_address)
+
+            counter.inc("COMPLETED")
+            exporter.maybe_write()
+            counter.inc("COMPLETED")
+            exporter.maybe_write()
+            self.assertIn('status="COMPLETED"} 1', textfile.read_text(encoding="utf-8"))
+
+            host, port = exporter.server_address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+                self.assertIn('status="COMPLETED"} 2', response.read().decode("utf-8"))
+
+            exporter.close()
+            self.assertIn('status="COMPLETED"} 2', textfile.read_text(encoding="utf-8"))
+
+    def test_textfile_is_refreshed_on_a_timer_while_idle(self):
+        registry = acp_metrics.MetricsRegistry()
+        counter = registry.counter("acp_retries_scheduled_total", "Retries.")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            textfile = Path(tmpdir) / "acp.prom"
+            exporter = acp_metrics.MetricsExporter(registry, textfile_path=str(textfile), interval=0.05)
+            self.addCleanup(exporter.close)
+            counter.inc()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if textfile.exists() and "acp_retries_scheduled_total 1" in textfile.read_text(encoding="utf-8"):
+                    break
+                time.sleep(0.02)
+            first_mtime = textfile.stat().st_mtime_ns
+            while time.monotonic() < deadline and textfile.stat().st_mtime_ns == first_mtime:
+                time.sleep(0.02)
+            self.assertGreater(textfile.stat().st_mtime_ns, first_mtime)
+            exporter.close()
+
+if __name__ == "__main__":
+    unittest.main()
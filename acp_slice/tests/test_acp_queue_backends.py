@@ -0,0 +1,180 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.queue import acp_queue_journal
+from acp_slice.queue.acp_queue_archive import archive_partitions, find_archived_task
+from acp_slice.queue.acp_queue_backends import (
+    QUEUE_STORAGE_JOURNAL,
+    JsonlQueueBackend,
+    SqliteQueueBackend,
+    sqlite_path_for,
+)
+
+
+TASKS = [
+    {"task_id": "t1", "status": "COMPLETED"},
+    {"task_id": "t2", "status": "QUEUED", "next_attempt_at": time.time() + 3600},
+    {"task_id": "t3", "status": "QUEUED"},
+    {"task_id": "t4", "status": "QUEUED", "next_attempt_at": 0},
+]
+
+
+class QueueBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.tasks_path = Path(self.tmpdir.name) / "tasks.jsonl"
+        self.tasks_path.write_text(
+            "".join(json.dumps(task, sort_keys=True) + "\n" for task in TASKS), encoding="utf-8"
+        )
+
+    def test_sqlite_backend_seeds_from_jsonl_and_yields_due_rows(self):
+        backend = SqliteQueueBackend(sqlite_path_for(str(self.tasks_path)), seed_path=str(self.tasks_path))
+        self.addCleanup(backend.close)
+        backend.load()
+        self.assertEqual([task["task_id"] for task in backend.due_tasks()], ["t3", "t4"])
+        self.assertEqual(len(backend.all_tasks()), 4)
+
+    def test_sqlite_save_updates_single_row_seen_by_get_task(self):
+        backend = SqliteQueueBackend(sqlite_path_for(str(self.tasks_path)), seed_path=str(self.tasks_path))
+        self.addCleanup(backend.close)
+        backend.load()
+        task = next(backend.due_tasks())
+        task["status"] = "EVALUATING"
+        backend.save_task(task)
+
+        self.assertEqual(backend.get_task("t3")["status"], "EVALUATING")
+        self.assertEqual([task["task_id"] for task in backend.due_tasks()], ["t4"])
+        self.assertIsNone(backend.get_task("missing"))
+
+    def test_status_counts_match_the_rows(self):
+        sqlite_backend = SqliteQueueBackend(sqlite_path_for(str(self.tasks_path)), seed_path=str(self.tasks_path))
+        self.addCleanup(sqlite_backend.close)
+        jsonl_backend = JsonlQueueBackend(str(self.tasks_path))
+        for backend in (sqlite_backend, jsonl_backend):
+            with self.subTest(backend=type(backend).__name__):
+                backend.load()
+                task = next(backend.due_tasks())
+                task["status"] = "EVALUATING"
+                backend.save_task(task)
+                self.assertEqual(dict(backend.status_counts()), {"COMPLETED": 1, "EVALUATING": 1, "QUEUED": 2})
+
+    def test_jsonl_journal_backend_round_trip(self):
+        backend = JsonlQueueBackend(str(self.tasks_path), storage=QUEUE_STORAGE_JOURNAL)
+        backend.load()
+        task = next(backend.due_tasks())
+        self.assertEqual(task["task_id"], "t3")
+        task["status"] = "EVALUATING"
+        backend.save_task(task)
+
+        self.assertEqual(backend.get_task("t3")["status"], "EVALUATING")
+        self.assertTrue(Path(str(self.tasks_path) + ".journal").exists())
+
+    def test_jsonl_reload_reads_only_the_journal_tail(self):
+        runner_a = JsonlQueueBackend(str(self.tasks_path), storage=QUEUE_STORAGE_JOURNAL)
+        runner_b = JsonlQueueBackend(str(self.tasks_path), storage=QUEUE_STORAGE_JOURNAL)
+        runner_a.load()
+        runner_b.load()
+        rows = {task["task_id"]: task for task in runner_a.all_tasks()}
+        t3, t4 = (task for task in runner_b.tasks_with_status("QUEUED") if task["task_id"] in ("t3", "t4"))
+        t3["status"] = "EVALUATING"
+        runner_b.save_task(t3)
+
+        mine = {task["task_id"]: task for task in runner_a.tasks_with_status("QUEUED")}
+        with mock.patch.object(acp_queue_journal, "_read_base", side_effect=AssertionError):
+            self.assertTrue(runner_a.reload_task(mine["t3"]))
+            self.assertTrue(runner_a.reload_task(mine["t4"]))
+        self.assertEqual(mine["t3"]["status"], "EVALUATING")
+        self.assertEqual(mine["t4"], rows["t4"])
+
+        # A rewritten base (here a compaction) is reloaded once, then served
+        # from memory along with later journal deltas.
+        acp_queue_journal.compact_journal(str(self.tasks_path))
+        t4["status"] = "EVALUATING"
+        runner_b.save_task(t4)
+        with mock.patch.object(acp_queue_journal, "_read_base", wraps=acp_queue_journal._read_base) as read_base:
+            self.assertTrue(runner_a.reload_task(mine["t4"]))
+            self.assertTrue(runner_a.reload_task(mine["t3"]))
+        self.assertEqual(read_base.call_count, 1)
+        self.assertEqual(mine["t4"]["status"], "EVALUATING")
+        self.assertEqual(mine["t3"]["status"], "EVALUATING")
+
+        (t1,) = runner_a.tasks_with_status("COMPLETED")
+        runner_b.archive_tasks(["t1"])
+        self.assertFalse(runner_a.reload_task(t1))
+
+    def test_next_due_at_tracks_deadlines_across_saves(self):
+        for backend in (
+            JsonlQueueBackend(str(self.tasks_path)),
+            SqliteQueueBackend(sqlite_path_for(str(self.tasks_path)), seed_path=str(self.tasks_path)),
+        ):
+            self.addCleanup(getattr(backend, "close", lambda: None))
+            backend.load()
+            self.assertEqual(backend.next_due_at(), 0.0)
+
+            due = list(backend.due_tasks())
+            self.assertEqual([task["task_id"] for task in due], ["t3", "t4"])
+            for task in due:
+                task["status"] = "EVALUATING"
+                backend.save_task(task)
+            self.assertEqual(backend.next_due_at(), TASKS[1]["next_attempt_at"])
+
+            retry_at = time.time() + 60
+            due[0].update({"status": "QUEUED", "next_attempt_at": retry_at})
+            backend.save_task(due[0])
+            self.assertEqual(backend.next_due_at(), retry_at)
+            self.assertEqual(list(backend.due_tasks()), [])
+
+    def test_tasks_with_status_returns_savable_rows(self):
+        for backend in (
+            JsonlQueueBackend(str(self.tasks_path)),
+            SqliteQueueBackend(sqlite_path_for(str(self.tasks_path)), seed_path=str(self.tasks_path)),
+        ):
+            self.addCleanup(getattr(backend, "close", lambda: None))
+            backend.load()
+            queued = backend.tasks_with_status("QUEUED")
+            self.assertEqual([task["task_id"] for task in queued], ["t2", "t3", "t4"])
+
+            queued[0]["status"] = "EVALUATING"
+            backend.save_task(queued[0])
+            backend.load()
+            self.assertEqual([task["task_id"] for task in backend.tasks_with_status("EVALUATING")], ["t2"])
+
+    def test_archive_moves_unique_terminal_rows_out_of_the_queue(self):
+        rows = [{"task_id": "t5", "status": "REFUSED"}, {"task_id": "t5", "status": "REFUSED"}] + TASKS
+        for name in ("jsonl", "sqlite"):
+            with self.subTest(backend=name):
+                tasks_path = Path(self.tmpdir.name) / name / "tasks.jsonl"
+                tasks_path.parent.mkdir()
+                tasks_path.write_text("".join(json.dumps(task) + "\n" for task in rows), encoding="utf-8")
+                if name == "jsonl":
+                    backend = JsonlQueueBackend(str(tasks_path), storage=QUEUE_STORAGE_JOURNAL)
+                else:
+                    backend = SqliteQueueBackend(sqlite_path_for(str(tasks_path)), seed_path=str(tasks_path))
+                    self.addCleanup(backend.close)
+                backend.load()
+                t3 = backend.tasks_with_status("QUEUED")[1]
+                t3["status"] = "COMPLETED"
+                backend.save_task(t3)
+
+                archived = backend.archive_tasks(["t1", "t3", "t4", "t5"])
+
+                # t4 is not terminal and t5 is not unique.
+                self.assertEqual([task["task_id"] for task in archived], ["t1", "t3"])
+                self.assertEqual([task["task_id"] for task in backend.all_tasks()], ["t5", "t5", "t2", "t4"])
+                self.assertEqual(len(archive_partitions(str(tasks_path))), 1)
+                self.assertEqual(find_archived_task(str(tasks_path), "t3")["status"], "COMPLETED")
+                self.assertIsNone(find_archived_task(str(tasks_path), "t4"))
+                self.assertEqual(backend.archive_tasks(["t1"]), [])
+
+                new_rows = [{"task_id": "t1", "status": "QUEUED"}, {"task_id": "t6", "status": "QUEUED"}]
+                self.assertEqual(backend.add_tasks(new_rows + new_rows), new_rows[1:])
+                self.assertEqual(backend.all_tasks()[-1], new_rows[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from acp_slice.queue import acp_queue_journal
+
+
+def _write_base(path, tasks):
+    path.write_text("".join(json.dumps(task, sort_keys=True) + "\n" for task in tasks), encoding="utf-8")
+
+
+class QueueJournalTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.tasks_path = Path(self.tmpdir.name) / "tasks.jsonl"
+        _write_base(
+            self.tasks_path,
+            [
+                {"task_id": "t1", "status": "QUEUED"},
+                {"task_id": 7, "status": "QUEUED"},
+                {"task_id": "t2", "status": "QUEUED"},
+            ],
+        )
+
+    def test_deltas_fold_over_base_by_task_id_and_row(self):
+        tasks = acp_queue_journal.load_tasks(str(self.tasks_path))
+        keys = acp_queue_journal.journal_keys(tasks)
+        tasks[0]["status"] = "EVALUATING"
+        acp_queue_journal.append_task_delta(str(self.tasks_path), keys[id(tasks[0])], tasks[0])
+        tasks[1]["status"] = "FAILED"
+        acp_queue_journal.append_task_delta(str(self.tasks_path), keys[id(tasks[1])], tasks[1])
+        tasks[0]["status"] = "COMPLETED"
+        acp_queue_journal.append_task_delta(str(self.tasks_path), keys[id(tasks[0])], tasks[0])
+
+        reloaded = acp_queue_journal.load_tasks(str(self.tasks_path))
+        self.assertEqual([task["status"] for task in reloaded], ["COMPLETED", "FAILED", "QUEUED"])
+
+    def test_torn_journal_line_is_skipped_without_losing_later_deltas(self):
+        journal_path = Path(acp_queue_journal.journal_path_for(str(self.tasks_path)))
+        journal_path.write_text('{"task": {"task_id": "t1", "sta', encoding="utf-8")
+        self.assertEqual(acp_queue_journal.load_tasks(str(self.tasks_path))[0]["status"], "QUEUED")
+
+        acp_queue_journal.append_task_delta(
+            str(self.tasks_path), ("task_id", "t2"), {"task_id": "t2", "status": "EVALUATING"}
+        )
+        reloaded = acp_queue_journal.load_tasks(str(self.tasks_path))
+        self.assertEqual([task["status"] for task in reloaded], ["QUEUED", "QUEUED", "EVALUATING"])
+
+    def test_compaction_folds_journal_into_base(self):
+        size = acp_queue_journal.append_task_delta(
+            str(self.tasks_path), ("task_id", "t2"), {"task_id": "t2", "status": "EVALUATING"}
+        )
+        acp_queue_journal.maybe_compact_in_background(str(self.tasks_path), size, threshold=1)
+        acp_queue_journal.wait_for_compaction(str(self.tasks_path))
+
+        self.assertFalse(Path(acp_queue_journal.journal_path_for(str(self.tasks_path))).exists())
+        base = [json.loads(line) for line in self.tasks_path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(base[2], {"task_id": "t2", "status": "EVALUATING"})
+
+    def test_snapshot_write_drops_stale_journal(self):
+        acp_queue_journal.append_task_delta(
+            str(self.tasks_path), ("task_id", "t1"), {"task_id": "t1", "status": "EVALUATING"}
+        )
+        acp_queue_journal.write_snapshot(str(self.tasks_path), [{"task_id": "t1", "status": "COMPLETED"}])
+        self.assertEqual(
+            acp_queue_journal.load_tasks(str(self.tasks_path)), [{"task_id": "t1", "status": "COMPLETED"}]
+        )
+
+    def test_snapshot_row_write_keeps_rows_changed_elsewhere(self):
+        tasks = acp_queue_journal.load_tasks(str(self.tasks_path))
+        keys = acp_queue_journal.journal_keys(tasks)
+        # Another process finishes t2 and appends a row after this one loaded.
+        acp_queue_journal.write_snapshot(
+            str(self.tasks_path),
+            [tasks[0], tasks[1], {"task_id": "t2", "status": "COMPLETED"}, {"task_id": "t3", "status": "QUEUED"}],
+        )
+        tasks[0]["status"] = "EVALUATING"
+        acp_queue_journal.write_snapshot_row(str(self.tasks_path), keys[id(tasks[0])], tasks[0])
+
+        reloaded = acp_queue_journal.load_tasks(str(self.tasks_path))
+        self.assertEqual([task["status"] for task in reloaded], ["EVALUATING", "QUEUED", "COMPLETED", "QUEUED"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.queue import acp_queue_watch
+
+
+class QueueWatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.tasks_path = Path(self.tmpdir.name) / "tasks.jsonl"
+        self.tasks_path.write_text("", encoding="utf-8")
+
+    def _check_watcher(self, watcher):
+        self.addCleanup(watcher.close)
+        Path(str(self.tasks_path) + ".lock").write_text("", encoding="utf-8")
+        self.assertFalse(watcher.wait(0.1))
+
+        timer = threading.Timer(0.05, lambda: self.tasks_path.write_text("{}\n", encoding="utf-8"))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertTrue(watcher.wait(5))
+
+        # poll() reports the same changes without blocking.
+        timer.join()
+        watcher.drain()
+        self.assertFalse(watcher.poll())
+        self.tasks_path.write_text("{}\n{}\n", encoding="utf-8")
+        self.assertTrue(watcher.poll())
+        self.assertFalse(watcher.poll())
+
+    def test_inotify_wakes_on_queue_file_change_only(self):
+        watcher = acp_queue_watch.QueueWatcher(str(self.tasks_path))
+        if not watcher.uses_inotify:
+            watcher.close()
+            self.skipTest("inotify unavailable")
+        self._check_watcher(watcher)
+
+    def test_polling_fallback_detects_change(self):
+        with mock.patch.object(acp_queue_watch, "_open_inotify", return_value=None):
+            watcher = acp_queue_watch.QueueWatcher(str(self.tasks_path), poll_interval=0.02)
+        self.assertFalse(watcher.uses_inotify)
+        self._check_watcher(watcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,311 @@
+import json
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.queue import acp_queue_backends, acp_queue_journal, acp_task_leases
+from acp_slice.queue.acp_queue_archive import find_archived_task
+from acp_slice.runners import acp_run_loop
+from acp_slice.telemetry import acp_consistency_validator, acp_event_reader, acp_events
+
+_run_harness = acp_run_loop._run_harness
+
+class _RunLoopTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        root = Path(self.tmpdir.name)
+        self.root = root
+        (root / "repo" / ".git").mkdir(parents=True)
+        (root / "queue").mkdir()
+        task_file = root / "task.json"
+        task_file.write_text(json.dumps({"repo_path": str(root / "repo"), "argv": ["make"]}), encoding="utf-8")
+        self.task_file = task_file
+        tasks_path = root / "queue" / "tasks.jsonl"
+        self.tasks_path = tasks_path
+        tasks_path.write_text(
+            json.dumps({"task_id": "t1", "status": "QUEUED", "task_file": str(task_file)}) + "\n", encoding="utf-8"
+        )
+        events_path = str(root / "events.jsonl")
+        patches = [
+            mock.patch.object(acp_run_loop, "TASKS_PATH", str(tasks_path)),
+            mock.patch.object(acp_run_loop, "CONFIG_PATH", str(root / "config.json")),
+            mock.patch.object(acp_run_loop, "HARNESS_LOG_DIR", str(root / "harness")),
+            mock.patch.object(acp_consistency_validator, "TASKS_PATH", str(tasks_path)),
+            mock.patch.object(acp_events, "EVENTS_LOG_PATH", events_path),
+            mock.patch.object(acp_event_reader, "EVENTS_LOG_PATH", events_path),
+            mock.patch.object(
+                acp_run_loop, "_run_harness", return_value=subprocess.CompletedProcess(["aah"], 0, "", "")
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_config(self, **config):
+        (self.root / "config.json").write_text(json.dumps(config), encoding="utf-8")
+
+    def assert_status_chain(self, task_id):
+        changes = [
+            (event["payload"]["old_status"], event["payload"]["new_status"])
+            for event in acp_event_reader.get_events_for_task(task_id)
+            if event["event_type"] == "EVENT_STATUS_CHANGED"
+        ]
+        self.assertEqual(changes[0][0], "QUEUED")
+        for previous, current in zip(changes, changes[1:]):
+            self.assertEqual(previous[1], current[0])
+        self.assertTrue(acp_consistency_validator.validate_task_consistency(task_id)["valid"])
+
+    def write_orphan(self, queued=True):
+        row = json.loads(self.tasks_path.read_text(encoding="utf-8"))
+        rows = [dict(row, task_id="orphan", status="EVALUATING")] + ([dict(row, task_id="t1")] if queued else [])
+        acp_queue_journal.write_snapshot(str(self.tasks_path), rows)
+        acp_events.append_event(
+            {
+                "event_type": "EVENT_STATUS_CHANGED",
+                "task_id": "orphan",
+                "payload": {"old_status": "QUEUED", "new_status": "EVALUATING"},
+            }
+        )
+
+    def assert_orphan_recovered(self):
+        recovered = acp_consistency_validator._load_queue_task("orphan")
+        self.assertEqual(recovered["status"], "DEAD_LETTER")
+        self.assertEqual(recovered["failure_reason"], "ORPHANED_EVALUATING")
+        self.assertEqual(recovered["dead_letter_reason"], "RETRIES_EXHAUSTED")
+        self.assertEqual(acp_consistency_validator.validate_task_consistency("orphan")["valid"], True)
+        event_types = [event["event_type"] for event in acp_event_reader.get_events_for_task("orphan")]
+        self.assertIn("EVENT_ORPHAN_RECOVERED", event_types)
+        self.assertNotIn("EVENT_RUN_FINISHED", event_types)
+
+
+class RunLoopSpanTests(_RunLoopTestCase):
+    def test_run_events_carry_phase_spans(self):
+        self.assertEqual(acp_run_loop.main(), 0)
+
+        events = {event["event_type"]: event["payload"] for event in acp_event_reader.get_events_for_task("t1")}
+        self.assertEqual(sorted(events["EVENT_RUN_STARTED"]["spans"]), ["claim", "queue_write"])
+        self.assertEqual(events["EVENT_GATES_EVALUATED"]["passed"], True)
+        self.assertIsNone(events["EVENT_GATES_EVALUATED"]["failure_reason"])
+        self.assertEqual(list(events["EVENT_GATES_EVALUATED"]["spans"]), ["task_file_validation"])
+        finished = events["EVENT_RUN_FINISHED"]
+        self.assertEqual(finished["final_status"], "COMPLETED")
+        self.assertEqual(
+            sorted(finished["spans"]),
+            ["claim", "harness", "queue_write", "task_file_validation", "terminal_validation", "total"],
+        )
+        self.assertGreaterEqual(finished["spans"]["total"], finished["spans"]["queue_write"])
+        self.assertEqual(acp_run_loop._TASK_SPANS, {})
+
+    def test_evaluating_rows_are_only_recovered_on_request_without_leases(self):
+        self.write_orphan()
+        # The row may belong to a live runner; a pass must leave it alone.
+        self.assertEqual(acp_run_loop.main(), 0)
+        self.assertEqual(acp_consistency_validator._load_queue_task("orphan")["status"], "EVALUATING")
+        self.assertEqual(acp_consistency_validator._load_queue_task("t1")["status"], "COMPLETED")
+
+        self.assertEqual(acp_run_loop.recover_orphaned_tasks(), 1)
+        self.assert_orphan_recovered()
+
+    def test_validated_terminal_tasks_move_to_the_archive(self):
+        with mock.patch.object(acp_run_loop, "QUEUE_ARCHIVE_ENABLED", True):
+            self.assertEqual(acp_run_loop.main(), 0)
+
+        self.assertEqual(self.tasks_path.read_text(encoding="utf-8"), "")
+        self.assertEqual(acp_run_loop._ARCHIVE_PENDING, [])
+        self.assertEqual(find_archived_task(str(self.tasks_path), "t1")["status"], "COMPLETED")
+        self.assertEqual(acp_consistency_validator.validate_task_consistency("t1"), {"valid": True, "status": "COMPLETED"})
+
+
+
+class ConcurrentPassTests(_RunLoopTestCase):
+    def test_concurrent_pass_keeps_per_task_ordering_on_the_main_thread(self):
+        task_ids = ["t1", "t2", "t3", "t4"]
+        acp_queue_journal.write_snapshot(
+            str(self.tasks_path),
+            [{"task_id": task_id, "status": "QUEUED", "task_file": str(self.task_file)} for task_id in task_ids],
+        )
+        self.write_config(max_tasks_per_run=10, max_concurrency=2)
+        # t1 and t2 only return once both are running at the same time.
+        overlap = threading.Barrier(2, timeout=5)
+        harness_threads = set()
+        statuses_at_harness = {}
+
+        def stub_harness(task_id, task_file_payload, timeout=None):
+            harness_threads.add(threading.current_thread())
+            statuses_at_harness[task_id] = acp_consistency_validator._load_queue_task(task_id)["status"]
+            if task_id in ("t1", "t2"):
+                overlap.wait()
+            return subprocess.CompletedProcess(["aah"], 0 if task_id != "t3" else 1, "", "")
+
+        write_threads = set()
+        save_task = acp_queue_backends.JsonlQueueBackend.save_task
+
+        def recording_save_task(backend, task):
+            write_threads.add(threading.current_thread())
+            return save_task(backend, task)
+
+        with mock.patch.object(acp_run_loop, "_run_harness", side_effect=stub_harness), mock.patch.object(
+            acp_queue_backends.JsonlQueueBackend, "save_task", recording_save_task
+        ):
+            self.assertEqual(acp_run_loop.main(), 0)
+
+        self.assertEqual(write_threads, {threading.main_thread()})
+        self.assertNotIn(threading.main_thread(), harness_threads)
+        # Each task was claimed and saved as EVALUATING before its harness ran.
+        self.assertEqual(statuses_at_harness, {task_id: "EVALUATING" for task_id in task_ids})
+        for task_id in task_ids:
+            with self.subTest(task_id=task_id):
+                self.assert_status_chain(task_id)
+        self.assertEqual(acp_consistency_validator._load_queue_task("t3")["status"], "DEAD_LETTER")
+        self.assertEqual(acp_consistency_validator._load_queue_task("t4")["status"], "COMPLETED")
+
+
+class InterruptedPassTests(_RunLoopTestCase):
+    def setUp(self):
+        super().setUp()
+        patches = [
+            mock.patch.object(acp_run_loop, "_run_harness", _run_harness),
+            mock.patch.object(acp_run_loop, "_harness_command", return_value=["sh", "-c", "sleep 5; true"]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(signal.signal, signal.SIGINT, signal.signal(signal.SIGINT, signal.default_int_handler))
+
+    def test_ctrl_c_kills_in_flight_harnesses_and_cancels_their_tasks(self):
+        acp_queue_journal.write_snapshot(
+            str(self.tasks_path),
+            [
+                {"task_id": "t1", "status": "QUEUED", "task_file": str(self.task_file)},
+                {"task_id": "t2", "status": "QUEUED", "task_file": str(self.task_file), "max_retries": 1},
+                {"task_id": "t3", "status": "QUEUED", "task_file": str(self.task_file)},
+            ],
+        )
+        self.write_config(max_tasks_per_run=10, max_concurrency=2)
+        interrupt = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGINT))
+        self.addCleanup(interrupt.cancel)
+
+        started = time.monotonic()
+        interrupt.start()
+        with self.assertRaises(KeyboardInterrupt):
+            acp_run_loop.main()
+        self.assertLess(time.monotonic() - started, 3)
+
+        cancelled = acp_consistency_validator._load_queue_task("t1")
+        self.assertEqual(cancelled["status"], "DEAD_LETTER")
+        self.assertEqual(cancelled["failure_reason"], "RUNNER_CANCELLED")
+        retried = acp_consistency_validator._load_queue_task("t2")
+        self.assertEqual(retried["status"], "QUEUED")
+        self.assertEqual(retried["retries"], 1)
+        for task_id in ("t1", "t2"):
+            with self.subTest(task_id=task_id):
+                self.assert_status_chain(task_id)
+        # The third task waited for a free slot and was never claimed.
+        self.assertEqual(acp_consistency_validator._load_queue_task("t3")["status"], "QUEUED")
+        self.assertEqual(acp_event_reader.get_events_for_task("t3"), [])
+        self.assertEqual(acp_run_loop._HARNESS_PIDS, set())
+
+
+class LeaseTests(_RunLoopTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(acp_run_loop, "_TASK_LEASES", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: acp_run_loop._TASK_LEASES and acp_run_loop._TASK_LEASES.close())
+
+    def test_evaluating_rows_whose_lease_is_free_are_recovered_by_a_pass(self):
+        self.write_config(lease_ttl_seconds=30)
+        self.write_orphan()
+        with mock.patch.object(acp_run_loop, "_NEXT_ORPHAN_SCAN_AT", 0.0):
+            self.assertEqual(acp_run_loop.main(), 0)
+        self.assert_orphan_recovered()
+        self.assertEqual(acp_consistency_validator._load_queue_task("t1")["status"], "COMPLETED")
+
+    def test_idle_loop_wakes_for_the_next_orphan_scan(self):
+        self.write_config(lease_ttl_seconds=0.3)
+        self.write_orphan(queued=False)
+        waits = []
+        wait = acp_run_loop.QueueWatcher.wait
+
+        def bounded_wait(watcher, timeout):
+            # Nothing writes to an idle queue, so only a deadline can wake it.
+            waits.append(timeout)
+            self.assertIsNotNone(timeout)
+            if acp_consistency_validator._load_queue_task("orphan")["status"] != "EVALUATING" or len(waits) > 20:
+                raise KeyboardInterrupt
+            return wait(watcher, timeout)
+
+        # A scan just ran, before the orphan's lease expired.
+        with mock.patch.object(acp_run_loop, "_NEXT_ORPHAN_SCAN_AT", time.monotonic() + 0.3), mock.patch.object(
+            acp_run_loop.QueueWatcher, "wait", bounded_wait
+        ):
+            self.assertEqual(acp_run_loop.run_forever(5.0), 0)
+
+        self.assert_orphan_recovered()
+        self.assertLessEqual(waits[0], 0.3)
+
+    def test_result_is_dropped_when_the_lease_is_stolen_mid_task(self):
+        self.write_config(lease_ttl_seconds=30)
+        thief = acp_task_leases.TaskLeases(
+            acp_task_leases.lease_dir_for(str(self.tasks_path)), ttl=30, owner="runner-b"
+        )
+        self.addCleanup(thief.close)
+
+        def stalled_harness(task_id, task_file_payload, timeout=None):
+            # This runner stalls past its TTL; another runner reclaims the row
+            # and starts its own attempt.
+            with mock.patch.object(acp_task_leases.time, "time", return_value=time.time() + 60):
+                self.assertTrue(thief.acquire("task_id:t1")["acquired"])
+            return subprocess.CompletedProcess(["aah"], 0, "", "")
+
+        with mock.patch.object(acp_run_loop, "_run_harness", side_effect=stalled_harness):
+            self.assertEqual(acp_run_loop.main(), 0)
+
+        self.assertEqual(acp_consistency_validator._load_queue_task("t1")["status"], "EVALUATING")
+        event_types = [event["event_type"] for event in acp_event_reader.get_events_for_task("t1")]
+        self.assertEqual(event_types[-1], "EVENT_LOCK_LOST")
+        self.assertNotIn("EVENT_RUN_FINISHED", event_types)
+        self.assertNotIn("EVENT_LOCK_RELEASED", event_types)
+        self.assertEqual(acp_run_loop._TASK_LEASES.lost(), ["task_id:t1"])
+        self.assertEqual(thief.held(), ["task_id:t1"])
+        self.assertEqual(acp_run_loop._TASK_LEASE_KEYS, {})
+        self.assertEqual(acp_run_loop._TASK_SPANS, {})
+
+
+class RunnerMetricsTests(_RunLoopTestCase):
+    def test_exporter_is_created_once_and_depth_is_a_count_query(self):
+        with mock.patch.object(acp_run_loop, "_METRICS_EXPORTER", None), mock.patch.object(
+            acp_run_loop.METRICS, "callback", wraps=acp_run_loop.METRICS.callback
+        ) as register_callback:
+            exporter = acp_run_loop._start_metrics(serve_http=False)
+            self.addCleanup(exporter.close)
+            self.assertEqual(acp_run_loop.main(), 0)
+            self.assertEqual(acp_run_loop.main(), 0)
+            self.assertIs(acp_run_loop._start_metrics(serve_http=False), exporter)
+            self.assertEqual(register_callback.call_count, 2)
+
+        backend = acp_queue_backends.get_queue_backend(str(self.tasks_path))
+        with mock.patch.object(backend, "all_tasks", side_effect=AssertionError):
+            text = acp_run_loop.METRICS.render()
+        self.assertIn('acp_queue_depth{status="COMPLETED"} 1', text)
+
+
+class SyncHarnessTests(unittest.TestCase):
+    def test_timeout_kills_harness_group(self):
+        # A harness whose child keeps the output pipes open after the shell is killed.
+        with mock.patch.object(acp_run_loop, "_harness_command", return_value=["sh", "-c", "sleep 5; true"]):
+            started = time.monotonic()
+            with self.assertRaises(subprocess.TimeoutExpired):
+                acp_run_loop._run_harness("t1", {}, 0.2)
+        self.assertLess(time.monotonic() - started, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from acp_slice.runners import acp_run_loop
+from acp_slice.runners.acp_task_file_cache import TaskFileCache
+
+
+class TaskFileCacheTests(unittest.TestCase):
+    def test_lru_eviction_counts_and_repo_lookup(self):
+        cache = TaskFileCache(2)
+        payloads = [{"n": n} for n in range(3)]
+        for n, payload in enumerate(payloads):
+            if n == 2:
+                self.assertIs(cache.get(("a",))[0], payloads[0])
+            cache.put((chr(ord("a") + n),), payload, f"/repo{n}")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get(("c",)), (payloads[2], "/repo2"))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.resolved_repo(payloads[0]), "/repo0")
+        self.assertIsNone(cache.resolved_repo(payloads[1]))
+        self.assertIsNone(cache.resolved_repo({"n": 0}))
+
+    def test_runner_gates_reuse_unchanged_task_files(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        root = Path(tmpdir.name)
+        (root / "repo" / ".git").mkdir(parents=True)
+        task_file = root / "task.json"
+        task_file.write_text(json.dumps({"repo_path": str(root / "repo"), "argv": ["make"]}), encoding="utf-8")
+        cache = TaskFileCache(8)
+
+        with mock.patch.object(acp_run_loop, "_TASK_FILE_CACHE", cache):
+            payload, reason = acp_run_loop._evaluate_task_file_gates(str(task_file))
+            with mock.patch.object(acp_run_loop, "_load_json_object") as load:
+                self.assertIs(acp_run_loop._evaluate_task_file_gates(str(task_file))[0], payload)
+            load.assert_not_called()
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(acp_run_loop._harness_command("t1", payload)[3], os.path.realpath(root / "repo"))
+
+            # A rewrite changes the file's identity; a removed repo fails the gate again.
+            rewritten = {"repo_path": str(root / "repo"), "argv": ["make", "all"]}
+            task_file.write_text(json.dumps(rewritten), encoding="utf-8")
+            self.assertEqual(acp_run_loop._evaluate_task_file_gates(str(task_file))[0]["argv"], ["make", "all"])
+            shutil.rmtree(root / "repo" / ".git")
+            self.assertEqual(acp_run_loop._evaluate_task_file_gates(str(task_file)), (None, "REPO_PATH_INVALID"))
+        self.assertIsNone(reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from acp_slice.queue import acp_task_leases
+from acp_slice.queue.acp_task_leases import TaskLeases
+
+
+class TaskLeaseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.first = TaskLeases(self.tmpdir.name, ttl=30, owner="runner-a")
+        self.second = TaskLeases(self.tmpdir.name, ttl=30, owner="runner-b")
+        self.addCleanup(self.first.close)
+        self.addCleanup(self.second.close)
+
+    def test_live_lease_is_held_until_released(self):
+        self.assertTrue(self.first.acquire("task_id:t1")["acquired"])
+        held = self.second.acquire("task_id:t1")
+        self.assertEqual((held["acquired"], held["reason"], held["owner"]), (False, "LOCK_HELD", "runner-a"))
+
+        self.assertTrue(self.first.release("task_id:t1"))
+        self.assertTrue(self.second.acquire("task_id:t1")["acquired"])
+
+    def test_expired_lease_is_reclaimed_and_lost_by_old_owner(self):
+        self.first.acquire("task_id:t1")
+        with mock.patch.object(acp_task_leases.time, "time", return_value=time.time() + 60):
+            reclaimed = self.second.acquire("task_id:t1")
+        self.assertTrue(reclaimed["acquired"])
+        self.assertEqual(reclaimed["reclaimed_from"], "runner-a")
+
+        self.assertEqual(self.first.renew(), ["task_id:t1"])
+        self.assertEqual(self.first.lost(), ["task_id:t1"])
+        self.assertFalse(self.first.release("task_id:t1"))
+        self.assertEqual(self.second.held(), ["task_id:t1"])
+
+    def test_owns_checks_the_lease_file_before_the_heartbeat_notices(self):
+        self.first.acquire("task_id:t1")
+        self.assertTrue(self.first.owns("task_id:t1"))
+        with mock.patch.object(acp_task_leases.time, "time", return_value=time.time() + 60):
+            self.assertTrue(self.second.acquire("task_id:t1")["acquired"])
+        self.assertFalse(self.first.owns("task_id:t1"))
+        self.assertEqual((self.first.held(), self.first.lost()), ([], ["task_id:t1"]))
+
+        # Taking the lease back clears the loss.
+        self.second.release("task_id:t1")
+        self.first.acquire("task_id:t1")
+        self.assertEqual((self.first.owns("task_id:t1"), self.first.lost()), (True, []))
+
+    def test_lapsed_lease_nobody_reclaimed_is_renewed_by_owns(self):
+        self.first.acquire("task_id:t1")
+        later = time.time() + 60
+        with mock.patch.object(acp_task_leases.time, "time", return_value=later):
+            self.assertTrue(self.first.owns("task_id:t1"))
+            held = self.second.acquire("task_id:t1")
+        self.assertEqual((held["acquired"], held["owner"]), (False, "runner-a"))
+        self.assertGreater(held["expires_at"], later)
+
+
+if __name__ == "__main__":
+    unittest.main()
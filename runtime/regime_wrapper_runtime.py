@@ -6,19 +6,67 @@ Non-claims:
 - This wrapper does NOT authorize action.
 - This wrapper does NOT validate domain truth.
 - This wrapper only enforces admission to kernel evaluation.
+
+Modes:
+- <regime> <payload>: one-shot admission check (the CLI contract).
+- --serve [socket_path]: keep the wrapper warm and answer admission requests
+  over a Unix domain socket.
+- --client <regime> <payload>: same output as the one-shot CLI, decided by a
+  running server (falls back to deciding in-process if none is reachable).
+- --batch [path|-] [--workers N] [--chunk-lines N]: read JSONL records
+  `{"regime": ..., "payload": ...}` and write one result object per record.
+
+Socket framing: one JSON request per line, the argument texts after file
+resolution (`["<regime json>", "<payload json>"]`); one JSON response per
+line, the result object, or `{"error": "..."}` if deciding raised.
+Connections may carry any number of requests.
 """
 
 from __future__ import annotations
 
+import argparse
+import collections
+import itertools
 import json
+import os
+import re
+import signal
+import socket
+import socketserver
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
+
+# Used only when the registry cannot be read at startup.
+DEFAULT_REGIME_ENUM = frozenset(
+    {
+        "SETTLEMENT_RAILS_INCIDENT",
+        "STABLECOIN_PEG_EVENT",
+        "BANK_LIQUIDITY_EVENT",
+    }
+)
+
+REGISTRY_PATH = os.environ.get(
+    "REGIME_REGISTRY_PATH", str(Path(__file__).resolve().parents[1] / "registry" / "regime_registry.md")
+)
+# Optional precompiled registry, so startup can skip parsing the markdown.
+REGISTRY_CACHE_PATH = os.environ.get("REGIME_REGISTRY_CACHE")
+REGISTRY_RECHECK_SECONDS = 1.0
+_REGIME_HEADING = re.compile(r"^###\s+([A-Z][A-Z0-9_]*)\s*$")
+
+DEFAULT_SOCKET_PATH = os.environ.get(
+    "REGIME_ADMISSION_SOCKET", os.path.join(tempfile.gettempdir(), "regime-admission.sock")
+)
+
 
-REGIME_ENUM = {
-    "SETTLEMENT_RAILS_INCIDENT",
-    "STABLECOIN_PEG_EVENT",
-    "BANK_LIQUIDITY_EVENT",
-}
+# Shared read-only results; admit() never allocates a result.
+REFUSE_REGIME_MISSING = MappingProxyType({"status": "REFUSE", "reason": "REGIME_MISSING", "provenance": "WRAPPER"})
+REFUSE_REGIME_UNKNOWN = MappingProxyType({"status": "REFUSE", "reason": "REGIME_UNKNOWN", "provenance": "WRAPPER"})
+KERNEL_STUB_RESULT = MappingProxyType({"status": "REFUSE", "reason": "KERNEL_STUB", "provenance": "KERNEL"})
 
 
 def refuse(reason: str) -> dict:
@@ -31,6 +79,143 @@ def invoke_kernel_stub(payload: object) -> dict:
     return {"status": "REFUSE", "reason": "KERNEL_STUB", "provenance": "KERNEL"}
 
 
+def _decide(
+    regime_enum: frozenset, regime_status: object, entry_mode: object, regime_id: object
+) -> MappingProxyType:
+    # The wrapper rules, in order. Decision tables are built from this, and
+    # admit() falls back to it for triples outside the table.
+    if regime_status != "REGIME_DECLARED":
+        return REFUSE_REGIME_MISSING if regime_status == "REGIME_NOT_DECLARED" else REFUSE_REGIME_UNKNOWN
+    if entry_mode != "OPERATOR_ASSERTED" or regime_id not in regime_enum:
+        return REFUSE_REGIME_UNKNOWN
+    return KERNEL_STUB_RESULT
+
+
+def _build_decision_table(regime_enum: frozenset) -> dict:
+    # (regime_status, entry_mode, regime_id) -> result, absent fields as "UNKNOWN".
+    statuses = ("REGIME_DECLARED", "REGIME_NOT_DECLARED", "REGIME_UNKNOWN", "UNKNOWN")
+    entry_modes = ("OPERATOR_ASSERTED", "UNKNOWN")
+    regime_ids = tuple(regime_enum) + ("UNKNOWN",)
+    return {key: _decide(regime_enum, *key) for key in itertools.product(statuses, entry_modes, regime_ids)}
+
+
+# One immutable snapshot per registry version. Reloads swap the module
+# reference in a single assignment, so an admission that read a snapshot
+# uses its enum and table together.
+RegistrySnapshot = collections.namedtuple("RegistrySnapshot", ["signature", "regime_enum", "decision_table"])
+
+
+def parse_registry(text: str) -> frozenset:
+    """Return the regime_id values declared as `### <ID>` registry headings."""
+    regime_ids = set()
+    for line in text.splitlines():
+        match = _REGIME_HEADING.match(line)
+        if match:
+            regime_ids.add(match.group(1))
+    return frozenset(regime_ids)
+
+
+def _registry_signature(path: str) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_registry_cache(path: str, signature: tuple) -> frozenset | None:
+    try:
+        with open(REGISTRY_CACHE_PATH, "r", encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+        if cache["source"] == path and tuple(cache["signature"]) == signature:
+            return frozenset(cache["regime_ids"])
+    except Exception:
+        pass
+    return None
+
+
+def _write_registry_cache(path: str, signature: tuple, regime_enum: frozenset) -> None:
+    cache = {"source": path, "signature": list(signature), "regime_ids": sorted(regime_enum)}
+    try:
+        directory = os.path.dirname(REGISTRY_CACHE_PATH) or "."
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, delete=False) as tmp_file:
+            json.dump(cache, tmp_file)
+        os.replace(tmp_file.name, REGISTRY_CACHE_PATH)
+    except Exception:
+        # The cache only saves a parse; the registry stays authoritative.
+        pass
+
+
+def _load_regime_enum(path: str, signature: tuple) -> frozenset:
+    if REGISTRY_CACHE_PATH:
+        regime_enum = _read_registry_cache(path, signature)
+        if regime_enum is not None:
+            return regime_enum
+    regime_enum = parse_registry(Path(path).read_text(encoding="utf-8"))
+    if REGISTRY_CACHE_PATH:
+        _write_registry_cache(path, signature, regime_enum)
+    return regime_enum
+
+
+_REGISTRY = RegistrySnapshot(None, DEFAULT_REGIME_ENUM, _build_decision_table(DEFAULT_REGIME_ENUM))
+_REGISTRY_LOCK = threading.Lock()
+_next_registry_check = 0.0
+_monotonic = time.monotonic
+
+
+def registry_snapshot() -> RegistrySnapshot:
+    """Return the current registry snapshot, reloading it if the file changed.
+
+    The file's (mtime, size) is checked at most every
+    REGISTRY_RECHECK_SECONDS. A registry that is missing or unreadable keeps
+    the last good snapshot.
+    """
+    global _REGISTRY, _next_registry_check, REGIME_ENUM
+    now = _monotonic()
+    if now < _next_registry_check:
+        return _REGISTRY
+    with _REGISTRY_LOCK:
+        if now < _next_registry_check:
+            return _REGISTRY
+        _next_registry_check = now + REGISTRY_RECHECK_SECONDS
+        signature = _registry_signature(REGISTRY_PATH)
+        if signature is None or signature == _REGISTRY.signature:
+            return _REGISTRY
+        try:
+            regime_enum = _load_regime_enum(REGISTRY_PATH, signature)
+        except Exception:
+            return _REGISTRY
+        if regime_enum != _REGISTRY.regime_enum:
+            _REGISTRY = RegistrySnapshot(signature, regime_enum, _build_decision_table(regime_enum))
+        else:
+            _REGISTRY = _REGISTRY._replace(signature=signature)
+        REGIME_ENUM = _REGISTRY.regime_enum
+        return _REGISTRY
+
+
+REGIME_ENUM = registry_snapshot().regime_enum
+
+
+def admit(regime: object, payload: object) -> MappingProxyType:
+    """Return the admission result for a parsed regime context and payload.
+
+    Pure and side-effect free: nothing is printed and the returned mapping is
+    a shared read-only object (use dict(result) for a mutable copy). Refusal
+    reasons match the CLI. A regime that is not a mapping raises, as in the
+    CLI.
+    """
+    if regime is None:
+        return REFUSE_REGIME_MISSING
+    snapshot = _REGISTRY if _monotonic() < _next_registry_check else registry_snapshot()
+    key = (regime.get("regime_status", "UNKNOWN"), regime.get("entry_mode", "UNKNOWN"), regime.get("regime_id", "UNKNOWN"))
+    try:
+        result = snapshot.decision_table.get(key)
+    except TypeError:
+        # Unhashable field values; the rules decide (or raise) as the CLI does.
+        result = None
+    return result if result is not None else _decide(snapshot.regime_enum, *key)
+
+
 def load_json(arg: str) -> object:
     path = Path(arg)
     if path.exists():
@@ -38,41 +223,222 @@ def load_json(arg: str) -> object:
     return json.loads(arg)
 
 
-def main() -> int:
-    if len(sys.argv) < 3:
-        result = refuse("REGIME_MISSING")
-        print(json.dumps(result))
-        return 0
+def evaluate(args: list, loader=load_json) -> MappingProxyType:
+    """Decide admission for the CLI arguments without printing anything."""
+    if len(args) < 2:
+        return REFUSE_REGIME_MISSING
 
     try:
-        regime = load_json(sys.argv[1])
-        payload = load_json(sys.argv[2])
+        regime = loader(args[0])
+        payload = loader(args[1])
     except Exception:
-        result = refuse("REGIME_UNKNOWN")
-        print(json.dumps(result))
-        return 0
+        return REFUSE_REGIME_UNKNOWN
 
-    if regime is None:
-        result = refuse("REGIME_MISSING")
-        print(json.dumps(result))
-        return 0
+    return admit(regime, payload)
 
-    regime_status = regime.get("regime_status", "UNKNOWN")
-    regime_id = regime.get("regime_id", "UNKNOWN")
-    entry_mode = regime.get("entry_mode", "UNKNOWN")
 
-    if regime_status != "REGIME_DECLARED":
-        result = refuse("REGIME_MISSING" if regime_status == "REGIME_NOT_DECLARED" else "REGIME_UNKNOWN")
-        print(json.dumps(result))
+def emit(result) -> None:
+    """Print a result exactly as refuse()/invoke_kernel_stub() and the CLI do."""
+    if result.get("provenance") == "KERNEL":
+        print("KERNEL_INVOKE_ATTEMPT")
+    else:
+        print(f"WRAPPER_REFUSE:{result['reason']}")
+    print(json.dumps(dict(result)))
+
+
+def admit_record_line(line: str) -> MappingProxyType:
+    """Decide one batch record with the same rules as the CLI.
+
+    An unparseable line is refused as REGIME_UNKNOWN, like an unparseable
+    argument; a record without `regime` or `payload` is refused as
+    REGIME_MISSING, like a missing argument.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return REFUSE_REGIME_UNKNOWN
+    if not isinstance(record, dict):
+        return REFUSE_REGIME_UNKNOWN
+    if "regime" not in record or "payload" not in record:
+        return REFUSE_REGIME_MISSING
+    return admit(record["regime"], record["payload"])
+
+
+def _admit_chunk(lines: list) -> str:
+    out = []
+    for line in lines:
+        try:
+            result = dict(admit_record_line(line))
+        except Exception as exc:
+            result = {"error": f"{type(exc).__name__}: {exc}"}
+        out.append(json.dumps(result) + "\n")
+    return "".join(out)
+
+
+def _chunks(stream, chunk_lines: int):
+    chunk = []
+    for line in stream:
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_lines:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(stream, out, workers: int = 1, chunk_lines: int = 1024) -> int:
+    """Stream admission results for JSONL records, in input order.
+
+    With workers > 1, chunks go to a process pool with at most two chunks
+    per worker in flight, so memory stays bounded however large the input.
+    """
+    if workers <= 1:
+        for chunk in _chunks(stream, chunk_lines):
+            out.write(_admit_chunk(chunk))
         return 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = collections.deque()
+        for chunk in _chunks(stream, chunk_lines):
+            in_flight.append(pool.submit(_admit_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                out.write(in_flight.popleft().result())
+        while in_flight:
+            out.write(in_flight.popleft().result())
+    return 0
+
+
+def batch_main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="regime_wrapper_runtime.py --batch")
+    parser.add_argument("path", nargs="?", default="-")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-lines", type=int, default=1024)
+    options = parser.parse_args(argv)
+    if options.path == "-":
+        return run_batch(sys.stdin, sys.stdout, options.workers, max(options.chunk_lines, 1))
+    with open(options.path, "r", encoding="utf-8") as stream:
+        return run_batch(stream, sys.stdout, options.workers, max(options.chunk_lines, 1))
+
+
+def _respond(line: bytes) -> bytes:
+    try:
+        args = json.loads(line)
+        if not isinstance(args, list):
+            raise ValueError("request must be a JSON array of argument texts")
+        response = dict(evaluate(args, loader=json.loads))
+    except Exception as exc:
+        response = {"error": f"{type(exc).__name__}: {exc}"}
+    return (json.dumps(response) + "\n").encode("utf-8")
+
+
+class _AdmissionHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            self.wfile.write(_respond(line))
+            self.wfile.flush()
+
+
+class AdmissionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _clear_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"admission server already listening on {socket_path}")
 
-    if entry_mode != "OPERATOR_ASSERTED" or regime_id not in REGIME_ENUM:
-        result = refuse("REGIME_UNKNOWN")
-        print(json.dumps(result))
+
+def _stop_serving(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(socket_path: str = DEFAULT_SOCKET_PATH) -> int:
+    _clear_stale_socket(socket_path)
+    signal.signal(signal.SIGTERM, _stop_serving)
+    previous_umask = os.umask(0o077)
+    try:
+        server = AdmissionServer(socket_path, _AdmissionHandler)
+    finally:
+        os.umask(previous_umask)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+    return 0
+
+
+def _read_arg(arg: str) -> str | None:
+    # Files are read on the client side so relative paths keep meaning the
+    # caller's working directory; None makes the server refuse as the CLI
+    # does for an unreadable file.
+    path = Path(arg)
+    try:
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+    except Exception:
+        return None
+    return arg
+
+
+class AdmissionClient:
+    """Persistent connection to an admission server."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+        self._rfile = self._sock.makefile("rb")
+
+    def evaluate(self, args: list) -> dict:
+        """Decide admission for CLI-style arguments (paths or JSON texts)."""
+        request = json.dumps([_read_arg(arg) for arg in args[:2]]) + "\n"
+        self._sock.sendall(request.encode("utf-8"))
+        line = self._rfile.readline()
+        if not line:
+            raise ConnectionError("admission server closed the connection")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._rfile.close()
+        self._sock.close()
+
+
+def client_main(args: list, socket_path: str = DEFAULT_SOCKET_PATH) -> int:
+    try:
+        client = AdmissionClient(socket_path)
+    except OSError:
+        emit(evaluate(args))
         return 0
+    try:
+        result = client.evaluate(args)
+    finally:
+        client.close()
+    if "error" in result:
+        print(result["error"], file=sys.stderr)
+        return 1
+    emit(result)
+    return 0
 
-    result = invoke_kernel_stub(payload)
-    print(json.dumps(result))
+
+def main() -> int:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        return serve(sys.argv[2] if len(sys.argv) >= 3 else DEFAULT_SOCKET_PATH)
+    if len(sys.argv) >= 2 and sys.argv[1] == "--client":
+        return client_main(sys.argv[2:])
+    if len(sys.argv) >= 2 and sys.argv[1] == "--batch":
+        return batch_main(sys.argv[2:])
+    emit(evaluate(sys.argv[1:]))
     return 0
 
 
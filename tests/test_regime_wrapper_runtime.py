@@ -0,0 +1,306 @@
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "runtime"))
+
+import regime_wrapper_runtime as runtime  # noqa: E402
+
+REGIME_IDS = ("SETTLEMENT_RAILS_INCIDENT", "STABLECOIN_PEG_EVENT", "BANK_LIQUIDITY_EVENT")
+
+
+def _previous_cli(args):
+    # The one-shot CLI's rules as they stood before admit()/evaluate(); the
+    # wrapper must keep producing exactly these results.
+    if len(args) < 2:
+        return runtime.refuse("REGIME_MISSING")
+    try:
+        regime = runtime.load_json(args[0])
+        payload = runtime.load_json(args[1])
+    except Exception:
+        return runtime.refuse("REGIME_UNKNOWN")
+    if regime is None:
+        return runtime.refuse("REGIME_MISSING")
+    regime_status = regime.get("regime_status", "UNKNOWN")
+    regime_id = regime.get("regime_id", "UNKNOWN")
+    entry_mode = regime.get("entry_mode", "UNKNOWN")
+    if regime_status != "REGIME_DECLARED":
+        return runtime.refuse("REGIME_MISSING" if regime_status == "REGIME_NOT_DECLARED" else "REGIME_UNKNOWN")
+    if entry_mode != "OPERATOR_ASSERTED" or regime_id not in set(REGIME_IDS):
+        return runtime.refuse("REGIME_UNKNOWN")
+    return runtime.invoke_kernel_stub(payload)
+
+
+def _sweep_regimes():
+    # The axes of tests/regime_wrapper_sweep_test.md, plus absent fields.
+    statuses = ("REGIME_DECLARED", "REGIME_NOT_DECLARED", "REGIME_UNKNOWN", None)
+    regime_ids = REGIME_IDS + ("NOT_A_REGIME", None)
+    entry_modes = ("OPERATOR_ASSERTED", "INFERRED", None)
+    versions = ("v0", "UNKNOWN")
+    for status, regime_id, entry_mode, version in itertools.product(statuses, regime_ids, entry_modes, versions):
+        regime = {"semantics_version": version}
+        for field, value in (("regime_status", status), ("regime_id", regime_id), ("entry_mode", entry_mode)):
+            if value is not None:
+                regime[field] = value
+        yield regime
+
+
+class _RegistryIsolation:
+    def isolate_registry(self):
+        # Each test starts from the built-in registry, as a fresh process would.
+        default = runtime.RegistrySnapshot(
+            None, runtime.DEFAULT_REGIME_ENUM, runtime._build_decision_table(runtime.DEFAULT_REGIME_ENUM)
+        )
+        for name, value in (
+            ("_REGISTRY", default),
+            ("_next_registry_check", 0.0),
+            ("REGIME_ENUM", runtime.DEFAULT_REGIME_ENUM),
+        ):
+            patcher = mock.patch.object(runtime, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class EvaluateTests(_RegistryIsolation, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.isolate_registry()
+
+    def assertMatchesPreviousCli(self, args):
+        with contextlib.redirect_stdout(io.StringIO()) as expected_out:
+            expected = _previous_cli(args)
+            print(json.dumps(expected))
+        result = runtime.evaluate(args)
+        self.assertEqual(dict(result), expected)
+        with contextlib.redirect_stdout(io.StringIO()) as actual_out:
+            runtime.emit(result)
+        self.assertEqual(actual_out.getvalue(), expected_out.getvalue())
+
+    def test_sweep_matches_the_previous_cli(self):
+        payload = json.dumps({"amount": 1})
+        for regime in _sweep_regimes():
+            with self.subTest(regime=regime):
+                self.assertMatchesPreviousCli([json.dumps(regime), payload])
+
+    def test_missing_unparseable_and_file_arguments_match_the_previous_cli(self):
+        regime_path = Path(self.tmpdir.name) / "regime.json"
+        regime_path.write_text(
+            json.dumps(
+                {"regime_status": "REGIME_DECLARED", "regime_id": REGIME_IDS[0], "entry_mode": "OPERATOR_ASSERTED"}
+            ),
+            encoding="utf-8",
+        )
+        broken_path = Path(self.tmpdir.name) / "broken.json"
+        broken_path.write_text("{", encoding="utf-8")
+        cases = (
+            [],
+            ["{}"],
+            ["null", "{}"],
+            ["{", "{}"],
+            ["{}", "{"],
+            [str(regime_path), "{}"],
+            [str(broken_path), "{}"],
+            [str(regime_path), str(broken_path)],
+        )
+        for args in cases:
+            with self.subTest(args=args):
+                self.assertMatchesPreviousCli(args)
+
+    def test_unhashable_fields_match_the_previous_cli(self):
+        for regime in (
+            {"regime_status": ["REGIME_DECLARED"]},
+            {"regime_status": "REGIME_DECLARED", "entry_mode": {}, "regime_id": REGIME_IDS[0]},
+            {"regime_status": "REGIME_DECLARED", "entry_mode": "INFERRED", "regime_id": []},
+        ):
+            with self.subTest(regime=regime):
+                self.assertMatchesPreviousCli([json.dumps(regime), "{}"])
+        regime = {"regime_status": "REGIME_DECLARED", "entry_mode": "OPERATOR_ASSERTED", "regime_id": []}
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertRaises(TypeError, _previous_cli, [json.dumps(regime), "{}"])
+        self.assertRaises(TypeError, runtime.evaluate, [json.dumps(regime), "{}"])
+
+    def test_non_object_regimes_raise_as_the_previous_cli_did(self):
+        for regime_text in ("[]", "1", '"REGIME_DECLARED"', "true"):
+            with self.subTest(regime=regime_text):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertRaises(AttributeError, _previous_cli, [regime_text, "{}"])
+                self.assertRaises(AttributeError, runtime.evaluate, [regime_text, "{}"])
+
+    def test_admit_is_silent_and_returns_read_only_results(self):
+        regime = {"regime_status": "REGIME_DECLARED", "regime_id": REGIME_IDS[1], "entry_mode": "OPERATOR_ASSERTED"}
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            result = runtime.admit(regime, {})
+        self.assertEqual(out.getvalue(), "")
+        self.assertIs(result, runtime.KERNEL_STUB_RESULT)
+        with self.assertRaises(TypeError):
+            result["reason"] = "OVERRIDDEN"
+
+
+class BatchTests(_RegistryIsolation, unittest.TestCase):
+    def setUp(self):
+        self.isolate_registry()
+        lines = [json.dumps({"regime": regime, "payload": {"n": index}}) for index, regime in enumerate(_sweep_regimes())]
+        lines += [
+            "{",
+            "[]",
+            json.dumps({"regime": None, "payload": {}}),
+            json.dumps({"payload": {}}),
+            json.dumps({"regime": [], "payload": {}}),
+            "   ",
+        ]
+        self.input_text = "\n".join(lines) + "\n"
+
+    def expected_output(self):
+        out = []
+        for line in self.input_text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                result = dict(runtime.admit_record_line(line))
+            except Exception as exc:
+                result = {"error": f"{type(exc).__name__}: {exc}"}
+            out.append(json.dumps(result) + "\n")
+        return "".join(out)
+
+    def run_batch(self, workers, chunk_lines):
+        out = io.StringIO()
+        self.assertEqual(runtime.run_batch(io.StringIO(self.input_text), out, workers, chunk_lines), 0)
+        return out.getvalue()
+
+    def test_single_worker_writes_one_result_per_record(self):
+        output = self.run_batch(workers=1, chunk_lines=7)
+        self.assertEqual(output, self.expected_output())
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(results[-5:-1], [
+            dict(runtime.REFUSE_REGIME_UNKNOWN),
+            dict(runtime.REFUSE_REGIME_UNKNOWN),
+            dict(runtime.REFUSE_REGIME_MISSING),
+            dict(runtime.REFUSE_REGIME_MISSING),
+        ])
+        self.assertEqual(results[-1], {"error": "AttributeError: 'list' object has no attribute 'get'"})
+
+    def test_worker_pool_keeps_input_order(self):
+        self.assertEqual(self.run_batch(workers=2, chunk_lines=5), self.expected_output())
+
+
+class AdmissionServerTests(_RegistryIsolation, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.isolate_registry()
+        self.socket_path = os.path.join(self.tmpdir.name, "admission.sock")
+        server = runtime.AdmissionServer(self.socket_path, runtime._AdmissionHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def test_client_round_trip_matches_evaluate(self):
+        regime_path = Path(self.tmpdir.name) / "regime.json"
+        regime_path.write_text(
+            json.dumps(
+                {"regime_status": "REGIME_DECLARED", "regime_id": REGIME_IDS[2], "entry_mode": "OPERATOR_ASSERTED"}
+            ),
+            encoding="utf-8",
+        )
+        cases = [[json.dumps(regime), "{}"] for regime in _sweep_regimes()]
+        cases += [[], ["{}"], ["null", "{}"], ["{", "{}"], [str(regime_path), "{}"]]
+        client = runtime.AdmissionClient(self.socket_path)
+        self.addCleanup(client.close)
+        # One connection carries every request.
+        for args in cases:
+            with self.subTest(args=args):
+                self.assertEqual(client.evaluate(args), dict(runtime.evaluate(args)))
+
+    def test_deciding_errors_come_back_as_error_responses(self):
+        client = runtime.AdmissionClient(self.socket_path)
+        self.addCleanup(client.close)
+        self.assertEqual(
+            client.evaluate(["[]", "{}"]), {"error": "AttributeError: 'list' object has no attribute 'get'"}
+        )
+        # The connection stays usable after an error.
+        self.assertEqual(client.evaluate(["null", "{}"]), dict(runtime.REFUSE_REGIME_MISSING))
+
+
+class RegistryReloadTests(_RegistryIsolation, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.isolate_registry()
+        self.registry_path = Path(self.tmpdir.name) / "regime_registry.md"
+        self.cache_path = Path(self.tmpdir.name) / "registry_cache.json"
+        self.registry_path.write_text("# Registry\n\n### NEW_REGIME\n", encoding="utf-8")
+        self.now = 100.0
+        for name, value in (
+            ("REGISTRY_PATH", str(self.registry_path)),
+            ("REGISTRY_CACHE_PATH", str(self.cache_path)),
+            ("_monotonic", lambda: self.now),
+        ):
+            patcher = mock.patch.object(runtime, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def admits(self, regime_id):
+        regime = {"regime_status": "REGIME_DECLARED", "regime_id": regime_id, "entry_mode": "OPERATOR_ASSERTED"}
+        return runtime.admit(regime, {}) is runtime.KERNEL_STUB_RESULT
+
+    def test_registry_changes_are_picked_up_after_the_recheck_interval(self):
+        self.assertTrue(self.admits("NEW_REGIME"))
+        self.assertFalse(self.admits(REGIME_IDS[0]))
+
+        # A size change is only noticed once the recheck interval has passed.
+        with open(self.registry_path, "a", encoding="utf-8") as registry_file:
+            registry_file.write("### LATER_REGIME\n")
+        self.assertFalse(self.admits("LATER_REGIME"))
+        self.now += runtime.REGISTRY_RECHECK_SECONDS
+        self.assertTrue(self.admits("LATER_REGIME"))
+
+        # Same size, new mtime.
+        stat = os.stat(self.registry_path)
+        self.registry_path.write_text(
+            self.registry_path.read_text(encoding="utf-8").replace("LATER_REGIME", "OTHER_REGIME"), encoding="utf-8"
+        )
+        os.utime(self.registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(os.stat(self.registry_path).st_size, stat.st_size)
+        self.now += runtime.REGISTRY_RECHECK_SECONDS
+        self.assertTrue(self.admits("OTHER_REGIME"))
+        self.assertFalse(self.admits("LATER_REGIME"))
+        self.assertEqual(runtime.REGIME_ENUM, frozenset({"NEW_REGIME", "OTHER_REGIME"}))
+
+    def test_unreadable_registry_keeps_the_last_good_snapshot(self):
+        self.assertTrue(self.admits("NEW_REGIME"))
+        self.registry_path.unlink()
+        self.now += runtime.REGISTRY_RECHECK_SECONDS
+        self.assertTrue(self.admits("NEW_REGIME"))
+
+    def test_fresh_process_reuses_the_cache_file(self):
+        snapshot = runtime.registry_snapshot()
+        cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        self.assertEqual(cache["regime_ids"], ["NEW_REGIME"])
+        self.assertEqual(tuple(cache["signature"]), snapshot.signature)
+
+        self.isolate_registry()
+        with mock.patch.object(runtime, "parse_registry", side_effect=AssertionError("registry parsed")):
+            self.assertEqual(runtime.registry_snapshot().regime_enum, frozenset({"NEW_REGIME"}))
+
+    def test_stale_cache_file_is_ignored_and_rewritten(self):
+        runtime.registry_snapshot()
+        with open(self.registry_path, "a", encoding="utf-8") as registry_file:
+            registry_file.write("### LATER_REGIME\n")
+        self.isolate_registry()
+        self.assertTrue(self.admits("LATER_REGIME"))
+        cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        self.assertEqual(cache["regime_ids"], ["LATER_REGIME", "NEW_REGIME"])
+
+
+if __name__ == "__main__":
+    unittest.main()